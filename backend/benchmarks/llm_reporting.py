@@ -0,0 +1,54 @@
+"""
+Drive the reporting module with concurrent requests against the local stub.
+
+    python -m benchmarks.llm_reporting --requests 40 --concurrency 16
+"""
+import argparse
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from src.llm import StubBackend, set_backend, timings
+from src.reporting import report_generation_api
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=40)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--latency-ms", type=float, default=200)
+    parser.add_argument("--tokens-per-second", type=float, default=200)
+    parser.add_argument("--tokens", type=int, default=120)
+    args = parser.parse_args()
+
+    set_backend(
+        StubBackend(
+            first_token_latency=args.latency_ms / 1000,
+            tokens_per_second=args.tokens_per_second,
+            tokens=args.tokens,
+        )
+    )
+    timings.clear()
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        list(
+            pool.map(
+                lambda index: report_generation_api(
+                    employees_needed=10,
+                    employees_attended=8 + index % 3,
+                    factory_output=550,
+                    factory_target=600,
+                ),
+                range(args.requests),
+            )
+        )
+    elapsed = time.perf_counter() - started
+
+    print(f"{args.requests} reports in {elapsed:.2f}s "
+          f"({args.requests / elapsed:.1f} reports/s)")
+    print(json.dumps(timings.summary(), indent=2))
+
+
+if __name__ == "__main__":
+    main()
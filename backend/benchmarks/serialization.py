@@ -0,0 +1,140 @@
+"""
+Compare FastAPI's default list serialization with the fast row path.
+
+    python -m benchmarks.serialization --rows 50000
+
+The default path is what a list route did before: ORM instances validated
+through ``response_model`` and encoded with ``jsonable_encoder`` and the
+standard ``json`` module. The fast path maps column tuples (what the driver
+returns for a column select) to dicts and encodes them with ``dumps``.
+"""
+import argparse
+import json
+import time
+from datetime import date, datetime, time as dtime, timedelta
+
+from fastapi.encoders import jsonable_encoder
+from models.models import Availability, Employee, ShiftDetail, TimeOffRequest
+from models.schemas import (
+    AvailabilityResponse,
+    EmployeeResponse,
+    ShiftDetailResponse,
+    TimeOffRequestResponse,
+)
+from pydantic import TypeAdapter
+from utils.serialization import dumps
+
+WEEK_DAYS = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+
+
+def employee_row(index):
+    return {
+        "id": index,
+        "first_name": f"First{index}",
+        "last_name": f"Last{index}",
+        "employee_email": f"employee{index}@example.com",
+        "employee_role": "Operator",
+        "employee_preference_days": ["Monday", "Tuesday"],
+        "employee_preference_shifts": ["Morning"],
+        "shift_allocated": None,
+        "hire_date": datetime(2024, 1, 1) + timedelta(days=index % 365),
+        "is_active": True,
+        "role_id": 1,
+        "location_id": 1 + index % 2,
+    }
+
+
+def shift_row(index):
+    day = date(2024, 1, 1) + timedelta(days=index % 365)
+    return {
+        "id": index,
+        "shift_week_day": WEEK_DAYS[day.weekday()],
+        "shift_date": day,
+        "shift_start_time": dtime(6, 0),
+        "shift_end_time": dtime(14, 0),
+        "shift_desc": "Morning shift",
+        "capacity": 10,
+        "current_employees": 3,
+        "manager_id": 1,
+        "location_id": 1 + index % 2,
+        "employee_id": index,
+    }
+
+
+def availability_row(index):
+    day = date(2024, 1, 1) + timedelta(days=index % 365)
+    return {
+        "id": index,
+        "day_of_week": WEEK_DAYS[day.weekday()],
+        "date_of_week": day,
+        "start_time": dtime(6, 0),
+        "end_time": dtime(22, 0),
+        "employee_id": index,
+    }
+
+
+def time_off_row(index):
+    day = date(2024, 1, 1) + timedelta(days=index % 365)
+    return {
+        "id": index,
+        "request_date": day,
+        "start_date": day,
+        "end_date": day + timedelta(days=2),
+        "status": "Pending",
+        "reason_for_absence": None,
+        "employee_id": index,
+    }
+
+
+ENDPOINTS = [
+    ("GET /employees/", Employee, EmployeeResponse, employee_row),
+    ("GET /shifts/", ShiftDetail, ShiftDetailResponse, shift_row),
+    ("GET /employees/{id}/availability", Availability, AvailabilityResponse, availability_row),
+    ("GET /time_off_requests/", TimeOffRequest, TimeOffRequestResponse, time_off_row),
+]
+
+
+def default_path(adapter, instances):
+    validated = adapter.validate_python(instances, from_attributes=True)
+    return json.dumps(
+        jsonable_encoder(validated), ensure_ascii=False, separators=(",", ":")
+    ).encode("utf-8")
+
+
+def fast_path(names, rows):
+    return dumps([dict(zip(names, row)) for row in rows])
+
+
+def best_of(repeat, func, *args):
+    timings = []
+    for _ in range(repeat):
+        started_at = time.perf_counter()
+        func(*args)
+        timings.append(time.perf_counter() - started_at)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=50000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'endpoint':<36} {'default':>10} {'fast':>10} {'speedup':>8}")
+    for name, model, schema, make_row in ENDPOINTS:
+        names = list(schema.model_fields)
+        dicts = [make_row(index) for index in range(1, args.rows + 1)]
+        instances = [model(**row) for row in dicts]
+        rows = [tuple(row[field] for field in names) for row in dicts]
+        adapter = TypeAdapter(list[schema])
+
+        default_seconds = best_of(args.repeat, default_path, adapter, instances)
+        fast_seconds = best_of(args.repeat, fast_path, names, rows)
+        print(
+            f"{name:<36} {default_seconds * 1000:>8.1f}ms {fast_seconds * 1000:>8.1f}ms "
+            f"{default_seconds / fast_seconds:>7.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,208 @@
+"""
+Compare loading solver inputs as ORM instances with the compact records.
+
+    python -m benchmarks.solver_inputs --employees 5000 --days 28
+
+The ORM path is what ``load_inputs`` did before: ``select(Model)`` for every
+input, then ``SimpleNamespace`` copies of the used attributes for scenario
+worker processes. The record path is the current ``load_inputs``: column
+selects into the named tuples of ``src.records``. The report shows load
+time, memory held by the inputs and the pickle a worker process receives.
+"""
+import argparse
+import pickle
+import time
+import tracemalloc
+from datetime import date, time as dtime, timedelta
+from types import SimpleNamespace
+
+from models.models import (
+    Availability,
+    Employee,
+    EmployeeSkill,
+    ProductionLine,
+    ShiftDetail,
+    SkillRequirement,
+    TimeOffRequest,
+)
+from services.scheduling import load_inputs
+from sqlalchemy import insert
+from sqlalchemy.pool import StaticPool
+from sqlmodel import Session, SQLModel, create_engine, select
+
+WEEK_DAYS = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+SHIFT_TEMPLATES = [
+    ("Morning shift", dtime(6), dtime(14)),
+    ("Afternoon shift", dtime(14), dtime(22)),
+    ("Night shift", dtime(22), dtime(6)),
+]
+LEVELS = ["Beginner", "Intermediate", "Advanced"]
+LOCATIONS = 10
+FIRST_DAY = date(2025, 1, 6)
+
+
+def populate(session, employees, days):
+    session.execute(
+        insert(Employee),
+        [
+            {
+                "id": index,
+                "first_name": f"First{index}",
+                "last_name": f"Last{index}",
+                "employee_email": f"employee{index}@example.com",
+                "employee_preference_days": [WEEK_DAYS[index % 7]],
+                "employee_preference_shifts": ["Morning"],
+                "hire_date": FIRST_DAY,
+                "location_id": 1 + index % LOCATIONS,
+            }
+            for index in range(1, employees + 1)
+        ],
+    )
+    session.execute(
+        insert(Availability),
+        [
+            {
+                "employee_id": index,
+                "day_of_week": day,
+                "date_of_week": day,
+                "start_time": dtime(0),
+                "end_time": dtime(23, 59),
+            }
+            for index in range(1, employees + 1)
+            for day in WEEK_DAYS
+        ],
+    )
+    session.execute(
+        insert(EmployeeSkill),
+        [
+            {"employee_id": index, "skill_id": skill, "skill_level": LEVELS[index % 3]}
+            for index in range(1, employees + 1)
+            for skill in (1, 2)
+        ],
+    )
+    shifts = []
+    for offset in range(days):
+        shift_date = FIRST_DAY + timedelta(days=offset)
+        for location_id in range(1, LOCATIONS + 1):
+            for desc, start, end in SHIFT_TEMPLATES:
+                shifts.append(
+                    {
+                        "id": len(shifts) + 1,
+                        "shift_week_day": WEEK_DAYS[shift_date.weekday()],
+                        "shift_date": shift_date,
+                        "shift_start_time": start,
+                        "shift_end_time": end,
+                        "shift_desc": desc,
+                        "capacity": employees // LOCATIONS // 4,
+                        "employee_id": 1,
+                        "manager_id": 1,
+                        "location_id": location_id,
+                    }
+                )
+    session.execute(insert(ShiftDetail), shifts)
+    session.execute(
+        insert(SkillRequirement),
+        [
+            {"skill_id": 1 + shift["id"] % 2, "min_level": "Beginner", "shift_id": shift["id"]}
+            for shift in shifts
+        ],
+    )
+    session.execute(
+        insert(TimeOffRequest),
+        [
+            {
+                "employee_id": index,
+                "start_date": FIRST_DAY + timedelta(days=index % days),
+                "end_date": FIRST_DAY + timedelta(days=index % days + 2),
+                "status": "Approved",
+            }
+            for index in range(1, employees + 1, 10)
+        ],
+    )
+    session.commit()
+
+
+def load_orm(session):
+    return {
+        "employees": session.exec(select(Employee)).all(),
+        "shifts": session.exec(select(ShiftDetail)).all(),
+        "availability": session.exec(select(Availability)).all(),
+        "employee_skills": session.exec(select(EmployeeSkill)).all(),
+        "skill_requirements": session.exec(select(SkillRequirement)).all(),
+        "production_lines": session.exec(
+            select(ProductionLine).where(ProductionLine.shift_id.is_not(None))
+        ).all(),
+        "time_off_requests": session.exec(
+            select(TimeOffRequest).where(TimeOffRequest.status == "Approved")
+        ).all(),
+    }
+
+
+def namespaces(inputs, records):
+    """The pre-records worker payload: attribute copies of every ORM row."""
+    return {
+        name: [
+            SimpleNamespace(**{field: getattr(row, field) for field in sample._fields})
+            for row in inputs[name]
+        ]
+        for name, sample in records.items()
+        if sample is not None
+    }
+
+
+def measure(engine, load):
+    with Session(engine) as session:
+        tracemalloc.start()
+        started_at = time.perf_counter()
+        inputs = load(session)
+        seconds = time.perf_counter() - started_at
+        held, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        return inputs, seconds, held
+
+
+def transfer(payload):
+    started_at = time.perf_counter()
+    data = pickle.dumps(payload, protocol=pickle.HIGHEST_PROTOCOL)
+    pickle.loads(data)
+    return len(data), time.perf_counter() - started_at
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--employees", type=int, default=5000)
+    parser.add_argument("--days", type=int, default=28)
+    args = parser.parse_args()
+
+    engine = create_engine("sqlite://", poolclass=StaticPool)
+    SQLModel.metadata.create_all(engine)
+    with Session(engine) as session:
+        populate(session, args.employees, args.days)
+
+    orm, orm_seconds, orm_held = measure(engine, load_orm)
+    records, record_seconds, record_held = measure(engine, load_inputs)
+    samples = {
+        name: rows[0] if rows else None
+        for name, rows in records.items()
+        if name != "fixed"
+    }
+    orm_bytes, orm_transfer = transfer(namespaces(orm, samples))
+    record_bytes, record_transfer = transfer(
+        {name: records[name] for name in samples}
+    )
+
+    rows = sum(len(rows) for rows in orm.values())
+    print(f"{rows} input rows")
+    print(f"{'':<16} {'load':>10} {'memory':>10} {'pickle':>10} {'round trip':>11}")
+    for name, seconds, held, size, trip in (
+        ("ORM + copies", orm_seconds, orm_held, orm_bytes, orm_transfer),
+        ("records", record_seconds, record_held, record_bytes, record_transfer),
+    ):
+        print(
+            f"{name:<16} {seconds * 1000:>8.0f}ms {held / 2**20:>8.1f}MB "
+            f"{size / 2**20:>8.1f}MB {trip * 1000:>9.0f}ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
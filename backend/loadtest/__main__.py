@@ -0,0 +1,93 @@
+"""
+Load-test the API with a mixed workload.
+
+In-process over ASGI (no server needed; pair with DB_BACKEND=sqlite,
+DB_AUTO_INIT=true and LLM_BACKEND=stub to run on a bare machine). The app's
+lifespan runs around the test, as it would under uvicorn:
+
+    python -m loadtest --duration 30 --concurrency 32
+
+Against a running uvicorn, at a fixed arrival rate:
+
+    python -m loadtest --url http://localhost:8080 --rate 200 --mix list=80,create=20
+"""
+import argparse
+import asyncio
+import json
+import os
+from contextlib import AsyncExitStack
+
+from loadtest.runner import LoadTestConfig, LoadTestRunner, asgi_client, http_client
+from loadtest.scenarios import TrafficMix
+
+
+def print_report(report: dict):
+    header = (
+        f"{'route':<52} {'reqs':>7} {'rps':>8} {'err%':>6} "
+        f"{'p50':>8} {'p95':>8} {'p99':>8}"
+    )
+    print(header)
+    print("-" * len(header))
+    rows = list(report["routes"].items()) + [("TOTAL", report["total"])]
+    for route, stats in rows:
+        error_rate = (stats["error_rate"] or 0) * 100
+        print(
+            f"{route:<52} {stats['requests']:>7} {stats['throughput_rps'] or 0:>8.1f} "
+            f"{error_rate:>5.1f}% {stats['p50_ms'] or 0:>6.1f}ms "
+            f"{stats['p95_ms'] or 0:>6.1f}ms {stats['p99_ms'] or 0:>6.1f}ms"
+        )
+
+
+async def run(args) -> dict:
+    config = LoadTestConfig(
+        duration=args.duration,
+        concurrency=args.concurrency,
+        rate=args.rate,
+        prefix=args.prefix,
+        timeout=args.timeout,
+        seed=args.seed,
+        mix=TrafficMix.parse(args.mix),
+    )
+    async with AsyncExitStack() as stack:
+        if args.url:
+            client = http_client(args.url, args.concurrency)
+        else:
+            from main import app
+
+            # ASGITransport sends no lifespan events; run startup/shutdown here
+            await stack.enter_async_context(app.router.lifespan_context(app))
+            client = asgi_client(app)
+        await stack.enter_async_context(client)
+        return await LoadTestRunner(client, config).run()
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument(
+        "--url", help="Base URL of a running server (default: in-process)"
+    )
+    parser.add_argument("--duration", type=float, default=30.0, help="Seconds to run")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument(
+        "--rate", type=float, default=0.0, help="Target requests/s (0 = closed loop)"
+    )
+    parser.add_argument(
+        "--mix", help="Weights per category or operation, e.g. list=70,create=20"
+    )
+    parser.add_argument("--prefix", default=os.getenv("API_V1_STR") or "/api/v1")
+    parser.add_argument("--timeout", type=float, default=60.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", help="Also write the full report to this file")
+    args = parser.parse_args()
+
+    report = asyncio.run(run(args))
+    print_report(report)
+    if args.json:
+        with open(args.json, "w") as handle:
+            json.dump(report, handle, indent=2)
+
+
+if __name__ == "__main__":
+    main()
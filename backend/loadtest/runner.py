@@ -0,0 +1,164 @@
+import asyncio
+import math
+import random
+import time
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+import httpx
+from loadtest.scenarios import Request, TrafficMix
+
+
+def percentile(sorted_values: List[float], fraction: float) -> Optional[float]:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return None
+    rank = math.ceil(fraction * len(sorted_values)) - 1
+    return sorted_values[max(0, min(rank, len(sorted_values) - 1))]
+
+
+@dataclass
+class RouteStats:
+    latencies: List[float] = field(default_factory=list)
+    errors: int = 0
+    status_codes: Dict[int, int] = field(default_factory=lambda: defaultdict(int))
+
+    def summary(self, elapsed: float) -> dict:
+        latencies = sorted(self.latencies)
+        count = len(latencies)
+        return {
+            "requests": count,
+            "throughput_rps": round(count / elapsed, 2) if elapsed else None,
+            "error_rate": round(self.errors / count, 4) if count else None,
+            "p50_ms": _ms(percentile(latencies, 0.50)),
+            "p95_ms": _ms(percentile(latencies, 0.95)),
+            "p99_ms": _ms(percentile(latencies, 0.99)),
+            "max_ms": _ms(latencies[-1] if latencies else None),
+            "status_codes": dict(sorted(self.status_codes.items())),
+        }
+
+
+def _ms(seconds: Optional[float]) -> Optional[float]:
+    return round(seconds * 1000, 2) if seconds is not None else None
+
+
+@dataclass
+class LoadTestConfig:
+    duration: float = 30.0
+    concurrency: int = 16
+    # Requests per second across all workers; 0 runs closed-loop as fast as
+    # the concurrency allows.
+    rate: float = 0.0
+    prefix: str = "/api/v1"
+    timeout: float = 60.0
+    seed: int = 0
+    mix: TrafficMix = field(default_factory=TrafficMix)
+
+
+class LoadTestRunner:
+    """
+    Drives a mixed workload against the API and collects per-route latency.
+
+    ``client`` is any ``httpx.AsyncClient``; use ``asgi_client`` to run the
+    application in-process or ``http_client`` for a running uvicorn.
+    """
+
+    def __init__(self, client: httpx.AsyncClient, config: LoadTestConfig):
+        self.client = client
+        self.config = config
+        self.stats: Dict[str, RouteStats] = defaultdict(RouteStats)
+
+    async def _send(self, request: Request):
+        key = f"{request.method} {request.route}"
+        started_at = time.perf_counter()
+        try:
+            response = await self.client.request(
+                request.method,
+                self.config.prefix + request.path,
+                json=request.json,
+                timeout=self.config.timeout,
+            )
+            status_code = response.status_code
+        except httpx.HTTPError:
+            status_code = 0
+        elapsed = time.perf_counter() - started_at
+        stats = self.stats[key]
+        stats.latencies.append(elapsed)
+        stats.status_codes[status_code] += 1
+        if status_code == 0 or status_code >= 500:
+            stats.errors += 1
+
+    async def _closed_loop(self, sample, deadline):
+        async def worker():
+            while time.perf_counter() < deadline:
+                await self._send(sample())
+
+        await asyncio.gather(*(worker() for _ in range(self.config.concurrency)))
+
+    async def _open_loop(self, sample, deadline):
+        # Requests start on a fixed schedule whether or not earlier ones have
+        # finished, so server slowdowns show up as latency instead of being
+        # hidden by a slower arrival rate.
+        slots = asyncio.Semaphore(self.config.concurrency)
+        interval = 1 / self.config.rate
+        next_start = time.perf_counter()
+        pending = set()
+
+        async def fire(request):
+            async with slots:
+                await self._send(request)
+
+        while next_start < deadline:
+            delay = next_start - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            task = asyncio.create_task(fire(sample()))
+            pending.add(task)
+            task.add_done_callback(pending.discard)
+            next_start += interval
+        if pending:
+            await asyncio.gather(*pending)
+
+    async def run(self) -> dict:
+        sample = self.config.mix.sampler(random.Random(self.config.seed))
+        started_at = time.perf_counter()
+        deadline = started_at + self.config.duration
+        if self.config.rate > 0:
+            await self._open_loop(sample, deadline)
+        else:
+            await self._closed_loop(sample, deadline)
+        elapsed = time.perf_counter() - started_at
+        return self.report(elapsed)
+
+    def report(self, elapsed: float) -> dict:
+        total = RouteStats()
+        for stats in self.stats.values():
+            total.latencies.extend(stats.latencies)
+            total.errors += stats.errors
+            for status_code, count in stats.status_codes.items():
+                total.status_codes[status_code] += count
+        return {
+            "elapsed_seconds": round(elapsed, 2),
+            "concurrency": self.config.concurrency,
+            "target_rate": self.config.rate or None,
+            "total": total.summary(elapsed),
+            "routes": {
+                route: stats.summary(elapsed)
+                for route, stats in sorted(self.stats.items())
+            },
+        }
+
+
+def asgi_client(app) -> httpx.AsyncClient:
+    """In-process client: requests go straight to the ASGI app."""
+    return httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=app), base_url="http://loadtest"
+    )
+
+
+def http_client(base_url: str, concurrency: int) -> httpx.AsyncClient:
+    limits = httpx.Limits(
+        max_connections=concurrency, max_keepalive_connections=concurrency
+    )
+    return httpx.AsyncClient(base_url=base_url, limits=limits)
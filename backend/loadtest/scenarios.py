@@ -0,0 +1,139 @@
+import random
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+from typing import Callable, Dict, Optional
+
+WEEK_DAYS = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+
+
+@dataclass
+class Request:
+    method: str
+    path: str
+    route: str
+    json: Optional[dict] = None
+
+
+@dataclass
+class Operation:
+    """
+    One kind of traffic in the mix. ``build`` returns the concrete request,
+    whose ``route`` template is what results are grouped under.
+    """
+
+    name: str
+    category: str
+    build: Callable[[random.Random], Request]
+
+
+def _get(route: str, path: Optional[str] = None) -> Callable[[random.Random], Request]:
+    return lambda rng: Request("GET", path or route, route)
+
+
+def _post(route: str) -> Callable[[random.Random], Request]:
+    return lambda rng: Request("POST", route, route)
+
+
+def _employee_availability(rng: random.Random) -> Request:
+    route = "/employees/employees/{employee_id}/availability"
+    return Request("GET", route.format(employee_id=rng.randint(1, 2)), route)
+
+
+def _create_time_off(rng: random.Random) -> Request:
+    start = date.today() + timedelta(days=rng.randint(1, 60))
+    return Request(
+        "POST",
+        "/time_off_requests/create",
+        "/time_off_requests/create",
+        json={
+            "employee_id": rng.randint(1, 2),
+            "request_date": date.today().isoformat(),
+            "start_date": start.isoformat(),
+            "end_date": (start + timedelta(days=rng.randint(0, 4))).isoformat(),
+            "status": "Pending",
+            "reason_for_absence": "Load test",
+        },
+    )
+
+
+def _create_shift(rng: random.Random) -> Request:
+    day = date.today() + timedelta(days=rng.randint(1, 28))
+    start_hour = rng.choice([6, 14, 22])
+    return Request(
+        "POST",
+        "/shifts/create",
+        "/shifts/create",
+        json={
+            "shift_week_day": WEEK_DAYS[day.weekday()],
+            "shift_date": day.isoformat(),
+            "shift_start_time": f"{start_hour:02d}:00:00",
+            "shift_end_time": f"{(start_hour + 8) % 24:02d}:00:00",
+            "shift_desc": "Load test shift",
+            "capacity": rng.randint(2, 10),
+            "manager_id": 1,
+            "location_id": rng.randint(1, 2),
+            "employee_id": rng.randint(1, 2),
+        },
+    )
+
+
+OPERATIONS: Dict[str, Operation] = {
+    operation.name: operation
+    for operation in (
+        Operation("list_employees", "list", _get("/employees/")),
+        Operation("list_shifts", "list", _get("/shifts/")),
+        Operation("list_locations", "list", _get("/locations/")),
+        Operation("list_time_off", "list", _get("/time_off_requests/")),
+        Operation("list_production_lines", "list", _get("/production_lines/")),
+        Operation("employee_availability", "list", _employee_availability),
+        Operation("create_time_off", "create", _create_time_off),
+        Operation("create_shift", "create", _create_shift),
+        Operation("schedule", "schedule", _post("/shifts/schedule")),
+        Operation("report", "report", _get("/managers/generate-report")),
+    )
+}
+
+# Share of traffic per category; operations within a category split it evenly.
+DEFAULT_MIX = {"list": 70, "create": 20, "schedule": 3, "report": 7}
+
+
+@dataclass
+class TrafficMix:
+    weights: Dict[str, float] = field(default_factory=lambda: dict(DEFAULT_MIX))
+
+    @classmethod
+    def parse(cls, spec: Optional[str]) -> "TrafficMix":
+        """Parse ``list=70,create=20,...``; keys are categories or operation names."""
+        if not spec:
+            return cls()
+        weights = {}
+        for part in spec.split(","):
+            key, _, value = part.partition("=")
+            key = key.strip()
+            known = {op.category for op in OPERATIONS.values()} | set(OPERATIONS)
+            if key not in known:
+                raise ValueError(f"Unknown operation or category '{key}'")
+            weights[key] = float(value)
+        return cls(weights)
+
+    def operation_weights(self) -> Dict[str, float]:
+        weights = {}
+        for key, weight in self.weights.items():
+            if key in OPERATIONS:
+                weights[key] = weights.get(key, 0) + weight
+                continue
+            members = [op.name for op in OPERATIONS.values() if op.category == key]
+            for name in members:
+                weights[name] = weights.get(name, 0) + weight / len(members)
+        return {name: weight for name, weight in weights.items() if weight > 0}
+
+    def sampler(self, rng: random.Random) -> Callable[[], Request]:
+        weights = self.operation_weights()
+        names = list(weights)
+        values = [weights[name] for name in names]
+
+        def sample() -> Request:
+            name = rng.choices(names, weights=values)[0]
+            return OPERATIONS[name].build(rng)
+
+        return sample
@@ -2,25 +2,56 @@ import logging
 import os
 from contextlib import asynccontextmanager
 
-from fastapi import FastAPI
-from fastapi.middleware.cors import CORSMiddleware
-from fastapi.routing import APIRoute
-from models.database import engine, init_db
-from routes.routers import api_router
-from sqlmodel import Session
+from utils.startup import startup_timer
 
-from backend.models.seeding import prepopulate_data
+with startup_timer.phase("framework"):
+    from fastapi import FastAPI
+    from fastapi.middleware.cors import CORSMiddleware
+    from fastapi import HTTPException, Request
+    from fastapi.responses import FileResponse, JSONResponse, PlainTextResponse
+    from fastapi.routing import APIRoute
+
+with startup_timer.phase("database"):
+    from models.database import (
+        engine,
+        init_db,
+        pool_stats,
+        replica_engines,
+        settings,
+    )
+    from sqlmodel import Session
+
+with startup_timer.phase("routes"):
+    from routes.routers import api_router
+    from services.attendance import attendance_buffer
+    from services.scheduling import scenario_pool
+    from utils.admission import Overloaded
+    from utils.instrumentation import MetricsMiddleware
+    from utils.metrics import registry
+    from utils.profiling import PROFILING_OUTPUT_DIR, ProfilingMiddleware, is_authorized
+    from utils.replicas import ReadYourWritesMiddleware
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     logging.info("Application has started...")
-    init_db()
-    logging.info("Database startup completed")
-    with Session(engine) as session:
-        logging.info("Loading dummy data")
-        prepopulate_data(session=session)
+    # Schema creation and seeding are run once per deployment through
+    # `python manage.py init-db` / `seed`; DB_AUTO_INIT keeps the old
+    # behaviour for throwaway local databases.
+    if os.getenv("DB_AUTO_INIT", "false").lower() == "true":
+        from models.seeding import seed_if_empty
+
+        with startup_timer.phase("schema and seed"):
+            init_db()
+            with Session(engine) as session:
+                seed_if_empty(session=session)
+        logging.info("Database startup completed")
+    scenario_pool.start()
+    startup_timer.log()
     yield
+    # Write the attendance events still buffered in this worker
+    attendance_buffer.close()
+    scenario_pool.close()
 
 
 def custom_generate_unique_id(route: APIRoute) -> str:
@@ -29,19 +60,65 @@ def custom_generate_unique_id(route: APIRoute) -> str:
 
 API_V1_STR = os.getenv("API_V1_STR")
 
-app = FastAPI(
-    title=f"{os.getenv('PROJECT_NAME')}",
-    openapi_url=f"{API_V1_STR}/openapi.json",
-    generate_unique_id_function=custom_generate_unique_id,
-    lifespan=lifespan,
-)
-
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["*"],
-    allow_headers=["*"],
-    allow_methods=["*"],
-    allow_credentials=True,
-)
-
-app.include_router(api_router, prefix=API_V1_STR)
+with startup_timer.phase("application"):
+    app = FastAPI(
+        title=f"{os.getenv('PROJECT_NAME')}",
+        openapi_url=f"{API_V1_STR}/openapi.json",
+        generate_unique_id_function=custom_generate_unique_id,
+        lifespan=lifespan,
+    )
+
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=["*"],
+        allow_headers=["*"],
+        allow_methods=["*"],
+        allow_credentials=True,
+    )
+
+    app.add_middleware(MetricsMiddleware)
+    app.add_middleware(ProfilingMiddleware)
+    if replica_engines:
+        app.add_middleware(
+            ReadYourWritesMiddleware, sticky_seconds=settings.replica_sticky_seconds
+        )
+
+    app.include_router(api_router, prefix=API_V1_STR)
+
+
+@app.exception_handler(Overloaded)
+async def overloaded_handler(request: Request, exc: Overloaded):
+    return JSONResponse(
+        status_code=429,
+        content={"detail": str(exc)},
+        headers={"Retry-After": str(exc.retry_after)},
+    )
+
+
+@app.get("/metrics", tags=["ops"], include_in_schema=False)
+def metrics():
+    return PlainTextResponse(
+        registry.render(), media_type="text/plain; version=0.0.4; charset=utf-8"
+    )
+
+
+@app.get("/health/db-pool", tags=["ops"], include_in_schema=False)
+def db_pool_health():
+    return {
+        "workers": settings.workers,
+        "max_connections": settings.max_connections,
+        "pool_timeout": settings.pool_timeout,
+        "pool_pre_ping": settings.pool_pre_ping,
+        **pool_stats(),
+        "replicas": [pool_stats(replica) for replica in replica_engines],
+    }
+
+
+@app.get("/debug/profiles/{artifact}", tags=["ops"], include_in_schema=False)
+def get_profile_artifact(artifact: str, request: Request):
+    if not is_authorized(request.headers.get("x-profile")):
+        raise HTTPException(status_code=403, detail="Profiling token required")
+    path = PROFILING_OUTPUT_DIR / artifact
+    if path.parent != PROFILING_OUTPUT_DIR or not path.is_file():
+        raise HTTPException(status_code=404, detail="Profile artifact not found")
+    return FileResponse(path)
@@ -0,0 +1,265 @@
+"""
+Administrative commands that should not run on every worker boot.
+
+    python manage.py init-db
+    python manage.py seed [--force]
+    python manage.py startup-report [--top 15]
+    python manage.py prune-changes [--days 30]
+    python manage.py archive [--days 180] [--batch-size 500] [--pause 0.1]
+    python manage.py sync-replicas
+    python manage.py list-solves [--slowest 20]
+    python manage.py replay-solve RECORD [--time-limit S] [--objective staged] ...
+"""
+import argparse
+import json
+import logging
+import subprocess
+import sys
+
+
+def init_db_command(args):
+    from models.database import init_db
+
+    init_db()
+    logging.info("Database schema created or updated")
+
+
+def seed_command(args):
+    from models.database import engine
+    from models.seeding import prepopulate_data, seed_if_empty
+    from sqlmodel import Session
+
+    with Session(engine) as session:
+        if args.force:
+            prepopulate_data(session=session)
+        else:
+            seed_if_empty(session=session)
+
+
+def prune_changes_command(args):
+    from datetime import datetime, timedelta
+
+    from models.database import engine
+    from services.changes import prune_changes
+    from sqlmodel import Session
+
+    with Session(engine) as session:
+        pruned = prune_changes(session, datetime.now() - timedelta(days=args.days))
+    logging.info("Pruned %d change log entries older than %d days", pruned, args.days)
+
+
+def archive_command(args):
+    from models.database import engine
+    from services.archive import archive_old_rows
+    from sqlmodel import Session
+
+    # Unset options fall back to the ARCHIVE_* settings
+    options = {
+        name: value
+        for name, value in (
+            ("days", args.days),
+            ("batch_size", args.batch_size),
+            ("pause", args.pause),
+        )
+        if value is not None
+    }
+    with Session(engine) as session:
+        archive_old_rows(session, **options)
+
+
+def sync_replicas_command(args):
+    """Copy a SQLite primary onto its replica files, for local replica setups."""
+    import sqlite3
+
+    from models.database import settings
+
+    if not settings.is_sqlite or settings.is_memory:
+        sys.exit("sync-replicas only applies to file-backed SQLite databases")
+    with sqlite3.connect(settings.sqlite_path) as primary:
+        for replica in settings.replicas():
+            with sqlite3.connect(replica.sqlite_path) as target:
+                primary.backup(target)
+            logging.info("Copied %s to %s", settings.sqlite_path, replica.sqlite_path)
+
+
+def list_solves_command(args):
+    from src.recording import SOLVE_RECORD_DIR, load_record
+
+    solves = []
+    for path in SOLVE_RECORD_DIR.glob("*.json.gz"):
+        record = load_record(path)
+        outcome = record["outcome"]
+        solves.append(
+            (
+                outcome["seconds"],
+                path.name,
+                record["kind"],
+                outcome["status"] or ("FOUND" if outcome["assignments"] else "NONE"),
+                len(record["inputs"]["shifts"]["rows"]),
+            )
+        )
+    print(f"{'seconds':>9} {'kind':<9} {'status':<10} {'shifts':>7}  record")
+    for seconds, name, kind, status, shifts in sorted(solves, reverse=True)[
+        : args.slowest
+    ]:
+        print(f"{seconds:>9.3f} {kind:<9} {status:<10} {shifts:>7}  {name}")
+
+
+def replay_solve_command(args):
+    from pathlib import Path
+
+    from services.scheduling import parse_stage_time_limits
+    from src.recording import (
+        SOLVE_RECORD_DIR,
+        compare,
+        engine_versions,
+        load_record,
+        replay,
+    )
+
+    path = Path(args.record)
+    if not path.exists():
+        path = SOLVE_RECORD_DIR / args.record
+    record = load_record(path)
+
+    overrides = {}
+    if args.time_limit is not None:
+        overrides["time_limit"] = args.time_limit
+    if args.objective is not None:
+        overrides["objective"] = args.objective
+    if args.stage_time_limits is not None:
+        overrides["stage_time_limits"] = parse_stage_time_limits(
+            args.stage_time_limits
+        )
+    if args.workers is not None:
+        overrides["workers"] = args.workers
+    rules = dict(record["params"]["labour_rules"])
+    if args.max_weekly_hours is not None:
+        rules["max_weekly_hours"] = args.max_weekly_hours
+    if args.min_rest_hours is not None:
+        rules["min_rest_hours"] = args.min_rest_hours
+    overrides["labour_rules"] = rules
+
+    replays = [replay(record, **overrides) for _ in range(args.repeat)]
+    fastest = min(replays, key=lambda outcome: outcome["seconds"])
+    report = {
+        "record": path.name,
+        "kind": record["kind"],
+        "engine": {"recorded": record["engine"], "replayed": engine_versions()},
+        "params": {"recorded": record["params"], "overrides": overrides},
+        "seconds": {
+            "recorded": record["outcome"]["seconds"],
+            "replayed": [outcome["seconds"] for outcome in replays],
+        },
+        "status": {
+            "recorded": record["outcome"]["status"],
+            "replayed": fastest["status"],
+        },
+        **compare(record, fastest),
+    }
+    print(json.dumps(report, indent=2))
+
+
+def _parse_importtime(stderr: str) -> list:
+    """Top-level imports and their cumulative time from ``-X importtime``."""
+    imports = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        self_column, cumulative_us, name = line.split("|", 2)
+        self_us = self_column.rsplit(":", 1)[1]
+        # Nested imports are indented under their parent; keep the roots only.
+        if name.startswith("  "):
+            continue
+        imports.append((name.strip(), int(cumulative_us) / 1e6, int(self_us) / 1e6))
+    return imports
+
+
+def startup_report_command(args):
+    probe = (
+        "import json, main; "
+        "from utils.startup import startup_timer; "
+        "print(json.dumps(startup_timer.report()))"
+    )
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", probe],
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        sys.stderr.write(result.stderr)
+        sys.exit(result.returncode)
+
+    report = json.loads(result.stdout.strip().splitlines()[-1])
+    print("Boot phases:")
+    for phase in report["phases"]:
+        print(f"  {phase['phase']:<20} {phase['seconds']:8.3f}s")
+    print(f"  {'total':<20} {report['total_seconds']:8.3f}s")
+
+    imports = sorted(_parse_importtime(result.stderr), key=lambda i: -i[1])
+    print("\nSlowest top-level imports (cumulative):")
+    for name, cumulative, _ in imports[: args.top]:
+        print(f"  {name:<40} {cumulative:8.3f}s")
+
+
+def main():
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description=__doc__)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    commands.add_parser(
+        "init-db", help="Create all tables and add columns missing from existing ones"
+    ).set_defaults(handler=init_db_command)
+
+    seed = commands.add_parser("seed", help="Load the dummy data set")
+    seed.add_argument("--force", action="store_true", help="Seed even if not empty")
+    seed.set_defaults(handler=seed_command)
+
+    startup = commands.add_parser(
+        "startup-report", help="Break down where application boot time goes"
+    )
+    startup.add_argument("--top", type=int, default=15)
+    startup.set_defaults(handler=startup_report_command)
+
+    prune = commands.add_parser(
+        "prune-changes", help="Drop old change log entries (clients behind resync)"
+    )
+    prune.add_argument("--days", type=int, default=30)
+    prune.set_defaults(handler=prune_changes_command)
+
+    archive = commands.add_parser(
+        "archive", help="Move old shifts, assignments, time off and availability"
+    )
+    archive.add_argument("--days", type=int, help="Retention (ARCHIVE_AFTER_DAYS)")
+    archive.add_argument("--batch-size", type=int, help="Rows per transaction")
+    archive.add_argument("--pause", type=float, help="Seconds between batches")
+    archive.set_defaults(handler=archive_command)
+
+    solves = commands.add_parser("list-solves", help="List recorded solver runs")
+    solves.add_argument("--slowest", type=int, default=20)
+    solves.set_defaults(handler=list_solves_command)
+
+    replay = commands.add_parser(
+        "replay-solve",
+        help="Re-run a recorded solve locally and diff its time and quality",
+    )
+    replay.add_argument("record", help="Record file, or its name in SOLVE_RECORD_DIR")
+    replay.add_argument("--time-limit", type=float)
+    replay.add_argument("--objective", choices=("coverage", "staged"))
+    replay.add_argument("--stage-time-limits", help='e.g. "preferences=5,fairness=5"')
+    replay.add_argument("--workers", type=int, help="CP-SAT search threads")
+    replay.add_argument("--max-weekly-hours", type=float)
+    replay.add_argument("--min-rest-hours", type=float)
+    replay.add_argument("--repeat", type=int, default=1)
+    replay.set_defaults(handler=replay_solve_command)
+
+    commands.add_parser(
+        "sync-replicas", help="Copy the SQLite database onto its replica files"
+    ).set_defaults(handler=sync_replicas_command)
+
+    args = parser.parse_args()
+    args.handler(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+import logging
+from typing import List
+
+from sqlalchemy import MetaData, Table, column, inspect, table, text, update
+from sqlalchemy.engine import Engine
+from sqlalchemy.schema import CreateColumn
+
+# Indexes that a model index has replaced, by table; ``init_db`` drops them
+# once the replacement exists.
+REPLACED_INDEXES = {
+    "shift_schedules": ["ix_shift_schedules_employee_date"],
+}
+
+
+def add_missing_columns(engine: Engine, metadata: MetaData) -> List[str]:
+    """
+    Add the model columns that existing tables lack, since ``create_all``
+    only creates whole tables. Returns the ``table.column`` names added.
+
+    Columns are added as nullable: adding a NOT NULL column to a table with
+    rows fails on MySQL and SQLite. A non-nullable column with a default is
+    then back-filled with it, so existing rows read like new ones (e.g.
+    ``production_lines.production_date`` becomes the migration date).
+    """
+    inspector = inspect(engine)
+    existing_tables = set(inspector.get_table_names())
+    added = []
+    with engine.begin() as connection:
+        for model_table in metadata.sorted_tables:
+            if model_table.name not in existing_tables:
+                continue
+            present = {
+                info["name"] for info in inspector.get_columns(model_table.name)
+            }
+            for model_column in model_table.columns:
+                if model_column.name in present:
+                    continue
+                spec = CreateColumn(model_column).compile(dialect=engine.dialect)
+                spec = str(spec).replace(" NOT NULL", "")
+                connection.execute(
+                    text(f"ALTER TABLE {model_table.name} ADD COLUMN {spec}")
+                )
+                default = model_column.default
+                if not model_column.nullable and default is not None:
+                    value = default.arg(None) if default.is_callable else default.arg
+                    target = table(model_table.name, column(model_column.name))
+                    connection.execute(
+                        update(target).values({model_column.name: value})
+                    )
+                added.append(f"{model_table.name}.{model_column.name}")
+    if added:
+        logging.info("Added columns: %s", ", ".join(added))
+    return added
+
+
+def drop_replaced_indexes(
+    engine: Engine, replaced: dict = REPLACED_INDEXES
+) -> List[str]:
+    """
+    Drop the ``replaced`` indexes still present, after the indexes replacing
+    them were created (MySQL keeps one index per foreign key). Returns the
+    names dropped.
+    """
+    inspector = inspect(engine)
+    existing_tables = set(inspector.get_table_names())
+    dropped = []
+    with engine.begin() as connection:
+        for table_name, names in replaced.items():
+            if table_name not in existing_tables:
+                continue
+            reflected = Table(table_name, MetaData(), autoload_with=connection)
+            for index in reflected.indexes:
+                if index.name in names:
+                    index.drop(connection)
+                    dropped.append(index.name)
+    if dropped:
+        logging.info("Dropped replaced indexes: %s", ", ".join(dropped))
+    return dropped
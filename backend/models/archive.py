@@ -0,0 +1,60 @@
+from models.models import (
+    Availability,
+    ShiftDetail,
+    ShiftSchedule,
+    SkillRequirement,
+    TimeOffRequest,
+)
+from sqlalchemy import Column, DateTime, Index, Table
+from sqlalchemy.types import SchemaType
+from sqlmodel import SQLModel
+
+
+def archive_table(model, *indexes) -> Table:
+    """
+    ``<table>_archive``: the columns of ``model``'s table plus ``archived_at``.
+
+    Rows keep their original ids. There are no foreign keys, so archived
+    history never blocks deleting an employee or location, and the only
+    indexes are the ones history lookups use (tuples of column names).
+    """
+    source = model.__table__
+    name = f"{source.name}_archive"
+    columns = [
+        Column(
+            column.name,
+            # Enum and other schema types belong to one table each
+            column.type.copy() if isinstance(column.type, SchemaType) else column.type,
+            primary_key=column.primary_key,
+            autoincrement=False,
+            nullable=column.nullable,
+        )
+        for column in source.columns
+    ]
+    return Table(
+        name,
+        SQLModel.metadata,
+        *columns,
+        Column("archived_at", DateTime, nullable=False),
+        *(Index(f"ix_{name}_{'_'.join(index)}", *index) for index in indexes),
+    )
+
+
+shift_details_archive = archive_table(ShiftDetail, ("shift_date", "location_id"))
+shift_schedules_archive = archive_table(
+    ShiftSchedule, ("employee_id", "shift_date"), ("shift_id",)
+)
+skill_requirements_archive = archive_table(SkillRequirement, ("shift_id",))
+time_off_requests_archive = archive_table(
+    TimeOffRequest, ("employee_id", "start_date")
+)
+availability_archive = archive_table(Availability, ("employee_id",))
+
+# Hot model -> its archive table
+ARCHIVES = {
+    ShiftDetail: shift_details_archive,
+    ShiftSchedule: shift_schedules_archive,
+    SkillRequirement: skill_requirements_archive,
+    TimeOffRequest: time_off_requests_archive,
+    Availability: availability_archive,
+}
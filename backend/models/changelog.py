@@ -0,0 +1,151 @@
+from datetime import date, datetime, time
+
+from models.models import (
+    ChangeLog,
+    ChangeVersion,
+    ShiftDetail,
+    ShiftSchedule,
+    TimeOffRequest,
+)
+from sqlalchemy import event, insert, select, update
+from sqlmodel import Session
+
+# Entity name and the fields clients get for each tracked table
+TRACKED = {
+    ShiftDetail: (
+        "shift",
+        (
+            "shift_date",
+            "shift_start_time",
+            "shift_end_time",
+            "shift_desc",
+            "capacity",
+            "location_id",
+        ),
+    ),
+    ShiftSchedule: (
+        "assignment",
+        ("employee_id", "shift_id", "shift_date", "location_id"),
+    ),
+    TimeOffRequest: (
+        "time_off",
+        ("employee_id", "start_date", "end_date", "status"),
+    ),
+}
+
+
+def _json_value(value):
+    if isinstance(value, (date, datetime, time)):
+        return value.isoformat()
+    return value
+
+
+def _change(instance, action):
+    entity, fields = TRACKED[type(instance)]
+    return {
+        "entity": entity,
+        "entity_id": instance.id,
+        "action": action,
+        "employee_id": getattr(instance, "employee_id", None),
+        "location_id": getattr(instance, "location_id", None),
+        "payload": (
+            {name: _json_value(getattr(instance, name)) for name in fields}
+            if action == "upsert"
+            else None
+        ),
+    }
+
+
+def _allocate_versions(connection, count: int) -> int:
+    """
+    Reserve ``count`` versions and return the first.
+
+    The counter row stays locked until the transaction ends, so versions
+    become visible in order: a client that has seen version N never later
+    finds a smaller one appear.
+    """
+    row = connection.execute(
+        select(ChangeVersion.version).where(ChangeVersion.id == 1).with_for_update()
+    ).first()
+    if row is None:
+        connection.execute(insert(ChangeVersion).values(id=1, version=count))
+        return 1
+    connection.execute(
+        update(ChangeVersion)
+        .where(ChangeVersion.id == 1)
+        .values(version=ChangeVersion.version + count)
+    )
+    return row.version + 1
+
+
+def ensure_change_counter(session: Session):
+    """Create the counter row up front so first writers never race for it."""
+    if session.get(ChangeVersion, 1) is None:
+        session.add(ChangeVersion(id=1, version=0))
+        session.commit()
+
+
+def record_deletes(session: Session, model, ids) -> int:
+    """
+    Log rows of ``model`` with these ``ids`` as deleted, for deletes made
+    with Core statements, which ``record_changes`` never sees. Call it
+    before the delete; rows of untracked models are ignored.
+    """
+    if model not in TRACKED or not ids:
+        return 0
+    entity, _ = TRACKED[model]
+    scope = [getattr(model, name, None) for name in ("employee_id", "location_id")]
+    rows = session.execute(
+        select(model.id, *(column for column in scope if column is not None))
+        .where(model.id.in_(ids))
+        .order_by(model.id)
+    ).mappings()
+    changes = [
+        {
+            "entity": entity,
+            "entity_id": row["id"],
+            "action": "delete",
+            "employee_id": row.get("employee_id"),
+            "location_id": row.get("location_id"),
+            "payload": None,
+        }
+        for row in rows
+    ]
+    if changes:
+        _insert_changes(session.connection(), changes)
+    return len(changes)
+
+
+def _insert_changes(connection, changes: list):
+    first = _allocate_versions(connection, len(changes))
+    now = datetime.now()
+    connection.execute(
+        insert(ChangeLog),
+        [
+            {"version": first + offset, "created_at": now, **change}
+            for offset, change in enumerate(changes)
+        ],
+    )
+
+
+@event.listens_for(Session, "after_flush")
+def record_changes(session, flush_context):
+    """Append the flushed changes of tracked tables to the change log."""
+    changes = [
+        _change(instance, "upsert")
+        for instance in session.new
+        if type(instance) in TRACKED
+    ]
+    changes += [
+        _change(instance, "upsert")
+        for instance in session.dirty
+        if type(instance) in TRACKED
+        and session.is_modified(instance, include_collections=False)
+    ]
+    changes += [
+        _change(instance, "delete")
+        for instance in session.deleted
+        if type(instance) in TRACKED
+    ]
+    if changes:
+        _insert_changes(session.connection(), changes)
@@ -1,17 +1,127 @@
-import os
+import itertools
+import threading
+import time
+from contextlib import contextmanager
 from typing import Generator
 
+import models.archive  # noqa: F401 - registers the archive tables
+from models.changelog import ensure_change_counter
+from migrations.schema import add_missing_columns, drop_replaced_indexes
+from models.settings import DatabaseSettings
+from sqlalchemy import event
+from sqlalchemy.pool import QueuePool, StaticPool
 from sqlmodel import Session, SQLModel, create_engine
+from utils.instrumentation import instrument_engine
+from utils.metrics import registry
+from utils.replicas import read_from_primary
 
-conn = "mysql+pymysql://{}:{}@{}/{}"
-conn = conn.format(
-    os.getenv("DB_USER"),
-    os.getenv("DB_PASSWORD"),
-    os.getenv("DB_URL_ENDPOINT"),
-    os.getenv("DB_SCHEMA"),
+POOL_CHECKOUT_SECONDS = registry.histogram(
+    "db_pool_checkout_wait_seconds",
+    "Time spent waiting for a connection from the pool.",
+    buckets=(0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 30.0),
 )
+READ_SESSIONS = registry.counter(
+    "db_read_sessions_total",
+    "Read-only sessions opened, by the database serving them.",
+    ("target",),
+)
+
+
+class TimedQueuePool(QueuePool):
+    """
+    QueuePool that records how long each checkout waited for a connection.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._wait_lock = threading.Lock()
+        self.checkouts = 0
+        self.wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+        self.timeouts = 0
+
+    def _do_get(self):
+        started_at = time.perf_counter()
+        try:
+            return super()._do_get()
+        except Exception:
+            with self._wait_lock:
+                self.timeouts += 1
+            raise
+        finally:
+            waited = time.perf_counter() - started_at
+            POOL_CHECKOUT_SECONDS.observe(waited)
+            with self._wait_lock:
+                self.checkouts += 1
+                self.wait_seconds += waited
+                self.max_wait_seconds = max(self.max_wait_seconds, waited)
+
+
+def build_engine(settings: DatabaseSettings):
+    """Create an instrumented engine for the configured backend."""
+    poolclass = StaticPool if settings.is_memory else TimedQueuePool
+    new_engine = create_engine(
+        settings.url, poolclass=poolclass, **settings.engine_kwargs()
+    )
+    if settings.is_sqlite:
+        pragmas = settings.sqlite_pragmas()
+
+        @event.listens_for(new_engine, "connect")
+        def _set_sqlite_pragmas(dbapi_connection, connection_record):
+            cursor = dbapi_connection.cursor()
+            for name, value in pragmas.items():
+                cursor.execute(f"PRAGMA {name}={value}")
+            cursor.close()
+
+    instrument_engine(new_engine)
+    return new_engine
+
+
+settings = DatabaseSettings.from_env()
+
+engine = build_engine(settings)
+replica_engines = [build_engine(replica) for replica in settings.replicas()]
+_next_replica = itertools.cycle(replica_engines)
+_next_replica_lock = threading.Lock()
+
 
-engine = create_engine(conn, pool_size=30, pool_recycle=1800, echo=False)
+def pool_stats(target=None) -> dict:
+    """Live pool occupancy and checkout wait totals for this worker."""
+    pool = (target or engine).pool
+    if not isinstance(pool, QueuePool):
+        return {
+            "pool_size": 1,
+            "checked_in": 0,
+            "checked_out": 0,
+            "overflow": 0,
+            "max_overflow": 0,
+        }
+    stats = {
+        "pool_size": pool.size(),
+        "checked_in": pool.checkedin(),
+        "checked_out": pool.checkedout(),
+        "overflow": max(0, pool.overflow()),
+        "max_overflow": pool._max_overflow,
+    }
+    if isinstance(pool, TimedQueuePool):
+        stats.update(
+            checkouts=pool.checkouts,
+            wait_seconds_total=round(pool.wait_seconds, 6),
+            max_wait_seconds=round(pool.max_wait_seconds, 6),
+            timeouts=pool.timeouts,
+        )
+    return stats
+
+
+registry.gauge(
+    "db_pool_connections",
+    "Connection pool occupancy of this worker.",
+    ("state",),
+    collect=lambda: {
+        (state,): pool_stats()[state]
+        for state in ("pool_size", "checked_in", "checked_out", "overflow")
+    },
+)
 
 
 def get_db() -> Generator[Session, None, None]:
@@ -19,5 +129,40 @@ def get_db() -> Generator[Session, None, None]:
         yield session
 
 
+def read_engine():
+    """
+    The engine for a read-only session: the replicas in turn, or the primary
+    when there are none or the client has just written.
+    """
+    if not replica_engines or read_from_primary.get():
+        READ_SESSIONS.inc(target="primary")
+        return engine
+    with _next_replica_lock:
+        replica = next(_next_replica)
+    READ_SESSIONS.inc(target="replica")
+    return replica
+
+
+@contextmanager
+def read_session() -> Generator[Session, None, None]:
+    with Session(read_engine()) as session:
+        yield session
+
+
+def get_read_db() -> Generator[Session, None, None]:
+    """``get_db`` for endpoints that never write."""
+    with read_session() as session:
+        yield session
+
+
 def init_db():
     SQLModel.metadata.create_all(engine)
+    # create_all skips tables that already exist, so columns and indexes
+    # added to a model later are created here.
+    add_missing_columns(engine, SQLModel.metadata)
+    for table in SQLModel.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(engine, checkfirst=True)
+    drop_replaced_indexes(engine)
+    with Session(engine) as session:
+        ensure_change_counter(session)
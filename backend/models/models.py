@@ -1,6 +1,7 @@
 from datetime import date, datetime, time
 from typing import List, Optional
 
+from sqlalchemy import Index, UniqueConstraint
 from sqlmodel import JSON, Column, Enum, Field, Relationship, SQLModel
 
 
@@ -34,6 +35,7 @@ class Skill(SQLModel, table=True):
 
     # Relationships
     employee_skills: List["EmployeeSkill"] = Relationship(back_populates="skill")
+    requirements: List["SkillRequirement"] = Relationship(back_populates="skill")
 
 
 # Role Table
@@ -113,6 +115,8 @@ class ProductionLine(SQLModel, table=True):
     assignment_name: str = Field(nullable=False)
     no_of_employees_needed: int = Field(nullable=False)
     no_of_employees_attended: Optional[int] = Field(default=None)
+    units_produced: Optional[int] = Field(default=None)
+    production_date: date = Field(default_factory=date.today)
 
     # Foreign Keys
     manager_id: int = Field(foreign_key="managers.id")
@@ -124,9 +128,46 @@ class ProductionLine(SQLModel, table=True):
     location: Optional[Location] = Relationship(back_populates="production_lines")
 
 
+# Attendance Events Table: turnstile clock-ins and clock-outs, written in bulk
+class AttendanceEvent(SQLModel, table=True):
+    __tablename__ = "attendance_events"
+    __table_args__ = (
+        # First clock-in lookups per line and employee
+        Index(
+            "ix_attendance_events_line_employee",
+            "production_line_id",
+            "employee_id",
+            "kind",
+        ),
+    )
+    id: Optional[int] = Field(default=None, primary_key=True)
+    kind: str = Field(
+        sa_column=Column(Enum("in", "out", name="attendance_kind"), nullable=False)
+    )
+    occurred_at: datetime = Field(nullable=False)
+    received_at: datetime = Field(default_factory=datetime.now)
+
+    # Foreign Keys
+    employee_id: int = Field(foreign_key="employees.id")
+    production_line_id: int = Field(foreign_key="production_lines.id")
+
+
 # Shift Schedule Table
 class ShiftSchedule(SQLModel, table=True):
     __tablename__ = "shift_schedules"
+    __table_args__ = (
+        # Covers per-employee schedule reads: the date range scan returns the
+        # shift, type and location without touching the table rows. Replaces
+        # ix_shift_schedules_employee_date, which lacked shift_type.
+        Index(
+            "ix_shift_schedules_employee_schedule",
+            "employee_id",
+            "shift_date",
+            "shift_id",
+            "location_id",
+            "shift_type",
+        ),
+    )
     id: Optional[int] = Field(default=None, primary_key=True)
     shift_date: date = Field(nullable=False)
     shift_type: str = Field(nullable=False)
@@ -134,6 +175,9 @@ class ShiftSchedule(SQLModel, table=True):
     # Foreign Keys
     employee_id: int = Field(foreign_key="employees.id")
     location_id: int = Field(foreign_key="locations.id")
+    shift_id: Optional[int] = Field(
+        default=None, foreign_key="shift_details.id", index=True
+    )
 
     # Relationships
     employee: Optional[Employee] = Relationship(back_populates="shift_schedules")
@@ -159,6 +203,9 @@ class Availability(SQLModel, table=True):
 # Time Off Requests Table
 class TimeOffRequest(SQLModel, table=True):
     __tablename__ = "time_off_requests"
+    __table_args__ = (
+        Index("ix_time_off_requests_employee_dates", "employee_id", "start_date"),
+    )
     id: Optional[int] = Field(default=None, primary_key=True)
     request_date: date = Field(nullable=True)
     start_date: date = Field(nullable=False)
@@ -194,6 +241,30 @@ class EmployeeSkill(SQLModel, table=True):
     skill: Optional[Skill] = Relationship(back_populates="employee_skills")
 
 
+# Skill Requirements Table
+class SkillRequirement(SQLModel, table=True):
+    __tablename__ = "skill_requirements"
+    id: Optional[int] = Field(default=None, primary_key=True)
+    min_level: str = Field(
+        sa_column=Column(
+            Enum("Beginner", "Intermediate", "Advanced", name="skill_level_enum"),
+            nullable=False,
+        )
+    )
+
+    # Foreign Keys (a requirement belongs to a shift or a production line)
+    skill_id: int = Field(foreign_key="skills.id")
+    shift_id: Optional[int] = Field(
+        default=None, foreign_key="shift_details.id", index=True
+    )
+    production_line_id: Optional[int] = Field(
+        default=None, foreign_key="production_lines.id", index=True
+    )
+
+    # Relationships
+    skill: Optional[Skill] = Relationship(back_populates="requirements")
+
+
 # Manager Table
 class Manager(SQLModel, table=True):
     __tablename__ = "managers"
@@ -204,3 +275,67 @@ class Manager(SQLModel, table=True):
     locations: List["Location"] = Relationship(back_populates="manager")
     shifts: List["ShiftDetail"] = Relationship(back_populates="manager")
     production_lines: List["ProductionLine"] = Relationship(back_populates="manager")
+
+
+# KPI Rollup Table
+class KpiRollup(SQLModel, table=True):
+    __tablename__ = "kpi_rollups"
+    __table_args__ = (
+        UniqueConstraint("scope", "scope_id", "week_start", name="uq_kpi_rollup_key"),
+    )
+    id: Optional[int] = Field(default=None, primary_key=True)
+    scope: str = Field(
+        sa_column=Column(Enum("line", "location", name="kpi_scope"), nullable=False)
+    )
+    scope_id: int = Field(nullable=False)
+    week_start: date = Field(nullable=False)
+    employees_needed: int = Field(default=0)
+    employees_attended: int = Field(default=0)
+    units_produced: int = Field(default=0)
+    line_count: int = Field(default=0)
+    updated_at: datetime = Field(default_factory=datetime.now)
+
+
+# Feed Revision Table: bumped whenever the assignments behind a calendar feed
+# change, so cached feeds know when to re-render
+class FeedRevision(SQLModel, table=True):
+    __tablename__ = "feed_revisions"
+    __table_args__ = (
+        UniqueConstraint("scope", "scope_id", name="uq_feed_revision_key"),
+    )
+    id: Optional[int] = Field(default=None, primary_key=True)
+    scope: str = Field(
+        sa_column=Column(
+            Enum("employee", "location", name="feed_scope"), nullable=False
+        )
+    )
+    scope_id: int = Field(nullable=False)
+    revision: int = Field(default=0)
+    updated_at: datetime = Field(default_factory=datetime.now)
+
+
+# Change Log Tables: every insert, update and delete of shifts, assignments
+# and time off requests, numbered by a single counter row
+class ChangeVersion(SQLModel, table=True):
+    __tablename__ = "change_versions"
+    id: int = Field(default=1, primary_key=True)
+    version: int = Field(default=0)
+
+
+class ChangeLog(SQLModel, table=True):
+    __tablename__ = "change_log"
+    version: int = Field(primary_key=True)
+    entity: str = Field(
+        sa_column=Column(
+            Enum("shift", "assignment", "time_off", name="change_entity"),
+            nullable=False,
+        )
+    )
+    entity_id: int = Field(nullable=False)
+    action: str = Field(
+        sa_column=Column(Enum("upsert", "delete", name="change_action"), nullable=False)
+    )
+    employee_id: Optional[int] = Field(default=None, index=True)
+    location_id: Optional[int] = Field(default=None, index=True)
+    payload: Optional[dict] = Field(default=None, sa_column=Column(JSON))
+    created_at: datetime = Field(default_factory=datetime.now)
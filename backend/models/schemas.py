@@ -1,7 +1,7 @@
 from datetime import date, datetime, time
-from typing import List, Literal, Optional
+from typing import List, Literal, Optional, Tuple
 
-from pydantic import BaseModel, EmailStr, Field, field_validator
+from pydantic import BaseModel, EmailStr, Field, field_validator, model_validator
 from sqlmodel import SQLModel
 
 
@@ -110,6 +110,8 @@ class ProductionLineBase(SQLModel):
     assignment_name: str
     no_of_employees_needed: int
     no_of_employees_attended: int = 0  # Default to 0
+    units_produced: Optional[int] = None
+    production_date: date = Field(default_factory=date.today)
 
 
 class ProductionLineCreate(ProductionLineBase):
@@ -118,6 +120,15 @@ class ProductionLineCreate(ProductionLineBase):
     shift_id: Optional[int] = None
 
 
+class ProductionLineUpdate(SQLModel):
+    assignment_name: Optional[str] = None
+    no_of_employees_needed: Optional[int] = None
+    no_of_employees_attended: Optional[int] = None
+    units_produced: Optional[int] = None
+    production_date: Optional[date] = None
+    shift_id: Optional[int] = None
+
+
 class ProductionLineResponse(ProductionLineBase):
     id: int
     manager_id: int
@@ -125,6 +136,33 @@ class ProductionLineResponse(ProductionLineBase):
     shift_id: Optional[int] = None
 
 
+# Attendance Models
+class AttendanceEventCreate(SQLModel):
+    employee_id: int
+    production_line_id: int
+    kind: Literal["in", "out"]
+    occurred_at: datetime
+
+
+class AttendanceAccepted(SQLModel):
+    accepted: int
+    buffered: int  # Events waiting for the next bulk write in this worker
+
+
+# KPI Models
+class KpiResponse(SQLModel):
+    scope: Literal["line", "location"]
+    scope_id: int
+    week_start: date
+    employees_needed: int
+    employees_attended: int
+    units_produced: int
+    line_count: int
+    attendance_rate: Optional[float] = None
+    staffing_gap: int
+    output_per_head: Optional[float] = None
+
+
 # Shift Schedule Models
 class ShiftScheduleBase(SQLModel):
     shift_date: date
@@ -142,6 +180,34 @@ class ShiftScheduleResponse(ShiftScheduleBase):
     location_id: int
 
 
+class ScheduledShift(SQLModel):
+    shift_id: Optional[int] = None
+    shift_date: date
+    shift_type: str
+    shift_desc: Optional[str] = None
+    shift_start_time: Optional[time] = None
+    shift_end_time: Optional[time] = None
+    location_id: int
+    location_name: Optional[str] = None
+    on_leave: bool  # Falls inside approved time off
+
+
+class ScheduleTimeOff(SQLModel):
+    id: int
+    start_date: date
+    end_date: date
+    status: str
+    reason_for_absence: Optional[str] = None
+
+
+class EmployeeScheduleResponse(SQLModel):
+    employee_id: int
+    first_day: date
+    last_day: date
+    shifts: List[ScheduledShift]
+    time_off: List[ScheduleTimeOff]
+
+
 # Availability Models
 class AvailabilityBase(SQLModel):
     day_of_week: Literal[
@@ -187,6 +253,20 @@ class TimeOffRequestResponse(TimeOffRequestBase):
     employee_id: int
 
 
+class TimeOffStatusUpdate(SQLModel):
+    status: Literal["Pending", "Approved", "Denied"]
+
+
+class TimeOffDecisionResponse(SQLModel):
+    request: TimeOffRequestResponse
+    removed_assignments: List[Tuple[int, int]]  # (employee_id, shift_id)
+    added_assignments: List[Tuple[int, int]]
+    affected_shift_ids: List[int]
+    # Set when the decision was stored but the plan could not be updated;
+    # re-run /shifts/schedule for the window to apply it.
+    replan_error: Optional[str] = None
+
+
 # Employee Skills Models
 class EmployeeSkillBase(SQLModel):
     skill_level: Literal["Beginner", "Intermediate", "Advanced"]
@@ -201,10 +281,30 @@ class EmployeeSkillResponse(EmployeeSkillBase):
     id: int
     employee_id: int
     skill_id: int
-    verified: bool
+    verified: bool = False
     last_verified_at: Optional[datetime] = None
 
 
+# Skill Requirement Models
+class SkillRequirementBase(SQLModel):
+    skill_id: int
+    min_level: Literal["Beginner", "Intermediate", "Advanced"]
+    shift_id: Optional[int] = None
+    production_line_id: Optional[int] = None
+
+
+class SkillRequirementCreate(SkillRequirementBase):
+    @model_validator(mode="after")
+    def check_target(self):
+        if (self.shift_id is None) == (self.production_line_id is None):
+            raise ValueError("Set exactly one of shift_id or production_line_id")
+        return self
+
+
+class SkillRequirementResponse(SkillRequirementBase):
+    id: int
+
+
 # Manager Models
 class ManagerBase(SQLModel):
     manager_role: str
@@ -232,3 +332,141 @@ class SchedulingAssignment(SQLModel):
 
 class SchedulingResponse(SQLModel):
     assignments: List[SchedulingAssignment]
+
+
+def check_disruption(disruption):
+    if disruption.kind == "employee_unavailable":
+        if None in (disruption.employee_id, disruption.start_date, disruption.end_date):
+            raise ValueError(
+                "employee_unavailable needs employee_id, start_date and end_date"
+            )
+        if disruption.end_date < disruption.start_date:
+            raise ValueError("end_date must not be before start_date")
+    elif disruption.shift_id is None:
+        raise ValueError(f"{disruption.kind} needs shift_id")
+    return disruption
+
+
+class Disruption(SQLModel):
+    kind: Literal["employee_unavailable", "shift_added", "shift_removed"]
+    employee_id: Optional[int] = None
+    start_date: Optional[date] = None
+    end_date: Optional[date] = None
+    shift_id: Optional[int] = None
+
+    @model_validator(mode="after")
+    def check_fields(self):
+        return check_disruption(self)
+
+
+class RepairResponse(SQLModel):
+    status: str  # Solver status; the plan is unchanged unless OPTIMAL/FEASIBLE
+    neighbourhood_shift_ids: List[int]
+    removed_assignments: List[Tuple[int, int]]  # (employee_id, shift_id)
+    added_assignments: List[Tuple[int, int]]
+    solve_seconds: float
+
+
+class ScenarioShift(ShiftDetailBase):
+    location_id: int
+
+
+class Perturbation(Disruption):
+    # A hypothetical shift for "shift_added" instead of an existing shift_id
+    new_shift: Optional[ScenarioShift] = None
+
+    @model_validator(mode="after")
+    def check_fields(self):
+        if self.kind == "shift_added" and self.new_shift is not None:
+            return self
+        return check_disruption(self)
+
+
+class Scenario(SQLModel):
+    name: str
+    perturbations: List[Perturbation] = Field(..., min_length=1)
+
+
+class ScenarioRequest(SQLModel):
+    scenarios: List[Scenario] = Field(..., min_length=1, max_length=100)
+
+
+class ScenarioResult(SQLModel):
+    name: str
+    status: str  # Solver status; metrics are only set for OPTIMAL/FEASIBLE
+    neighbourhood_shifts: int
+    solve_seconds: float
+    assigned: Optional[int] = None
+    slots: Optional[int] = None
+    coverage: Optional[float] = None  # assigned / slots
+    coverage_delta: Optional[float] = None  # against the base plan
+    churn: Optional[int] = None  # removed + added assignments
+    removed_assignments: Optional[int] = None
+    added_assignments: Optional[int] = None
+    affected_employees: Optional[int] = None
+
+
+class CoverageGap(SQLModel):
+    location_id: int
+    start: datetime
+    end: datetime
+    min_available: int
+    peak_demand: int  # Sum of the capacity of the shifts running
+    shortfall: int  # Largest demand minus available within the window
+    shift_ids: List[int]
+
+
+class CoveragePoint(SQLModel):
+    location_id: int
+    start: datetime
+    end: datetime
+    available: int  # Minimum within a bucket
+    demand: int  # Maximum within a bucket
+    uncovered_minutes: int
+
+
+class CoverageResponse(SQLModel):
+    first_day: date
+    last_day: date
+    resolution: Literal["event", "hour", "day"]
+    gaps: List[CoverageGap]
+    curve: List[CoveragePoint]
+
+
+class ChangeEntry(SQLModel):
+    version: int
+    entity: Literal["shift", "assignment", "time_off"]
+    id: int
+    action: Literal["upsert", "delete"]
+    data: Optional[dict] = None  # Current fields on upsert, null on delete
+
+
+class ChangesResponse(SQLModel):
+    version: int  # Pass as ?since= on the next poll
+    has_more: bool
+    changes: List[ChangeEntry]
+
+
+# History (hot and archived rows)
+class HistoricalShift(ShiftDetailResponse):
+    archived: bool
+
+
+class HistoricalAssignment(SQLModel):
+    id: int
+    shift_date: date
+    shift_type: str
+    employee_id: int
+    location_id: int
+    shift_id: Optional[int] = None
+    archived: bool
+
+
+class HistoricalTimeOff(TimeOffRequestResponse):
+    request_date: Optional[date] = None
+    archived: bool
+
+
+class HistoricalAvailability(AvailabilityResponse):
+    date_of_week: str  # Stored as text
+    archived: bool
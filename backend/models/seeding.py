@@ -23,7 +23,8 @@ from models.schemas import (
     SkillCreate,
     TimeOffRequestCreate,
 )
-from sqlmodel import Session
+from services.kpi import rebuild_kpis
+from sqlmodel import Session, select
 
 
 def prepopulate_data(session: Session):
@@ -224,4 +225,16 @@ def prepopulate_data(session: Session):
     session.add_all(time_off_request)
     # Commit the session to save data to the database
     session.commit()
+    rebuild_kpis(session)
     logging.info("Dummy data prepopulated successfully.")
+
+
+def seed_if_empty(session: Session) -> bool:
+    """
+    Prepopulate the dummy data unless the database already holds locations.
+    """
+    if session.exec(select(Location)).first() is not None:
+        logging.info("Database already seeded, skipping dummy data.")
+        return False
+    prepopulate_data(session=session)
+    return True
@@ -0,0 +1,205 @@
+import logging
+import os
+from dataclasses import dataclass, field, replace
+from typing import List, Optional
+
+
+def _env_int(name: str, default: Optional[int] = None) -> Optional[int]:
+    value = os.getenv(name)
+    return int(value) if value not in (None, "") else default
+
+
+def _env_list(name: str) -> List[str]:
+    return [item.strip() for item in os.getenv(name, "").split(",") if item.strip()]
+
+
+def _env_bool(name: str, default: bool) -> bool:
+    value = os.getenv(name)
+    if value in (None, ""):
+        return default
+    return value.lower() in ("1", "true", "yes", "on")
+
+
+@dataclass
+class DatabaseSettings:
+    """
+    Connection and pool settings for one worker process.
+
+    Pools are sized from a connection budget shared by all workers
+    (``DB_MAX_CONNECTIONS`` / ``WEB_CONCURRENCY``) so adding workers never
+    exceeds what the database server accepts. ``DB_POOL_SIZE`` and
+    ``DB_MAX_OVERFLOW`` override the derived values but are clamped to the
+    worker's share of the budget.
+
+    ``DB_BACKEND=sqlite`` switches to an embedded database at ``SQLITE_PATH``
+    (``:memory:`` for a process-local in-memory database) for tests,
+    benchmarks and small sites without a database server.
+
+    Read replicas are listed in ``DB_REPLICA_ENDPOINTS`` (same credentials
+    and schema as the primary) or, for SQLite, ``SQLITE_REPLICA_PATHS``.
+    Each replica gets a pool of the same size, since it has its own budget.
+    """
+
+    backend: str = "mysql"
+    sqlite_path: str = "ess.db"
+    sqlite_cache_size_kb: int = 65536
+    sqlite_mmap_size_mb: int = 256
+    sqlite_busy_timeout_ms: int = 5000
+    user: Optional[str] = None
+    password: Optional[str] = None
+    endpoint: Optional[str] = None
+    schema: Optional[str] = None
+    workers: int = 1
+    max_connections: int = 100
+    pool_size: int = 5
+    max_overflow: int = 5
+    pool_timeout: int = 30
+    pool_recycle: int = 1800
+    pool_pre_ping: bool = True
+    connect_timeout: int = 10
+    read_timeout: int = 60
+    write_timeout: int = 60
+    echo: bool = False
+    connect_args: dict = field(default_factory=dict)
+    replica_endpoints: List[str] = field(default_factory=list)
+    replica_sticky_seconds: int = 5
+
+    @property
+    def per_worker_budget(self) -> int:
+        return max(1, self.max_connections // max(1, self.workers))
+
+    @classmethod
+    def from_env(cls) -> "DatabaseSettings":
+        settings = cls(
+            backend=os.getenv("DB_BACKEND", "mysql").lower(),
+            sqlite_path=os.getenv("SQLITE_PATH", "ess.db"),
+            sqlite_cache_size_kb=_env_int("SQLITE_CACHE_SIZE_KB", 65536),
+            sqlite_mmap_size_mb=_env_int("SQLITE_MMAP_SIZE_MB", 256),
+            sqlite_busy_timeout_ms=_env_int("SQLITE_BUSY_TIMEOUT_MS", 5000),
+            user=os.getenv("DB_USER"),
+            password=os.getenv("DB_PASSWORD"),
+            endpoint=os.getenv("DB_URL_ENDPOINT"),
+            schema=os.getenv("DB_SCHEMA"),
+            workers=_env_int("WEB_CONCURRENCY", 1),
+            max_connections=_env_int("DB_MAX_CONNECTIONS", 100),
+            pool_timeout=_env_int("DB_POOL_TIMEOUT", 30),
+            pool_recycle=_env_int("DB_POOL_RECYCLE", 1800),
+            pool_pre_ping=_env_bool("DB_POOL_PRE_PING", True),
+            connect_timeout=_env_int("DB_CONNECT_TIMEOUT", 10),
+            read_timeout=_env_int("DB_READ_TIMEOUT", 60),
+            write_timeout=_env_int("DB_WRITE_TIMEOUT", 60),
+            echo=_env_bool("DB_ECHO", False),
+            replica_endpoints=_env_list(
+                "SQLITE_REPLICA_PATHS"
+                if os.getenv("DB_BACKEND", "mysql").lower() == "sqlite"
+                else "DB_REPLICA_ENDPOINTS"
+            ),
+            replica_sticky_seconds=_env_int("DB_REPLICA_STICKY_SECONDS", 5),
+        )
+        settings.size_pool(
+            pool_size=_env_int("DB_POOL_SIZE"),
+            max_overflow=_env_int("DB_MAX_OVERFLOW"),
+        )
+        return settings
+
+    def size_pool(
+        self, pool_size: Optional[int] = None, max_overflow: Optional[int] = None
+    ):
+        """
+        Split this worker's share of the budget into a steady pool and an
+        overflow allowance (two thirds / one third unless overridden).
+        """
+        budget = self.per_worker_budget
+        if self.workers > self.max_connections:
+            logging.warning(
+                f"{self.workers} workers with one connection each exceed "
+                f"DB_MAX_CONNECTIONS={self.max_connections}."
+            )
+        if pool_size is None:
+            pool_size = max(1, budget * 2 // 3)
+        if max_overflow is None:
+            max_overflow = max(0, budget - pool_size)
+        if pool_size + max_overflow > budget:
+            logging.warning(
+                f"DB pool of {pool_size}+{max_overflow} exceeds the per-worker "
+                f"budget of {budget} connections; clamping."
+            )
+            pool_size = min(pool_size, budget)
+            max_overflow = max(0, budget - pool_size)
+        self.pool_size = pool_size
+        self.max_overflow = max_overflow
+
+    def replicas(self) -> List["DatabaseSettings"]:
+        """Settings for each read replica; none for an in-memory database."""
+        if self.is_memory:
+            return []
+        target = "sqlite_path" if self.is_sqlite else "endpoint"
+        return [
+            replace(self, replica_endpoints=[], **{target: endpoint})
+            for endpoint in self.replica_endpoints
+        ]
+
+    @property
+    def is_sqlite(self) -> bool:
+        return self.backend == "sqlite"
+
+    @property
+    def is_memory(self) -> bool:
+        return self.is_sqlite and self.sqlite_path in ("", ":memory:")
+
+    @property
+    def url(self) -> str:
+        if self.is_memory:
+            return "sqlite://"
+        if self.is_sqlite:
+            return f"sqlite:///{self.sqlite_path}"
+        return "mysql+pymysql://{}:{}@{}/{}".format(
+            self.user, self.password, self.endpoint, self.schema
+        )
+
+    def sqlite_pragmas(self) -> dict:
+        """Pragmas applied to every new SQLite connection."""
+        pragmas = {
+            "foreign_keys": "ON",
+            "synchronous": "NORMAL",
+            "temp_store": "MEMORY",
+            "cache_size": -self.sqlite_cache_size_kb,
+            "busy_timeout": self.sqlite_busy_timeout_ms,
+        }
+        if not self.is_memory:
+            # WAL lets readers proceed while a writer commits; it only applies
+            # to file databases.
+            pragmas["journal_mode"] = "WAL"
+            pragmas["mmap_size"] = self.sqlite_mmap_size_mb * 1024 * 1024
+        return pragmas
+
+    def engine_kwargs(self) -> dict:
+        if self.is_memory:
+            # One shared connection, otherwise each checkout sees an empty DB.
+            return {"echo": self.echo, "connect_args": {"check_same_thread": False}}
+        if self.is_sqlite:
+            return {
+                "pool_size": self.pool_size,
+                "max_overflow": self.max_overflow,
+                "pool_timeout": self.pool_timeout,
+                "echo": self.echo,
+                "connect_args": {
+                    "check_same_thread": False,
+                    "timeout": self.sqlite_busy_timeout_ms / 1000,
+                    **self.connect_args,
+                },
+            }
+        return {
+            "pool_size": self.pool_size,
+            "max_overflow": self.max_overflow,
+            "pool_timeout": self.pool_timeout,
+            "pool_recycle": self.pool_recycle,
+            "pool_pre_ping": self.pool_pre_ping,
+            "echo": self.echo,
+            "connect_args": {
+                "connect_timeout": self.connect_timeout,
+                "read_timeout": self.read_timeout,
+                "write_timeout": self.write_timeout,
+                **self.connect_args,
+            },
+        }
@@ -1 +1,3 @@
-exec uvicorn main:app --host 0.0.0.0 --port 8080
\ No newline at end of file
+python manage.py init-db
+python manage.py seed
+exec uvicorn main:app --host 0.0.0.0 --port 8080 --workers ${WEB_CONCURRENCY:-1}
@@ -0,0 +1,25 @@
+from datetime import datetime
+from typing import List, Union
+
+from fastapi import APIRouter
+from models.schemas import AttendanceAccepted, AttendanceEventCreate
+from services.attendance import attendance_buffer
+from utils.profiling import ProfiledRoute
+
+router = APIRouter(route_class=ProfiledRoute)
+
+
+@router.post("/events", response_model=AttendanceAccepted, status_code=202)
+def ingest_events(events: Union[AttendanceEventCreate, List[AttendanceEventCreate]]):
+    """
+    Accept one clock-in/clock-out event or a batch of them. Events are
+    written in bulk shortly after; 429 means the buffer is full, resend
+    after Retry-After.
+    """
+    if not isinstance(events, list):
+        events = [events]
+    received_at = datetime.now()
+    buffered = attendance_buffer.add(
+        [{**event.model_dump(), "received_at": received_at} for event in events]
+    )
+    return {"accepted": len(events), "buffered": buffered}
@@ -0,0 +1,29 @@
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from models.database import get_read_db
+from models.schemas import ChangesResponse
+from services.changes import changes_since
+from sqlmodel import Session
+from utils.profiling import ProfiledRoute
+from utils.serialization import FastJSONResponse
+
+router = APIRouter(route_class=ProfiledRoute)
+
+
+@router.get("/", response_model=ChangesResponse)
+def get_changes(
+    since: int = Query(0, ge=0),
+    limit: int = Query(1000, ge=1, le=10000),
+    employee_id: Optional[int] = None,
+    location_id: Optional[int] = None,
+    session: Session = Depends(get_read_db),
+):
+    changes = changes_since(session, since, limit, employee_id, location_id)
+    if changes is None:
+        raise HTTPException(
+            status_code=410,
+            detail="Changes since this version were pruned; resync from the "
+            "list endpoints and continue from the current version.",
+        )
+    return FastJSONResponse(changes)
@@ -1,29 +1,57 @@
-from typing import List
+from datetime import date, timedelta
+from typing import List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, status
-from models.database import get_db
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from models.database import get_db, get_read_db
 from models.models import Availability, Employee
-from models.schemas import AvailabilityResponse, EmployeeCreate, EmployeeResponse
+from models.schemas import (
+    AvailabilityResponse,
+    EmployeeCreate,
+    EmployeeResponse,
+    EmployeeScheduleResponse,
+)
+from services.schedules import employee_schedule
 from sqlalchemy.exc import IntegrityError
-from sqlmodel import Session, select
+from sqlmodel import Session
+from utils.profiling import ProfiledRoute
+from utils.serialization import FastJSONResponse, rows_response
 
-router = APIRouter()
+router = APIRouter(route_class=ProfiledRoute)
 
 
 @router.get("/", response_model=list[EmployeeResponse])
-def get_employees(session: Session = Depends(get_db)):
-    employees = session.exec(select(Employee)).all()
-    return employees
+def get_employees(session: Session = Depends(get_read_db)):
+    return rows_response(session, Employee, EmployeeResponse)
 
 
 @router.get("/{employee_id}", response_model=EmployeeResponse)
-def get_employee(employee_id: int, session: Session = Depends(get_db)):
+def get_employee(employee_id: int, session: Session = Depends(get_read_db)):
     employee = session.get(Employee, employee_id)
     if not employee:
         raise HTTPException(status_code=404, detail="Employee not found")
     return employee
 
 
+@router.get("/{employee_id}/schedule", response_model=EmployeeScheduleResponse)
+def get_employee_schedule(
+    employee_id: int,
+    first_day: Optional[date] = Query(None, alias="from"),
+    last_day: Optional[date] = Query(None, alias="to"),
+    session: Session = Depends(get_read_db),
+):
+    first_day = first_day or date.today()
+    last_day = last_day or first_day + timedelta(days=13)
+    if last_day < first_day:
+        raise HTTPException(status_code=400, detail="'to' is before 'from'")
+    if (last_day - first_day).days > 92:
+        raise HTTPException(status_code=400, detail="Range is limited to 93 days")
+    if not session.get(Employee, employee_id):
+        raise HTTPException(status_code=404, detail="Employee not found")
+    return FastJSONResponse(
+        employee_schedule(session, employee_id, first_day, last_day)
+    )
+
+
 @router.post("/create", response_model=EmployeeResponse)
 def create_employee(employee: EmployeeCreate, session: Session = Depends(get_db)):
     try:
@@ -50,11 +78,14 @@ def create_employee(employee: EmployeeCreate, session: Session = Depends(get_db)
     "/employees/{employee_id}/availability", response_model=List[AvailabilityResponse]
 )
 async def get_employee_availability(
-    employee_id: int, session: Session = Depends(get_db)
+    employee_id: int, session: Session = Depends(get_read_db)
 ):
-    return session.exec(
-        select(Availability).where(Availability.employee_id == employee_id)
-    ).all()
+    return rows_response(
+        session,
+        Availability,
+        AvailabilityResponse,
+        Availability.employee_id == employee_id,
+    )
 
 
 @router.delete("/delete/{employee_id}")
@@ -0,0 +1,51 @@
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Response
+from models.database import get_read_db
+from services.feeds import get_feed
+from sqlmodel import Session
+from utils.profiling import ProfiledRoute
+
+router = APIRouter(route_class=ProfiledRoute)
+
+CALENDAR_MEDIA_TYPE = "text/calendar; charset=utf-8"
+
+
+def feed_response(
+    session: Session,
+    scope: str,
+    scope_id: int,
+    if_none_match: Optional[str],
+    if_modified_since: Optional[str],
+) -> Response:
+    served = get_feed(session, scope, scope_id, if_none_match, if_modified_since)
+    if served is None:
+        raise HTTPException(status_code=404, detail=f"{scope.capitalize()} not found")
+    status_code, body, headers = served
+    if status_code == 304:
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type=CALENDAR_MEDIA_TYPE, headers=headers)
+
+
+@router.get("/employees/{employee_id}.ics", response_class=Response)
+def get_employee_feed(
+    employee_id: int,
+    if_none_match: Optional[str] = Header(None),
+    if_modified_since: Optional[str] = Header(None),
+    session: Session = Depends(get_read_db),
+):
+    return feed_response(
+        session, "employee", employee_id, if_none_match, if_modified_since
+    )
+
+
+@router.get("/locations/{location_id}.ics", response_class=Response)
+def get_location_feed(
+    location_id: int,
+    if_none_match: Optional[str] = Header(None),
+    if_modified_since: Optional[str] = Header(None),
+    session: Session = Depends(get_read_db),
+):
+    return feed_response(
+        session, "location", location_id, if_none_match, if_modified_since
+    )
@@ -0,0 +1,74 @@
+from datetime import date, timedelta
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from models.database import get_read_db
+from models.schemas import (
+    HistoricalAssignment,
+    HistoricalAvailability,
+    HistoricalShift,
+    HistoricalTimeOff,
+)
+from services.archive import (
+    HISTORY_MAX_DAYS,
+    assignment_history,
+    availability_history,
+    shift_history,
+    time_off_history,
+)
+from sqlmodel import Session
+from utils.profiling import ProfiledRoute
+from utils.serialization import FastJSONResponse
+
+router = APIRouter(route_class=ProfiledRoute)
+
+
+def history_range(
+    first_day: date = Query(..., alias="from"),
+    last_day: Optional[date] = Query(None, alias="to"),
+) -> tuple:
+    last_day = last_day or first_day + timedelta(days=HISTORY_MAX_DAYS - 1)
+    if last_day < first_day:
+        raise HTTPException(status_code=400, detail="'to' is before 'from'")
+    if (last_day - first_day).days >= HISTORY_MAX_DAYS:
+        raise HTTPException(
+            status_code=400, detail=f"Range is limited to {HISTORY_MAX_DAYS} days"
+        )
+    return first_day, last_day
+
+
+@router.get("/shifts", response_model=list[HistoricalShift])
+def get_shift_history(
+    days: tuple = Depends(history_range),
+    location_id: Optional[int] = None,
+    session: Session = Depends(get_read_db),
+):
+    return FastJSONResponse(shift_history(session, *days, location_id))
+
+
+@router.get("/assignments", response_model=list[HistoricalAssignment])
+def get_assignment_history(
+    days: tuple = Depends(history_range),
+    employee_id: Optional[int] = None,
+    location_id: Optional[int] = None,
+    session: Session = Depends(get_read_db),
+):
+    return FastJSONResponse(
+        assignment_history(session, *days, employee_id, location_id)
+    )
+
+
+@router.get("/time-off", response_model=list[HistoricalTimeOff])
+def get_time_off_history(
+    days: tuple = Depends(history_range),
+    employee_id: Optional[int] = None,
+    session: Session = Depends(get_read_db),
+):
+    return FastJSONResponse(time_off_history(session, *days, employee_id))
+
+
+@router.get("/availability/{employee_id}", response_model=list[HistoricalAvailability])
+def get_availability_history(
+    employee_id: int, session: Session = Depends(get_read_db)
+):
+    return FastJSONResponse(availability_history(session, employee_id))
@@ -0,0 +1,40 @@
+from datetime import date
+from typing import Literal, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from models.database import get_db, get_read_db
+from models.schemas import KpiResponse
+from services.kpi import get_kpi, kpi_history, kpi_view, rebuild_kpis
+from sqlmodel import Session
+from utils.profiling import ProfiledRoute
+
+router = APIRouter(route_class=ProfiledRoute)
+
+
+@router.get("/{scope}/{scope_id}", response_model=KpiResponse)
+def get_weekly_kpi(
+    scope: Literal["line", "location"],
+    scope_id: int,
+    week: Optional[date] = None,
+    session: Session = Depends(get_read_db),
+):
+    rollup = get_kpi(session, scope, scope_id, week or date.today())
+    if not rollup:
+        raise HTTPException(status_code=404, detail="No KPIs recorded for this week")
+    return kpi_view(rollup)
+
+
+@router.get("/{scope}/{scope_id}/history", response_model=list[KpiResponse])
+def get_kpi_history(
+    scope: Literal["line", "location"],
+    scope_id: int,
+    weeks: int = Query(default=12, ge=1, le=520),
+    session: Session = Depends(get_read_db),
+):
+    return [kpi_view(rollup) for rollup in kpi_history(session, scope, scope_id, weeks)]
+
+
+@router.post("/rebuild")
+def rebuild(session: Session = Depends(get_db)):
+    rollups = rebuild_kpis(session)
+    return {"detail": f"Rebuilt {rollups} KPI rollups"}
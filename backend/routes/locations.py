@@ -1,21 +1,22 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from models.database import get_db
+from models.database import get_db, get_read_db
 from models.models import Location
 from models.schemas import LocationCreate, LocationResponse
 from sqlalchemy.exc import IntegrityError
-from sqlmodel import Session, select
+from sqlmodel import Session
+from utils.profiling import ProfiledRoute
+from utils.serialization import rows_response
 
-router = APIRouter()
+router = APIRouter(route_class=ProfiledRoute)
 
 
 @router.get("/", response_model=list[LocationResponse])
-def get_locations(session: Session = Depends(get_db)):
-    locations = session.exec(select(Location)).all()
-    return locations
+def get_locations(session: Session = Depends(get_read_db)):
+    return rows_response(session, Location, LocationResponse)
 
 
 @router.get("/{location_id}", response_model=LocationResponse)
-def get_location(location_id: int, session: Session = Depends(get_db)):
+def get_location(location_id: int, session: Session = Depends(get_read_db)):
     location = session.get(Location, location_id)
     if not location:
         raise HTTPException(status_code=404, detail="Location not found")
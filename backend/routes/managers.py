@@ -1,21 +1,24 @@
 import random
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from fastapi.responses import JSONResponse
-from models.database import get_db
+from models.database import get_db, get_read_db
 from models.models import Manager, ProductionLine
 from models.schemas import ManagerCreate, ManagerResponse
 from sqlalchemy.exc import IntegrityError
 from sqlmodel import Session, select
+from src.llm import timings
 from src.reporting import report_generation_api, predict_headcount_api
+from utils.admission import llm_pool, run_guarded
+from utils.profiling import ProfiledRoute
+from utils.serialization import rows_response
 
-router = APIRouter()
+router = APIRouter(route_class=ProfiledRoute)
 
 
 @router.get("/", response_model=list[ManagerResponse])
-def get_managers(session: Session = Depends(get_db)):
-    managers = session.exec(select(Manager)).all()
-    return managers
+def get_managers(session: Session = Depends(get_read_db)):
+    return rows_response(session, Manager, ManagerResponse)
 
 
 @router.post("/create", response_model=ManagerResponse)
@@ -41,13 +44,18 @@ def create_manager(manager: ManagerCreate, session: Session = Depends(get_db)):
 
 
 @router.get("/generate-report")
-def generate_report(session: Session = Depends(get_db)):
+def generate_report(session: Session = Depends(get_read_db)):
     production_line = session.exec(select(ProductionLine)).first()
-    text = report_generation_api(
-        employees_needed=production_line.no_of_employees_needed,
-        employees_attended=production_line.no_of_employees_attended,
-        factory_output=random.randint(500, 600),
-        factory_target=random.randint(550, 600),
+    # Concurrent callers share one LLM call
+    text = run_guarded(
+        ("report",),
+        llm_pool,
+        lambda: report_generation_api(
+            employees_needed=production_line.no_of_employees_needed,
+            employees_attended=production_line.no_of_employees_attended,
+            factory_output=random.randint(500, 600),
+            factory_target=random.randint(550, 600),
+        ),
     )
 
     return JSONResponse(
@@ -55,6 +63,11 @@ def generate_report(session: Session = Depends(get_db)):
     )
 
 
+@router.get("/llm-timings")
+def get_llm_timings(limit: int = Query(50, ge=1)):
+    return {"summary": timings.summary(), "recent": timings.recent(limit=limit)}
+
+
 # @router.get("/forecast-report")
 # def forecast_report(session: Session = Depends(get_db)):
 #     production_line = session.exec(select(ProductionLine)).first()
@@ -1,17 +1,24 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from models.database import get_db
-from models.models import ProductionLine
-from models.schemas import ProductionLineCreate, ProductionLineResponse
+from models.database import get_db, get_read_db
+from models.models import AttendanceEvent, ProductionLine
+from models.schemas import (
+    ProductionLineCreate,
+    ProductionLineResponse,
+    ProductionLineUpdate,
+)
+from services.attendance import lines_with_clock_ins
+from services.kpi import apply_line_change, line_contribution
 from sqlalchemy.exc import IntegrityError
-from sqlmodel import Session, select
+from sqlmodel import Session, delete
+from utils.profiling import ProfiledRoute
+from utils.serialization import rows_response
 
-router = APIRouter()
+router = APIRouter(route_class=ProfiledRoute)
 
 
 @router.get("/", response_model=list[ProductionLineResponse])
-def get_production_lines(session: Session = Depends(get_db)):
-    production_lines = session.exec(select(ProductionLine)).all()
-    return production_lines
+def get_production_lines(session: Session = Depends(get_read_db)):
+    return rows_response(session, ProductionLine, ProductionLineResponse)
 
 
 @router.post("/create", response_model=ProductionLineResponse)
@@ -21,6 +28,8 @@ def create_production_line(
     db_production_line = ProductionLine.model_validate(production_line)
     try:
         session.add(db_production_line)
+        session.flush()
+        apply_line_change(session, None, line_contribution(db_production_line))
         session.commit()
         session.refresh(db_production_line)
         return db_production_line
@@ -36,3 +45,59 @@ def create_production_line(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Internal server error occurred." + str(e),
         )
+
+
+@router.put("/update/{production_line_id}", response_model=ProductionLineResponse)
+def update_production_line(
+    production_line_id: int,
+    production_line: ProductionLineUpdate,
+    session: Session = Depends(get_db),
+):
+    db_production_line = session.get(
+        ProductionLine, production_line_id, with_for_update=True
+    )
+    if not db_production_line:
+        raise HTTPException(status_code=404, detail="Production line not found")
+    changes = production_line.model_dump(exclude_unset=True)
+    attended = db_production_line.no_of_employees_attended
+    # Once clock-ins arrive they own the attended count
+    if changes.get("no_of_employees_attended", attended) != attended and (
+        lines_with_clock_ins(session, [production_line_id])
+    ):
+        session.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Attendance for this line is counted from clock-in events.",
+        )
+    before = line_contribution(db_production_line)
+    db_production_line.sqlmodel_update(changes)
+    try:
+        session.add(db_production_line)
+        apply_line_change(session, before, line_contribution(db_production_line))
+        session.commit()
+        session.refresh(db_production_line)
+        return db_production_line
+    except IntegrityError as e:
+        session.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Integrity error occurred." + str(e),
+        )
+
+
+@router.delete("/delete/{production_line_id}")
+def delete_production_line(
+    production_line_id: int, session: Session = Depends(get_db)
+):
+    db_production_line = session.get(ProductionLine, production_line_id)
+    if not db_production_line:
+        raise HTTPException(status_code=404, detail="Production line not found")
+    apply_line_change(session, line_contribution(db_production_line), None)
+    session.exec(
+        delete(AttendanceEvent).where(
+            AttendanceEvent.production_line_id == production_line_id
+        )
+    )
+    session.delete(db_production_line)
+    session.commit()
+    return {"detail": "Production line deleted"}
@@ -2,6 +2,11 @@ from fastapi import APIRouter
 from routes import employees
 
 from backend.routes import (
+    attendance,
+    changes,
+    feeds,
+    history,
+    kpis,
     locations,
     managers,
     production_lines,
@@ -22,4 +27,11 @@ api_router.include_router(
 api_router.include_router(locations.router, prefix="/locations", tags=["Locations"])
 api_router.include_router(skills.router, prefix="/skills", tags=["Skills"])
 api_router.include_router(shifts.router, prefix="/shifts", tags=["Shifts"])
+api_router.include_router(
+    attendance.router, prefix="/attendance", tags=["Attendance"]
+)
+api_router.include_router(kpis.router, prefix="/kpis", tags=["KPIs"])
+api_router.include_router(changes.router, prefix="/changes", tags=["Changes"])
+api_router.include_router(feeds.router, prefix="/feeds", tags=["Calendar Feeds"])
+api_router.include_router(history.router, prefix="/history", tags=["History"])
 # api_router.include_router(schedule.router, prefix="/schedule", tags=["schedule"])
@@ -1,31 +1,61 @@
 import logging
+from datetime import date, timedelta
+from typing import Literal, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, status
-from models.database import get_db
-from models.models import (
-    Availability,
-    Employee,
-    ShiftDetail,
-    ShiftSchedule,
-    TimeOffRequest,
-)
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from models.database import get_db, get_read_db
+from models.models import Employee, ShiftDetail, TimeOffRequest
 from models.schemas import (
+    CoverageResponse,
+    Disruption,
+    RepairResponse,
+    ScenarioRequest,
+    ScenarioResult,
     SchedulingResponse,
     ShiftDetailCreate,
     ShiftDetailResponse,
+    TimeOffDecisionResponse,
     TimeOffRequestCreate,
 )
+from services.coverage import coverage_gaps
+from services.scheduling import (
+    decide_time_off,
+    repair,
+    run_scenarios,
+    run_schedule,
+)
 from sqlalchemy.exc import IntegrityError
 from sqlmodel import Session, select
-from src.schedule import shift_schedule
+from utils.admission import run_guarded, solver_pool
+from utils.profiling import ProfiledRoute
+from utils.serialization import FastJSONResponse, rows_response
 
-router = APIRouter()
+router = APIRouter(route_class=ProfiledRoute)
 
 
 @router.get("/", response_model=list[ShiftDetailResponse])
-def get_shifts(session: Session = Depends(get_db)):
-    shifts = session.exec(select(ShiftDetail)).all()
-    return shifts
+def get_shifts(session: Session = Depends(get_read_db)):
+    return rows_response(session, ShiftDetail, ShiftDetailResponse)
+
+
+@router.get("/coverage", response_model=CoverageResponse)
+def get_coverage(
+    start_date: Optional[date] = None,
+    days: int = Query(28, ge=1, le=92),
+    location_id: Optional[int] = None,
+    resolution: Literal["event", "hour", "day"] = "hour",
+    session: Session = Depends(get_read_db),
+):
+    first_day = start_date or date.today()
+    return FastJSONResponse(
+        coverage_gaps(
+            session,
+            first_day,
+            first_day + timedelta(days=days - 1),
+            location_id=location_id,
+            resolution=resolution,
+        )
+    )
 
 
 # @router.get("/", response_model=list[ShiftSchedule])
@@ -56,44 +86,85 @@ def create_shift(shift: ShiftDetailCreate, session: Session = Depends(get_db)):
 
 
 @router.post("/schedule", response_model=SchedulingResponse)
-def schedule_shifts(session: Session = Depends(get_db)):
-    employees = session.exec(select(Employee)).all()
-    shifts = session.exec(select(ShiftDetail)).all()
-    availability = session.exec(select(Availability)).all()
+def schedule_shifts(
+    objective: Optional[Literal["coverage", "staged"]] = None,
+    session: Session = Depends(get_db),
+):
+    # Identical clicks share one solve; the solver pool bounds the rest
+    assignments, _ = run_guarded(
+        ("schedule", objective),
+        solver_pool,
+        lambda: run_schedule(session, objective=objective, from_replica=True),
+    )
+    return SchedulingResponse(assignments=assignments)
+
 
-    assignments = shift_schedule(
-        employees=employees, shifts=shifts, availability=availability
+@router.post("/repair", response_model=RepairResponse)
+def repair_shifts(disruption: Disruption, session: Session = Depends(get_db)):
+    if disruption.employee_id is not None and not session.get(
+        Employee, disruption.employee_id
+    ):
+        raise HTTPException(status_code=404, detail="Employee not found")
+    if disruption.shift_id is not None and not session.get(
+        ShiftDetail, disruption.shift_id
+    ):
+        raise HTTPException(status_code=404, detail="Shift not found")
+    return run_guarded(
+        ("repair", disruption.model_dump_json()),
+        solver_pool,
+        lambda: repair(session, disruption),
+        priority="high",
     )
 
-    return SchedulingResponse(assignments=assignments)
+
+@router.post("/scenarios", response_model=list[ScenarioResult])
+def evaluate_scenarios(
+    body: ScenarioRequest, session: Session = Depends(get_read_db)
+):
+    for scenario in body.scenarios:
+        for perturbation in scenario.perturbations:
+            if perturbation.shift_id is not None and not session.get(
+                ShiftDetail, perturbation.shift_id
+            ):
+                raise HTTPException(
+                    status_code=404,
+                    detail=f"Shift {perturbation.shift_id} not found "
+                    f"(scenario {scenario.name!r})",
+                )
+    return run_guarded(
+        ("scenarios", body.model_dump_json()),
+        solver_pool,
+        lambda: run_scenarios(session, body),
+        priority="low",
+    )
 
 
-@router.post("/update-shifts/")
-async def update_shifts(body: TimeOffRequestCreate, session: Session = Depends(get_db)):
+@router.post("/update-shifts/", response_model=TimeOffDecisionResponse)
+def update_shifts(body: TimeOffRequestCreate, session: Session = Depends(get_db)):
+    if not session.get(Employee, body.employee_id):
+        raise HTTPException(status_code=404, detail="Employee not found")
+    time_off_request = session.exec(
+        select(TimeOffRequest).where(
+            TimeOffRequest.employee_id == body.employee_id,
+            TimeOffRequest.start_date == body.start_date,
+            TimeOffRequest.end_date == body.end_date,
+        )
+    ).first()
+    previous_status = time_off_request.status if time_off_request else None
     try:
-        shift_detail = session.exec(
-            select(ShiftDetail).where(ShiftDetail.employee_id == body.employee_id)
-        ).first()
-        time_off_requests = session.exec(
-            select(TimeOffRequest).where(TimeOffRequest.employee_id == body.employee_id)
-        ).first()
-
-        shift_detail.shift_date = body.request_date
-
-        if time_off_requests is None:
-            time_off_requests.request_date = body.request_date
-            time_off_requests.start_date = body.start_date
-            time_off_requests.end_date = body.end_date
-            time_off_requests.reason_for_absence = body.reason_for_absence
-            time_off_requests.status = "Pending"
-            time_off_requests.employee_id = body.employee_id
-
-        session.add(shift_detail)
-        session.add(time_off_requests)
+        if time_off_request is None:
+            time_off_request = TimeOffRequest.model_validate(body)
+        else:
+            time_off_request.sqlmodel_update(body.model_dump())
+        session.add(time_off_request)
         session.commit()
-        session.refresh(shift_detail)
-        session.refresh(time_off_requests)
-
-        return "Data Updated"
-    except Exception as e:
+        session.refresh(time_off_request)
+    except IntegrityError as e:
+        session.rollback()
         logging.error(f"Time Off Request was not added: {e} ")
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Integrity error occurred." + str(e),
+        )
+
+    return decide_time_off(session, time_off_request, previous_status)
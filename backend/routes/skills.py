@@ -1,17 +1,25 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from models.database import get_db
-from models.models import Skill
-from models.schemas import SkillCreate, SkillResponse
+from models.database import get_db, get_read_db
+from models.models import EmployeeSkill, Skill, SkillRequirement
+from models.schemas import (
+    EmployeeSkillCreate,
+    EmployeeSkillResponse,
+    SkillCreate,
+    SkillRequirementCreate,
+    SkillRequirementResponse,
+    SkillResponse,
+)
 from sqlalchemy.exc import IntegrityError
-from sqlmodel import Session, select
+from sqlmodel import Session
+from utils.profiling import ProfiledRoute
+from utils.serialization import rows_response
 
-router = APIRouter()
+router = APIRouter(route_class=ProfiledRoute)
 
 
 @router.get("/", response_model=list[SkillResponse])
-def get_skills(session: Session = Depends(get_db)):
-    skills = session.exec(select(Skill)).all()
-    return skills
+def get_skills(session: Session = Depends(get_read_db)):
+    return rows_response(session, Skill, SkillResponse)
 
 
 @router.post("/create", response_model=SkillResponse)
@@ -34,3 +42,49 @@ def create_skill(skill: SkillCreate, session: Session = Depends(get_db)):
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Internal server error occurred." + str(e),
         )
+
+
+@router.get("/employee-skills", response_model=list[EmployeeSkillResponse])
+def get_employee_skills(session: Session = Depends(get_read_db)):
+    return rows_response(session, EmployeeSkill, EmployeeSkillResponse)
+
+
+@router.post("/employee-skills/create", response_model=EmployeeSkillResponse)
+def create_employee_skill(
+    employee_skill: EmployeeSkillCreate, session: Session = Depends(get_db)
+):
+    db_employee_skill = EmployeeSkill.model_validate(employee_skill)
+    try:
+        session.add(db_employee_skill)
+        session.commit()
+        session.refresh(db_employee_skill)
+        return db_employee_skill
+    except IntegrityError as e:
+        session.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Integrity error occurred." + str(e),
+        )
+
+
+@router.get("/requirements", response_model=list[SkillRequirementResponse])
+def get_skill_requirements(session: Session = Depends(get_read_db)):
+    return rows_response(session, SkillRequirement, SkillRequirementResponse)
+
+
+@router.post("/requirements/create", response_model=SkillRequirementResponse)
+def create_skill_requirement(
+    requirement: SkillRequirementCreate, session: Session = Depends(get_db)
+):
+    db_requirement = SkillRequirement.model_validate(requirement)
+    try:
+        session.add(db_requirement)
+        session.commit()
+        session.refresh(db_requirement)
+        return db_requirement
+    except IntegrityError as e:
+        session.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Integrity error occurred." + str(e),
+        )
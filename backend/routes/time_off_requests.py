@@ -1,17 +1,24 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from models.database import get_db
+from models.database import get_db, get_read_db
 from models.models import TimeOffRequest
-from models.schemas import TimeOffRequestCreate, TimeOffRequestResponse
+from models.schemas import (
+    TimeOffDecisionResponse,
+    TimeOffRequestCreate,
+    TimeOffRequestResponse,
+    TimeOffStatusUpdate,
+)
+from services.scheduling import decide_time_off
 from sqlalchemy.exc import IntegrityError
-from sqlmodel import Session, select
+from sqlmodel import Session
+from utils.profiling import ProfiledRoute
+from utils.serialization import rows_response
 
-router = APIRouter()
+router = APIRouter(route_class=ProfiledRoute)
 
 
 @router.get("/", response_model=list[TimeOffRequestResponse])
-def get_time_off_requests(session: Session = Depends(get_db)):
-    requests = session.exec(select(TimeOffRequest)).all()
-    return requests
+def get_time_off_requests(session: Session = Depends(get_read_db)):
+    return rows_response(session, TimeOffRequest, TimeOffRequestResponse)
 
 
 @router.post("/create", response_model=TimeOffRequestResponse)
@@ -22,8 +29,6 @@ def create_time_off_request(
     try:
         session.add(db_request)
         session.commit()
-        session.refresh(db_request)
-        return db_request
     except IntegrityError as e:
         session.rollback()
         raise HTTPException(
@@ -36,3 +41,23 @@ def create_time_off_request(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Internal server error occurred." + str(e),
         )
+    # Like a status change: the request is stored first, so a failed
+    # re-solve for approved leave does not lose it.
+    decide_time_off(session, db_request, previous_status="Pending")
+    session.refresh(db_request)
+    return db_request
+
+
+@router.put("/{request_id}/status", response_model=TimeOffDecisionResponse)
+def update_time_off_status(
+    request_id: int, body: TimeOffStatusUpdate, session: Session = Depends(get_db)
+):
+    db_request = session.get(TimeOffRequest, request_id)
+    if not db_request:
+        raise HTTPException(status_code=404, detail="Time off request not found")
+    previous_status = db_request.status
+    db_request.status = body.status
+    session.add(db_request)
+    session.commit()
+    session.refresh(db_request)
+    return decide_time_off(session, db_request, previous_status)
@@ -0,0 +1,232 @@
+import logging
+import os
+import time
+from datetime import date, datetime, timedelta
+from typing import Callable, Optional
+
+from models.archive import ARCHIVES
+from models.changelog import record_deletes
+from models.models import (
+    Availability,
+    ProductionLine,
+    ShiftDetail,
+    ShiftSchedule,
+    SkillRequirement,
+    TimeOffRequest,
+)
+from sqlalchemy import Boolean, DateTime, delete, insert, literal, union_all
+from sqlalchemy.orm import aliased
+from sqlmodel import Session, select
+from utils.metrics import registry
+
+ARCHIVE_AFTER_DAYS = int(os.getenv("ARCHIVE_AFTER_DAYS", "180"))
+ARCHIVE_BATCH_SIZE = int(os.getenv("ARCHIVE_BATCH_SIZE", "500"))
+ARCHIVE_BATCH_PAUSE = float(os.getenv("ARCHIVE_BATCH_PAUSE", "0.1"))
+HISTORY_MAX_DAYS = int(os.getenv("HISTORY_MAX_DAYS", "366"))
+
+ARCHIVED_ROWS = registry.counter(
+    "archived_rows_total",
+    "Rows moved from the hot tables into their archive tables.",
+    ("table",),
+)
+
+
+def move_rows(
+    session: Session,
+    model,
+    criteria: list,
+    batch_size: int = ARCHIVE_BATCH_SIZE,
+    pause: float = ARCHIVE_BATCH_PAUSE,
+) -> int:
+    """
+    Move the rows of ``model`` matching ``criteria`` into its archive table,
+    ``batch_size`` rows per transaction with ``pause`` seconds in between,
+    so locks stay short and replicas keep up. Returns the rows moved.
+
+    The copy and the delete are Core statements, so archived rows of the
+    tables ``/changes`` tracks are logged as deletes explicitly, in the
+    same transaction: synced clients drop them like any other removed row
+    and read them back through ``/history``.
+    """
+    source = model.__table__
+    archive = ARCHIVES[model]
+    names = list(source.columns.keys())
+    moved = 0
+    while True:
+        ids = session.exec(
+            select(model.id).where(*criteria).order_by(model.id).limit(batch_size)
+        ).all()
+        if not ids:
+            return moved
+        archived_at = literal(datetime.now(), DateTime)
+        session.execute(
+            insert(archive).from_select(
+                [*names, "archived_at"],
+                select(*source.columns, archived_at).where(source.c.id.in_(ids)),
+            )
+        )
+        record_deletes(session, model, ids)
+        session.execute(delete(source).where(source.c.id.in_(ids)))
+        session.commit()
+        moved += len(ids)
+        ARCHIVED_ROWS.inc(len(ids), table=source.name)
+        if len(ids) < batch_size:
+            return moved
+        if pause:
+            time.sleep(pause)
+
+
+def archive_before(
+    session: Session,
+    cutoff: date,
+    batch_size: int = ARCHIVE_BATCH_SIZE,
+    pause: float = ARCHIVE_BATCH_PAUSE,
+) -> dict:
+    """
+    Archive history that ended before ``cutoff``; returns rows moved per table.
+
+    Assignments go first so their shifts become unreferenced. Shifts that a
+    production line still points at stay hot, and so do their skill
+    requirements. Availability rows only describe a week day pattern, so an
+    old row is archived only once a newer row for the same employee and day
+    has replaced it.
+    """
+    moved = {}
+
+    def move(model, *criteria):
+        moved[model.__tablename__] = move_rows(
+            session, model, list(criteria), batch_size, pause
+        )
+
+    move(ShiftSchedule, ShiftSchedule.shift_date < cutoff)
+
+    old_shifts = select(ShiftDetail.id).where(
+        ShiftDetail.shift_date < cutoff,
+        ~select(ProductionLine.id)
+        .where(ProductionLine.shift_id == ShiftDetail.id)
+        .exists(),
+        ~select(ShiftSchedule.id)
+        .where(ShiftSchedule.shift_id == ShiftDetail.id)
+        .exists(),
+    )
+    move(SkillRequirement, SkillRequirement.shift_id.in_(old_shifts))
+    move(
+        ShiftDetail,
+        ShiftDetail.id.in_(old_shifts),
+        ~select(SkillRequirement.id)
+        .where(SkillRequirement.shift_id == ShiftDetail.id)
+        .exists(),
+    )
+
+    move(TimeOffRequest, TimeOffRequest.end_date < cutoff)
+
+    newer = aliased(Availability)
+    move(
+        Availability,
+        # date_of_week is stored as an ISO string, which sorts like the date
+        Availability.date_of_week < cutoff.isoformat(),
+        select(newer.id)
+        .where(
+            newer.employee_id == Availability.employee_id,
+            newer.day_of_week == Availability.day_of_week,
+            newer.date_of_week > Availability.date_of_week,
+        )
+        .exists(),
+    )
+    return moved
+
+
+def archive_old_rows(
+    session: Session,
+    days: int = ARCHIVE_AFTER_DAYS,
+    batch_size: int = ARCHIVE_BATCH_SIZE,
+    pause: float = ARCHIVE_BATCH_PAUSE,
+) -> dict:
+    cutoff = date.today() - timedelta(days=days)
+    moved = archive_before(session, cutoff, batch_size, pause)
+    logging.info("Archived rows before %s: %s", cutoff, moved)
+    return moved
+
+
+def history(
+    session: Session,
+    model,
+    where: Callable,
+    order_by: tuple,
+) -> list:
+    """
+    Rows of ``model`` and its archive table as dicts with an ``archived``
+    flag. ``where(columns)`` builds the criteria against either table's
+    columns, so both halves of the union use their own indexes.
+    """
+    source = model.__table__
+    archive = ARCHIVES[model]
+    names = list(source.columns.keys())
+    query = union_all(
+        select(*source.columns, literal(False, Boolean).label("archived")).where(
+            *where(source.c)
+        ),
+        select(
+            *(archive.c[name] for name in names),
+            literal(True, Boolean).label("archived"),
+        ).where(*where(archive.c)),
+    )
+    query = query.order_by(*(query.selected_columns[name] for name in order_by))
+    return [dict(row) for row in session.execute(query).mappings()]
+
+
+def shift_history(
+    session: Session,
+    first_day: date,
+    last_day: date,
+    location_id: Optional[int] = None,
+) -> list:
+    def where(c):
+        criteria = [c.shift_date >= first_day, c.shift_date <= last_day]
+        if location_id is not None:
+            criteria.append(c.location_id == location_id)
+        return criteria
+
+    return history(session, ShiftDetail, where, ("shift_date", "shift_start_time", "id"))
+
+
+def assignment_history(
+    session: Session,
+    first_day: date,
+    last_day: date,
+    employee_id: Optional[int] = None,
+    location_id: Optional[int] = None,
+) -> list:
+    def where(c):
+        criteria = [c.shift_date >= first_day, c.shift_date <= last_day]
+        if employee_id is not None:
+            criteria.append(c.employee_id == employee_id)
+        if location_id is not None:
+            criteria.append(c.location_id == location_id)
+        return criteria
+
+    return history(session, ShiftSchedule, where, ("shift_date", "employee_id", "id"))
+
+
+def time_off_history(
+    session: Session,
+    first_day: date,
+    last_day: date,
+    employee_id: Optional[int] = None,
+) -> list:
+    def where(c):
+        criteria = [c.start_date <= last_day, c.end_date >= first_day]
+        if employee_id is not None:
+            criteria.append(c.employee_id == employee_id)
+        return criteria
+
+    return history(session, TimeOffRequest, where, ("start_date", "id"))
+
+
+def availability_history(session: Session, employee_id: int) -> list:
+    return history(
+        session,
+        Availability,
+        lambda c: [c.employee_id == employee_id],
+        ("date_of_week", "id"),
+    )
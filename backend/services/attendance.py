@@ -0,0 +1,255 @@
+import logging
+import math
+import os
+import threading
+import time
+from collections import Counter
+from typing import Callable, Iterable, List, Set
+
+from models.database import engine
+from models.models import AttendanceEvent, Employee, ProductionLine
+from services.kpi import increment_counter, week_start_for
+from sqlalchemy import bindparam, insert, update
+from sqlmodel import Session, select
+from utils.admission import Overloaded
+from utils.metrics import registry
+
+ATTENDANCE_FLUSH_SIZE = int(os.getenv("ATTENDANCE_FLUSH_SIZE", "500"))
+ATTENDANCE_FLUSH_INTERVAL = float(os.getenv("ATTENDANCE_FLUSH_INTERVAL", "1"))
+ATTENDANCE_MAX_BUFFERED = int(os.getenv("ATTENDANCE_MAX_BUFFERED", "20000"))
+
+ATTENDANCE_EVENTS = registry.counter(
+    "attendance_events_total",
+    "Attendance events by outcome: accepted into the buffer, rejected while "
+    "it was full, written, or dropped for unknown lines/employees.",
+    ("result",),
+)
+ATTENDANCE_FLUSH_SECONDS = registry.histogram(
+    "attendance_flush_seconds", "Time to write one batch of attendance events."
+)
+
+
+def lines_with_clock_ins(session: Session, line_ids: Iterable[int]) -> Set[int]:
+    """The lines among ``line_ids`` that have at least one clock-in."""
+    clocked_in = (
+        select(AttendanceEvent.id)
+        .where(
+            AttendanceEvent.production_line_id == ProductionLine.id,
+            AttendanceEvent.kind == "in",
+        )
+        .exists()
+    )
+    return set(
+        session.exec(
+            select(ProductionLine.id).where(
+                ProductionLine.id.in_(list(line_ids)), clocked_in
+            )
+        )
+    )
+
+
+def write_events(session: Session, events: List[dict]) -> dict:
+    """
+    Insert a batch of attendance events with one statement and count each
+    employee's first clock-in on a line as attended.
+
+    Once a line has clock-ins its attended count is derived from them: the
+    first clock-ins on a line replace any value entered by hand, and after
+    that each first clock-in adds one. The rollups move by the same
+    amounts. Work is proportional to the batch, not to the events already
+    stored.
+    Events for unknown lines or employees are dropped so one bad reader
+    cannot fail the batch. The caller commits.
+    """
+    line_ids = {event["production_line_id"] for event in events}
+    employee_ids = {event["employee_id"] for event in events}
+    # Locking the lines serializes concurrent batches (from every worker)
+    # and manual edits that touch them, so no first clock-in is counted
+    # twice and the rollups move from the attended value read here.
+    lines = {
+        line.id: line
+        for line in session.exec(
+            select(
+                ProductionLine.id,
+                ProductionLine.location_id,
+                ProductionLine.production_date,
+                ProductionLine.no_of_employees_attended,
+            )
+            .where(ProductionLine.id.in_(line_ids))
+            .with_for_update()
+        )
+    }
+    known = set(session.exec(select(Employee.id).where(Employee.id.in_(employee_ids))))
+    valid = [
+        event
+        for event in events
+        if event["production_line_id"] in lines and event["employee_id"] in known
+    ]
+    if not valid:
+        return {"written": 0, "dropped": len(events), "attended": 0}
+
+    present = {
+        tuple(pair)
+        for pair in session.exec(
+            select(AttendanceEvent.production_line_id, AttendanceEvent.employee_id)
+            .where(
+                AttendanceEvent.production_line_id.in_(list(lines)),
+                AttendanceEvent.employee_id.in_(list(known)),
+                AttendanceEvent.kind == "in",
+            )
+            .distinct()
+        )
+    }
+    arrived = Counter()
+    for event in valid:
+        pair = (event["production_line_id"], event["employee_id"])
+        if event["kind"] == "in" and pair not in present:
+            present.add(pair)
+            arrived[pair[0]] += 1
+    # Lines whose count already comes from clock-ins, checked before the
+    # insert; on the others these are the first clock-ins.
+    derived = lines_with_clock_ins(session, arrived) if arrived else set()
+
+    session.execute(insert(AttendanceEvent), valid)
+    if arrived:
+        attended = {}
+        for line_id, count in arrived.items():
+            if line_id in derived:
+                count += lines[line_id].no_of_employees_attended or 0
+            attended[line_id] = count
+        session.connection().execute(
+            update(ProductionLine.__table__)
+            .where(ProductionLine.__table__.c.id == bindparam("line_id"))
+            .values(no_of_employees_attended=bindparam("attended")),
+            [
+                {"line_id": line_id, "attended": count}
+                for line_id, count in attended.items()
+            ],
+        )
+        rollups = Counter()
+        for line_id, count in attended.items():
+            line = lines[line_id]
+            change = count - (line.no_of_employees_attended or 0)
+            week = week_start_for(line.production_date)
+            rollups[("line", line_id, week)] += change
+            rollups[("location", line.location_id, week)] += change
+        increment_counter(session, "employees_attended", rollups)
+    return {
+        "written": len(valid),
+        "dropped": len(events) - len(valid),
+        "attended": sum(arrived.values()),
+    }
+
+
+class AttendanceBuffer:
+    """
+    Attendance events accepted by this worker, written in bulk by a
+    background thread every ``flush_interval`` seconds, or as soon as
+    ``flush_size`` events are waiting.
+
+    At most ``max_buffered`` events are held: beyond that ``add`` raises
+    ``Overloaded`` so readers back off and resend. Batches that fail to
+    write are put back and retried on the next flush.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session],
+        flush_size: int,
+        flush_interval: float,
+        max_buffered: int,
+    ):
+        self.session_factory = session_factory
+        self.flush_size = flush_size
+        self.flush_interval = flush_interval
+        self.max_buffered = max_buffered
+        self._events = []
+        self._lock = threading.Lock()
+        self._flushing = threading.Lock()
+        self._wake = threading.Event()
+        self._stopped = threading.Event()
+        self._thread = None
+
+    def __len__(self):
+        return len(self._events)
+
+    def add(self, events: List[dict]) -> int:
+        """Queue ``events`` and return how many are now buffered."""
+        with self._lock:
+            if len(self._events) + len(events) > self.max_buffered:
+                ATTENDANCE_EVENTS.inc(len(events), result="rejected")
+                raise Overloaded(
+                    "attendance buffer", max(1, math.ceil(self.flush_interval))
+                )
+            self._events.extend(events)
+            buffered = len(self._events)
+            if self._thread is None:
+                # Started lazily so every forked worker runs its own
+                self._thread = threading.Thread(
+                    target=self._run, name="attendance-flush", daemon=True
+                )
+                self._thread.start()
+        ATTENDANCE_EVENTS.inc(len(events), result="accepted")
+        if buffered >= self.flush_size:
+            self._wake.set()
+        return buffered
+
+    def _run(self):
+        while not self._stopped.is_set():
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            self.flush()
+
+    def _requeue(self, events: List[dict]):
+        with self._lock:
+            room = max(0, self.max_buffered - len(self._events))
+            self._events[:0] = events[:room]
+        if len(events) > room:
+            ATTENDANCE_EVENTS.inc(len(events) - room, result="dropped")
+            logging.error("Dropped %d attendance events", len(events) - room)
+
+    def flush(self) -> int:
+        """Write everything buffered so far; returns the events written."""
+        with self._flushing:
+            with self._lock:
+                events, self._events = self._events, []
+            written = 0
+            for start in range(0, len(events), self.flush_size):
+                batch = events[start : start + self.flush_size]
+                started_at = time.perf_counter()
+                try:
+                    with self.session_factory() as session:
+                        result = write_events(session, batch)
+                        session.commit()
+                except Exception:
+                    logging.exception("Could not write attendance events")
+                    self._requeue(events[start:])
+                    break
+                ATTENDANCE_FLUSH_SECONDS.observe(time.perf_counter() - started_at)
+                ATTENDANCE_EVENTS.inc(result["written"], result="written")
+                if result["dropped"]:
+                    ATTENDANCE_EVENTS.inc(result["dropped"], result="dropped")
+                written += result["written"]
+            return written
+
+    def close(self):
+        """Stop the flush thread and write what is left (on shutdown)."""
+        self._stopped.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.flush_interval + 5)
+        self.flush()
+
+
+attendance_buffer = AttendanceBuffer(
+    lambda: Session(engine),
+    ATTENDANCE_FLUSH_SIZE,
+    ATTENDANCE_FLUSH_INTERVAL,
+    ATTENDANCE_MAX_BUFFERED,
+)
+
+registry.gauge(
+    "attendance_buffered_events",
+    "Attendance events waiting for the next bulk write in this worker.",
+    collect=lambda: {(): len(attendance_buffer)},
+)
@@ -0,0 +1,71 @@
+from datetime import datetime
+from typing import Optional
+
+from models.models import ChangeLog, ChangeVersion
+from sqlmodel import Session, delete, func, select
+
+
+def changes_since(
+    session: Session,
+    since: int,
+    limit: int,
+    employee_id: Optional[int] = None,
+    location_id: Optional[int] = None,
+) -> Optional[dict]:
+    """
+    Changes after version ``since``, oldest first, or None when the log no
+    longer reaches back that far and the client has to resync in full.
+
+    Within a page only the last change of each entity is returned, so a
+    client that fell behind downloads every entity at most once.
+    """
+    counter = session.get(ChangeVersion, 1)
+    latest = counter.version if counter else 0
+    oldest = session.exec(select(func.min(ChangeLog.version))).one()
+    if since < latest and (oldest is None or since + 1 < oldest):
+        return None
+
+    criteria = [ChangeLog.version > since, ChangeLog.version <= latest]
+    if employee_id is not None:
+        criteria.append(ChangeLog.employee_id == employee_id)
+    if location_id is not None:
+        criteria.append(ChangeLog.location_id == location_id)
+    rows = session.exec(
+        select(
+            ChangeLog.version,
+            ChangeLog.entity,
+            ChangeLog.entity_id,
+            ChangeLog.action,
+            ChangeLog.payload,
+        )
+        .where(*criteria)
+        .order_by(ChangeLog.version)
+        .limit(limit + 1)
+    ).all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+
+    collapsed = {}
+    for version, entity, entity_id, action, payload in rows:
+        collapsed.pop((entity, entity_id), None)
+        collapsed[(entity, entity_id)] = {
+            "version": version,
+            "entity": entity,
+            "id": entity_id,
+            "action": action,
+            "data": payload,
+        }
+    return {
+        # Resume from here; without more pages that is the latest version,
+        # even when the filters matched nothing
+        "version": rows[-1][0] if has_more else max(latest, since),
+        "has_more": has_more,
+        "changes": list(collapsed.values()),
+    }
+
+
+def prune_changes(session: Session, before: datetime) -> int:
+    """Drop changes recorded before ``before``; clients behind them resync."""
+    result = session.exec(delete(ChangeLog).where(ChangeLog.created_at < before))
+    session.commit()
+    return result.rowcount
@@ -0,0 +1,82 @@
+from datetime import date, timedelta
+from typing import Optional
+
+from models.models import Availability, Employee, ShiftDetail, TimeOffRequest
+from sqlmodel import Session, select
+from src.coverage import analyse
+from src.time_off import TimeOffIndex
+
+
+def coverage_gaps(
+    session: Session,
+    first_day: date,
+    last_day: date,
+    location_id: Optional[int] = None,
+    resolution: str = "hour",
+) -> dict:
+    """
+    Compare who is available with shift capacity before any solve.
+
+    Only the columns the sweep needs are selected; shifts from the day
+    before are included for the part that runs past midnight.
+    """
+    shift_criteria = [
+        ShiftDetail.shift_date >= first_day - timedelta(days=1),
+        ShiftDetail.shift_date <= last_day,
+    ]
+    employee_criteria = [Employee.is_active, Employee.location_id.is_not(None)]
+    if location_id is not None:
+        shift_criteria.append(ShiftDetail.location_id == location_id)
+        employee_criteria.append(Employee.location_id == location_id)
+
+    shifts = session.exec(
+        select(
+            ShiftDetail.id,
+            ShiftDetail.shift_date,
+            ShiftDetail.shift_start_time,
+            ShiftDetail.shift_end_time,
+            ShiftDetail.capacity,
+            ShiftDetail.location_id,
+        ).where(*shift_criteria)
+    ).all()
+    employee_locations = dict(
+        session.exec(
+            select(Employee.id, Employee.location_id).where(*employee_criteria)
+        ).all()
+    )
+    availability = session.exec(
+        select(
+            Availability.employee_id,
+            Availability.day_of_week,
+            Availability.start_time,
+            Availability.end_time,
+        )
+        .join(Employee, Employee.id == Availability.employee_id)
+        .where(*employee_criteria)
+    ).all()
+    time_off = TimeOffIndex(
+        session.exec(
+            select(TimeOffRequest).where(
+                TimeOffRequest.status == "Approved",
+                TimeOffRequest.start_date <= last_day,
+                TimeOffRequest.end_date >= first_day - timedelta(days=1),
+            )
+        ).all()
+    )
+
+    gaps, curve = analyse(
+        shifts=shifts,
+        availability=availability,
+        employee_locations=employee_locations,
+        first_day=first_day,
+        last_day=last_day,
+        time_off=time_off,
+        resolution=resolution,
+    )
+    return {
+        "first_day": first_day,
+        "last_day": last_day,
+        "resolution": resolution,
+        "gaps": gaps,
+        "curve": curve,
+    }
@@ -0,0 +1,347 @@
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import date, datetime, time, timedelta, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from types import SimpleNamespace
+from typing import Iterable, Optional
+
+from models.models import (
+    Employee,
+    FeedRevision,
+    Location,
+    ShiftDetail,
+    ShiftSchedule,
+    TimeOffRequest,
+)
+from sqlalchemy import update
+from sqlmodel import Session, select
+from src.coverage import to_datetime
+from src.ics import all_day_event, render_calendar, timed_event
+from src.labour import shift_span
+from utils.metrics import registry
+from utils.upsert import insert_missing
+
+FEED_PAST_DAYS = int(os.getenv("FEED_PAST_DAYS", "30"))
+FEED_FUTURE_DAYS = int(os.getenv("FEED_FUTURE_DAYS", "90"))
+FEED_CACHE_SIZE = int(os.getenv("FEED_CACHE_SIZE", "5000"))
+FEED_MAX_AGE = int(os.getenv("FEED_MAX_AGE", "300"))
+FEED_UID_DOMAIN = os.getenv("FEED_UID_DOMAIN", "employee-scheduling")
+
+FEED_REQUESTS = registry.counter(
+    "feed_requests_total",
+    "Calendar feed requests by scope and how they were served.",
+    ("scope", "result"),
+)
+
+
+@dataclass
+class RenderedFeed:
+    etag: str
+    last_modified: datetime
+    body: bytes
+
+
+class FeedCache:
+    """Rendered feeds per (scope, id), evicting the least recently used."""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key) -> Optional[RenderedFeed]:
+        with self._lock:
+            feed = self._entries.get(key)
+            if feed is not None:
+                self._entries.move_to_end(key)
+            return feed
+
+    def put(self, key, feed: RenderedFeed):
+        with self._lock:
+            self._entries[key] = feed
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+cache = FeedCache(FEED_CACHE_SIZE)
+
+
+def bump_feeds(
+    session: Session, employee_ids: Iterable[int], location_ids: Iterable[int] = ()
+):
+    """
+    Mark the feeds of these employees and locations as changed. The caller
+    commits, so the bump lands with the assignment write.
+
+    Missing revision rows are inserted first (skipping rows a concurrent
+    writer just inserted), then each moves by ``revision = revision + 1``,
+    so concurrent bumps never read and write back the same revision.
+    """
+    now = datetime.now()
+    table = FeedRevision.__table__
+    scopes = (("employee", set(employee_ids)), ("location", set(location_ids)))
+    for scope, ids in scopes:
+        ids.discard(None)
+        if not ids:
+            continue
+        existing = set(
+            session.exec(
+                select(FeedRevision.scope_id).where(
+                    FeedRevision.scope == scope, FeedRevision.scope_id.in_(ids)
+                )
+            )
+        )
+        insert_missing(
+            session,
+            table,
+            [
+                {"scope": scope, "scope_id": scope_id, "revision": 0, "updated_at": now}
+                for scope_id in sorted(ids - existing)
+            ],
+            ("scope", "scope_id"),
+        )
+        session.connection().execute(
+            update(table)
+            .where(table.c.scope == scope, table.c.scope_id.in_(ids))
+            .values(revision=table.c.revision + 1, updated_at=now)
+        )
+
+
+def _utc(value: datetime) -> datetime:
+    """Naive local time to naive UTC, as ICS DTSTAMP and HTTP dates expect."""
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def _shift_times(shift_date, start_time, end_time):
+    start, end = shift_span(
+        SimpleNamespace(
+            shift_date=shift_date,
+            shift_start_time=start_time,
+            shift_end_time=end_time,
+        )
+    )
+    return to_datetime(start), to_datetime(end)
+
+
+def render_employee_feed(
+    session: Session, employee: Employee, first_day: date, last_day: date, stamp
+) -> bytes:
+    rows = session.exec(
+        select(
+            ShiftSchedule.shift_id,
+            ShiftSchedule.shift_date,
+            ShiftSchedule.shift_type,
+            ShiftDetail.shift_desc,
+            ShiftDetail.shift_start_time,
+            ShiftDetail.shift_end_time,
+            Location.location_name,
+        )
+        .select_from(ShiftSchedule)
+        .outerjoin(ShiftDetail, ShiftDetail.id == ShiftSchedule.shift_id)
+        .outerjoin(Location, Location.id == ShiftSchedule.location_id)
+        .where(
+            ShiftSchedule.employee_id == employee.id,
+            ShiftSchedule.shift_date >= first_day,
+            ShiftSchedule.shift_date <= last_day,
+        )
+    ).all()
+    leave = session.exec(
+        select(TimeOffRequest.id, TimeOffRequest.start_date, TimeOffRequest.end_date)
+        .where(
+            TimeOffRequest.employee_id == employee.id,
+            TimeOffRequest.status == "Approved",
+            TimeOffRequest.start_date <= last_day,
+            TimeOffRequest.end_date >= first_day,
+        )
+    ).all()
+
+    events = []
+    for shift_id, shift_date, shift_type, desc, start_time, end_time, place in rows:
+        if start_time is None:
+            # Legacy rows without a shift: show the day only
+            events.append(
+                all_day_event(
+                    f"assignment-{employee.id}-{shift_date:%Y%m%d}@{FEED_UID_DOMAIN}",
+                    shift_date,
+                    shift_date,
+                    shift_type,
+                    stamp,
+                )
+            )
+            continue
+        start, end = _shift_times(shift_date, start_time, end_time)
+        events.append(
+            timed_event(
+                f"assignment-{employee.id}-{shift_id}@{FEED_UID_DOMAIN}",
+                start,
+                end,
+                desc or shift_type,
+                stamp,
+                location=place,
+            )
+        )
+    for request_id, start_date, end_date in leave:
+        events.append(
+            all_day_event(
+                f"time-off-{request_id}@{FEED_UID_DOMAIN}",
+                start_date,
+                end_date,
+                "Time off",
+                stamp,
+            )
+        )
+    return render_calendar(f"{employee.first_name} {employee.last_name}", events)
+
+
+def render_location_feed(
+    session: Session, location: Location, first_day: date, last_day: date, stamp
+) -> bytes:
+    rows = session.exec(
+        select(
+            ShiftDetail.id,
+            ShiftDetail.shift_date,
+            ShiftDetail.shift_start_time,
+            ShiftDetail.shift_end_time,
+            ShiftDetail.shift_desc,
+            ShiftDetail.capacity,
+            Employee.first_name,
+            Employee.last_name,
+        )
+        .join(ShiftSchedule, ShiftSchedule.shift_id == ShiftDetail.id)
+        .join(Employee, Employee.id == ShiftSchedule.employee_id)
+        .where(
+            ShiftDetail.location_id == location.id,
+            ShiftDetail.shift_date >= first_day,
+            ShiftDetail.shift_date <= last_day,
+        )
+        .order_by(ShiftDetail.id, Employee.last_name, Employee.first_name)
+    ).all()
+
+    # One event per staffed shift, listing who works it
+    shifts = OrderedDict()
+    for shift_id, shift_date, start_time, end_time, desc, capacity, first, last in rows:
+        shift = shifts.setdefault(
+            shift_id,
+            {
+                "times": _shift_times(shift_date, start_time, end_time),
+                "desc": desc or "Shift",
+                "capacity": capacity,
+                "names": [],
+            },
+        )
+        shift["names"].append(f"{first} {last}")
+
+    events = []
+    for shift_id, shift in shifts.items():
+        staffed = len(shift["names"])
+        capacity = shift["capacity"]
+        summary = shift["desc"]
+        if capacity:
+            summary += f" ({staffed}/{capacity})"
+        events.append(
+            timed_event(
+                f"shift-{shift_id}@{FEED_UID_DOMAIN}",
+                *shift["times"],
+                summary,
+                stamp,
+                location=location.location_name,
+                description="\n".join(shift["names"]),
+            )
+        )
+    return render_calendar(location.location_name, events)
+
+
+RENDERERS = {
+    "employee": (Employee, render_employee_feed),
+    "location": (Location, render_location_feed),
+}
+
+
+def _not_modified(etag, last_modified, if_none_match, if_modified_since) -> bool:
+    # If-None-Match wins over If-Modified-Since (RFC 9110, 13.2.2)
+    if if_none_match is not None:
+        tags = {tag.strip() for tag in if_none_match.split(",")}
+        return "*" in tags or etag in tags or f"W/{etag}" in tags
+    if if_modified_since is not None:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        if since.tzinfo is not None:
+            since = since.astimezone(timezone.utc).replace(tzinfo=None)
+        return last_modified.replace(microsecond=0) <= since
+    return False
+
+
+def get_feed(
+    session: Session,
+    scope: str,
+    scope_id: int,
+    if_none_match: str = None,
+    if_modified_since: str = None,
+):
+    """
+    Serve a feed as (status code, body, headers), or None when the employee
+    or location does not exist.
+
+    A poll costs a primary-key lookup of the employee or location and one
+    indexed revision lookup. The feed is re-rendered only when its revision
+    (or the day, which moves the window) changed since it was cached, and a
+    client holding the current version gets a 304. A deleted target is a
+    404 even for clients that still hold its last ETag.
+    """
+    model, render = RENDERERS[scope]
+    target = session.get(model, scope_id)
+    if target is None:
+        return None
+
+    today = date.today()
+    revision = session.exec(
+        select(FeedRevision.revision, FeedRevision.updated_at).where(
+            FeedRevision.scope == scope, FeedRevision.scope_id == scope_id
+        )
+    ).first()
+    number, updated_at = revision or (0, None)
+    # The window moves daily, so midnight counts as a modification too
+    midnight = datetime.combine(today, time(0))
+    last_modified = _utc(max(updated_at or midnight, midnight))
+    etag = f'"{scope}-{scope_id}-{number}-{today:%Y%m%d}"'
+    headers = {
+        "ETag": etag,
+        "Last-Modified": format_datetime(
+            last_modified.replace(tzinfo=timezone.utc), usegmt=True
+        ),
+        "Cache-Control": f"private, max-age={FEED_MAX_AGE}",
+    }
+
+    if _not_modified(etag, last_modified, if_none_match, if_modified_since):
+        FEED_REQUESTS.inc(scope=scope, result="not_modified")
+        return 304, b"", headers
+
+    key = (scope, scope_id)
+    cached = cache.get(key)
+    if cached is not None and cached.etag == etag:
+        FEED_REQUESTS.inc(scope=scope, result="cached")
+        return 200, cached.body, headers
+
+    cached = RenderedFeed(
+        etag=etag,
+        last_modified=last_modified,
+        body=render(
+            session,
+            target,
+            today - timedelta(days=FEED_PAST_DAYS),
+            today + timedelta(days=FEED_FUTURE_DAYS),
+            last_modified,
+        ),
+    )
+    cache.put(key, cached)
+    FEED_REQUESTS.inc(scope=scope, result="rendered")
+    return 200, cached.body, headers
@@ -0,0 +1,203 @@
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from models.models import KpiRollup, ProductionLine
+from sqlalchemy import bindparam, tuple_, update
+from sqlmodel import Session, delete, select
+from utils.upsert import insert_missing
+
+# Counters kept on every rollup row; ratios are derived at read time so that
+# rollups can be adjusted with plain additions and subtractions.
+KPI_COUNTERS = ("employees_needed", "employees_attended", "units_produced", "line_count")
+
+
+def week_start_for(day: date) -> date:
+    """Return the Monday of the ISO week containing ``day``."""
+    return day - timedelta(days=day.weekday())
+
+
+def line_contribution(line: ProductionLine) -> Optional[dict]:
+    """
+    Snapshot what a production line contributes to the rollups.
+
+    Take the snapshot before mutating a line and again afterwards, then pass
+    both to ``apply_line_change`` so only the difference is written.
+    """
+    if line is None or line.id is None:
+        return None
+    return {
+        "line_id": line.id,
+        "location_id": line.location_id,
+        "week_start": week_start_for(line.production_date or date.today()),
+        "employees_needed": line.no_of_employees_needed or 0,
+        "employees_attended": line.no_of_employees_attended or 0,
+        "units_produced": line.units_produced or 0,
+        "line_count": 1,
+    }
+
+
+def _rollup_keys(contribution: dict) -> List[Tuple[str, int, date]]:
+    week = contribution["week_start"]
+    return [
+        ("line", contribution["line_id"], week),
+        ("location", contribution["location_id"], week),
+    ]
+
+
+def apply_deltas(session: Session, deltas: Dict[Tuple[str, int, date], dict]):
+    """
+    Add per-key counter deltas to the rollup rows. The caller commits.
+
+    Missing rows are inserted first (skipping rows a concurrent writer just
+    inserted), then every row moves by ``counter = counter + :delta``. No
+    row is read and written back, so concurrent line writes and attendance
+    flushes never lose each other's increments.
+    """
+    deltas = {
+        key: {**dict.fromkeys(KPI_COUNTERS, 0), **delta}
+        for key, delta in deltas.items()
+        if any(delta.values())
+    }
+    if not deltas:
+        return
+    now = datetime.now()
+    key_columns = (KpiRollup.scope, KpiRollup.scope_id, KpiRollup.week_start)
+    existing = {
+        tuple(key)
+        for key in session.exec(
+            select(*key_columns).where(tuple_(*key_columns).in_(list(deltas)))
+        )
+    }
+    table = KpiRollup.__table__
+    insert_missing(
+        session,
+        table,
+        [
+            {
+                "scope": scope,
+                "scope_id": scope_id,
+                "week_start": week,
+                "updated_at": now,
+                **dict.fromkeys(KPI_COUNTERS, 0),
+            }
+            for scope, scope_id, week in deltas
+            if (scope, scope_id, week) not in existing
+        ],
+        ("scope", "scope_id", "week_start"),
+    )
+    session.connection().execute(
+        update(table)
+        .where(
+            table.c.scope == bindparam("key_scope"),
+            table.c.scope_id == bindparam("key_scope_id"),
+            table.c.week_start == bindparam("key_week"),
+        )
+        .values(
+            {
+                **{
+                    counter: table.c[counter] + bindparam(f"delta_{counter}")
+                    for counter in KPI_COUNTERS
+                },
+                "updated_at": now,
+            }
+        ),
+        [
+            {
+                "key_scope": scope,
+                "key_scope_id": scope_id,
+                "key_week": week,
+                **{f"delta_{counter}": value for counter, value in delta.items()},
+            }
+            for (scope, scope_id, week), delta in deltas.items()
+        ],
+    )
+
+
+def increment_counter(
+    session: Session, counter: str, amounts: Dict[Tuple[str, int, date], int]
+):
+    """Add ``amounts`` to one counter of the rollups; see ``apply_deltas``."""
+    apply_deltas(session, {key: {counter: amount} for key, amount in amounts.items()})
+
+
+def apply_line_change(
+    session: Session, before: Optional[dict], after: Optional[dict]
+) -> None:
+    """
+    Incrementally update the rollups for one production line change.
+
+    ``before`` is ``None`` for an insert and ``after`` is ``None`` for a delete.
+    """
+    deltas = defaultdict(lambda: dict.fromkeys(KPI_COUNTERS, 0))
+    for contribution, sign in ((before, -1), (after, 1)):
+        if contribution is None:
+            continue
+        for key in _rollup_keys(contribution):
+            for counter in KPI_COUNTERS:
+                deltas[key][counter] += sign * contribution[counter]
+    apply_deltas(session, deltas)
+
+
+def rebuild_kpis(session: Session) -> int:
+    """
+    Recompute every rollup from the production lines table.
+
+    Used to backfill after seeding or to repair drift; normal writes go
+    through ``apply_line_change``.
+    """
+    session.exec(delete(KpiRollup))
+    deltas = defaultdict(lambda: dict.fromkeys(KPI_COUNTERS, 0))
+    for line in session.exec(select(ProductionLine)).all():
+        contribution = line_contribution(line)
+        for key in _rollup_keys(contribution):
+            for counter in KPI_COUNTERS:
+                deltas[key][counter] += contribution[counter]
+    apply_deltas(session, deltas)
+    session.commit()
+    return len(deltas)
+
+
+def kpi_view(rollup: KpiRollup) -> dict:
+    """Derive the dashboard ratios from a rollup row."""
+    needed = rollup.employees_needed
+    attended = rollup.employees_attended
+    return {
+        "scope": rollup.scope,
+        "scope_id": rollup.scope_id,
+        "week_start": rollup.week_start,
+        "employees_needed": needed,
+        "employees_attended": attended,
+        "units_produced": rollup.units_produced,
+        "line_count": rollup.line_count,
+        "attendance_rate": round(attended / needed, 4) if needed else None,
+        "staffing_gap": needed - attended,
+        "output_per_head": round(rollup.units_produced / attended, 4)
+        if attended
+        else None,
+    }
+
+
+def get_kpi(
+    session: Session, scope: str, scope_id: int, week: date
+) -> Optional[KpiRollup]:
+    return session.exec(
+        select(KpiRollup).where(
+            KpiRollup.scope == scope,
+            KpiRollup.scope_id == scope_id,
+            KpiRollup.week_start == week_start_for(week),
+        )
+    ).first()
+
+
+def kpi_history(
+    session: Session, scope: str, scope_id: int, weeks: int
+) -> List[KpiRollup]:
+    """Most recent ``weeks`` rollups for a scope, oldest first."""
+    rollups = session.exec(
+        select(KpiRollup)
+        .where(KpiRollup.scope == scope, KpiRollup.scope_id == scope_id)
+        .order_by(KpiRollup.week_start.desc())
+        .limit(weeks)
+    ).all()
+    return list(reversed(rollups))
@@ -0,0 +1,79 @@
+from datetime import date
+from types import SimpleNamespace
+
+from models.models import Location, ShiftDetail, ShiftSchedule, TimeOffRequest
+from sqlmodel import Session, select
+from src.time_off import TimeOffIndex
+
+SHIFT_COLUMNS = (
+    ShiftSchedule.shift_id,
+    ShiftSchedule.shift_date,
+    ShiftSchedule.shift_type,
+    ShiftDetail.shift_desc,
+    ShiftDetail.shift_start_time,
+    ShiftDetail.shift_end_time,
+    ShiftSchedule.location_id,
+    Location.location_name,
+)
+TIME_OFF_COLUMNS = (
+    TimeOffRequest.id,
+    TimeOffRequest.start_date,
+    TimeOffRequest.end_date,
+    TimeOffRequest.status,
+    TimeOffRequest.reason_for_absence,
+)
+
+
+def employee_schedule(
+    session: Session, employee_id: int, first_day: date, last_day: date
+) -> dict:
+    """
+    Persisted assignments of one employee with their shift, location and
+    time off, as plain dicts.
+
+    The assignment scan is served by ``ix_shift_schedules_employee_schedule``;
+    shift and location details are primary-key lookups.
+    """
+    shift_names = [column.key for column in SHIFT_COLUMNS]
+    rows = session.exec(
+        select(*SHIFT_COLUMNS)
+        .select_from(ShiftSchedule)
+        .outerjoin(ShiftDetail, ShiftDetail.id == ShiftSchedule.shift_id)
+        .outerjoin(Location, Location.id == ShiftSchedule.location_id)
+        .where(
+            ShiftSchedule.employee_id == employee_id,
+            ShiftSchedule.shift_date >= first_day,
+            ShiftSchedule.shift_date <= last_day,
+        )
+        .order_by(ShiftSchedule.shift_date, ShiftDetail.shift_start_time)
+    ).all()
+
+    time_off_names = [column.key for column in TIME_OFF_COLUMNS]
+    time_off = [
+        dict(zip(time_off_names, row))
+        for row in session.exec(
+            select(*TIME_OFF_COLUMNS)
+            .where(
+                TimeOffRequest.employee_id == employee_id,
+                TimeOffRequest.start_date <= last_day,
+                TimeOffRequest.end_date >= first_day,
+            )
+            .order_by(TimeOffRequest.start_date)
+        )
+    ]
+    leave = TimeOffIndex(
+        SimpleNamespace(employee_id=employee_id, **request) for request in time_off
+    )
+
+    shifts = []
+    for row in rows:
+        shift = dict(zip(shift_names, row))
+        shift["on_leave"] = leave.is_off(employee_id, shift["shift_date"])
+        shifts.append(shift)
+    return {
+        "employee_id": employee_id,
+        "first_day": first_day,
+        "last_day": last_day,
+        "shifts": shifts,
+        "time_off": time_off,
+    }
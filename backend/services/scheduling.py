@@ -0,0 +1,562 @@
+import logging
+import multiprocessing
+import os
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import asdict, dataclass, field
+from datetime import timedelta
+from typing import Callable, List, Set, Tuple
+
+from models.database import read_session
+from models.models import (
+    Availability,
+    Employee,
+    EmployeeSkill,
+    ProductionLine,
+    ShiftDetail,
+    ShiftSchedule,
+    SkillRequirement,
+    TimeOffRequest,
+)
+from models.schemas import Disruption, ScenarioRequest
+from services.feeds import bump_feeds
+from sqlmodel import Session, select
+from src.labour import DEFAULT_RULES
+from src.records import (
+    AvailabilityRecord,
+    EmployeeRecord,
+    EmployeeSkillRecord,
+    ProductionLineRecord,
+    ShiftRecord,
+    SkillRequirementRecord,
+    TimeOffRecord,
+)
+from src.recording import record_solve
+from utils.admission import Overloaded, run_guarded, solver_pool
+
+
+def parse_stage_time_limits(text: str) -> dict:
+    """``"preferences=5,fairness=5"`` -> {"preferences": 5.0, "fairness": 5.0}"""
+    return {
+        stage.strip(): float(seconds)
+        for stage, _, seconds in (
+            item.partition("=") for item in text.split(",") if item.strip()
+        )
+    }
+
+
+# Budget for a full solve; weekly-hour caps make proving optimality slow on
+# large sites, so the best plan found by then is used.
+SCHEDULE_TIME_LIMIT = float(os.getenv("SCHEDULE_TIME_LIMIT", "30"))
+# "coverage" maximizes assignments only; "staged" then optimizes preferences
+# and fairness, each stage within its own budget ("stage=seconds,...").
+SCHEDULE_OBJECTIVE = os.getenv("SCHEDULE_OBJECTIVE", "coverage")
+SCHEDULE_STAGE_TIME_LIMITS = parse_stage_time_limits(
+    os.getenv("SCHEDULE_STAGE_TIME_LIMITS", "preferences=5,fairness=5")
+)
+# Days either side of a disruption that a repair may reshuffle, and the
+# solver budget for it.
+REPAIR_RADIUS_DAYS = int(os.getenv("REPAIR_RADIUS_DAYS", "0"))
+REPAIR_TIME_LIMIT = float(os.getenv("REPAIR_TIME_LIMIT", "1.0"))
+# Processes evaluating what-if scenarios (default: one per CPU)
+SCENARIO_WORKERS = int(os.getenv("SCENARIO_WORKERS", "0")) or os.cpu_count() or 1
+
+
+class ScenarioPool:
+    """
+    The processes evaluating what-if scenarios, shared by every batch of
+    this web worker.
+
+    Started in the app lifespan and shut down with it, so a batch reuses
+    warm processes instead of starting its own. At most ``workers``
+    processes run; how many batches queue on them is bounded by
+    ``solver_pool`` admission in the route.
+    """
+
+    def __init__(self, workers: int):
+        self.workers = workers
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def start(self):
+        with self._lock:
+            if self._executor is None and self.workers > 1:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers, mp_context=_scenario_context()
+                )
+        return self._executor
+
+    def run(self, fn: Callable):
+        """``fn(executor, workers)``; a broken pool is replaced for next time."""
+        executor = self.start()
+        try:
+            return fn(executor, self.workers)
+        except BrokenProcessPool:
+            with self._lock:
+                if self._executor is executor:
+                    self._executor = None
+            raise
+
+    def close(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(cancel_futures=True)
+
+
+def _scenario_context():
+    # Workers fork from a server that has already imported the solver, which
+    # is cheaper than spawning and safe to use from a threaded web worker.
+    if "forkserver" in multiprocessing.get_all_start_methods():
+        context = multiprocessing.get_context("forkserver")
+        context.set_forkserver_preload(["src.scenarios"])
+        return context
+    return multiprocessing.get_context("spawn")
+
+
+scenario_pool = ScenarioPool(SCENARIO_WORKERS)
+
+
+def columns(model, record):
+    """The model columns a record type is loaded from."""
+    return [getattr(model, name) for name in record._fields]
+
+
+def load_records(session: Session, model, record, *criteria) -> list:
+    """Rows of ``model`` as ``record`` tuples, without building ORM objects."""
+    statement = select(*columns(model, record))
+    if criteria:
+        statement = statement.where(*criteria)
+    return [record._make(row) for row in session.exec(statement)]
+
+
+@dataclass
+class AssignmentDiff:
+    """(employee id, shift id) pairs added and removed by a scheduling write."""
+
+    added: Set[Tuple[int, int]] = field(default_factory=set)
+    removed: Set[Tuple[int, int]] = field(default_factory=set)
+
+    @property
+    def employee_ids(self) -> Set[int]:
+        return {employee_id for employee_id, _ in self.added | self.removed}
+
+    @property
+    def shift_ids(self) -> Set[int]:
+        return {shift_id for _, shift_id in self.added | self.removed}
+
+
+def load_inputs(
+    session: Session, *shift_criteria, primary: Session = None
+) -> dict:
+    """
+    Load everything ``shift_schedule`` needs for the shifts matching
+    ``shift_criteria`` (all shifts when empty), as the compact records of
+    ``src.records``.
+
+    Availability and approved time off come from ``primary`` (default
+    ``session``): when ``session`` is a lagging replica, leave approved or
+    availability withdrawn since its last sync must still be honoured.
+
+    Approved time off is limited to requests overlapping the shifts' date
+    range, so the index stays proportional to the horizon being scheduled.
+    When only some shifts are in scope, the persisted assignments within a
+    week of them are returned as ``fixed`` so rest and weekly-hour limits
+    account for them.
+    """
+    primary = primary or session
+    shifts = load_records(session, ShiftDetail, ShiftRecord, *shift_criteria)
+    inputs = {
+        "employees": load_records(session, Employee, EmployeeRecord),
+        "shifts": shifts,
+        "availability": load_records(primary, Availability, AvailabilityRecord),
+        "employee_skills": load_records(session, EmployeeSkill, EmployeeSkillRecord),
+        "skill_requirements": load_records(
+            session, SkillRequirement, SkillRequirementRecord
+        ),
+        "production_lines": load_records(
+            session,
+            ProductionLine,
+            ProductionLineRecord,
+            ProductionLine.shift_id.is_not(None),
+        ),
+        "time_off_requests": [],
+        "fixed": [],
+    }
+    if shifts:
+        first_day = min(shift.shift_date for shift in shifts)
+        last_day = max(shift.shift_date for shift in shifts)
+        inputs["time_off_requests"] = load_records(
+            primary,
+            TimeOffRequest,
+            TimeOffRecord,
+            TimeOffRequest.status == "Approved",
+            TimeOffRequest.start_date <= last_day,
+            TimeOffRequest.end_date >= first_day,
+        )
+    if shifts and shift_criteria:
+        week = timedelta(days=7)
+        inputs["fixed"] = [
+            (row[0], ShiftRecord._make(row[1:]))
+            for row in session.exec(
+                select(ShiftSchedule.employee_id, *columns(ShiftDetail, ShiftRecord))
+                .join(ShiftDetail, ShiftDetail.id == ShiftSchedule.shift_id)
+                .where(
+                    ShiftDetail.shift_date > first_day - week,
+                    ShiftDetail.shift_date < last_day + week,
+                    ShiftDetail.id.not_in([shift.id for shift in shifts]),
+                )
+            )
+        ]
+    return inputs
+
+
+def save_assignments(
+    session: Session, shifts: List[ShiftRecord], assignments: List[dict]
+) -> AssignmentDiff:
+    """
+    Make the persisted assignments of ``shifts`` match a solver result.
+
+    Only rows that actually changed are deleted or inserted, and
+    ``current_employees`` is refreshed for the shifts in scope. Shifts are
+    re-read from ``session``, so inputs loaded elsewhere (e.g. a replica)
+    are written against the current rows and deleted shifts are skipped.
+    """
+    shifts_by_id = {}
+    if shifts:
+        shifts_by_id = {
+            shift.id: shift
+            for shift in session.exec(
+                select(ShiftDetail).where(
+                    ShiftDetail.id.in_([shift.id for shift in shifts])
+                )
+            )
+        }
+    assignments = [a for a in assignments if a["shift_id"] in shifts_by_id]
+    existing = {}
+    if shifts_by_id:
+        for row in session.exec(
+            select(ShiftSchedule).where(ShiftSchedule.shift_id.in_(shifts_by_id))
+        ):
+            existing[(row.employee_id, row.shift_id)] = row
+    wanted = {
+        (assignment["employee_id"], assignment["shift_id"])
+        for assignment in assignments
+    }
+
+    diff = AssignmentDiff(
+        added=wanted - set(existing), removed=set(existing) - wanted
+    )
+    for key in diff.removed:
+        session.delete(existing[key])
+    for employee_id, shift_id in diff.added:
+        shift = shifts_by_id[shift_id]
+        session.add(
+            ShiftSchedule(
+                shift_date=shift.shift_date,
+                shift_type=shift.shift_desc or shift.shift_week_day,
+                employee_id=employee_id,
+                location_id=shift.location_id,
+                shift_id=shift_id,
+            )
+        )
+
+    if diff.added or diff.removed:
+        bump_feeds(
+            session,
+            diff.employee_ids,
+            {shifts_by_id[shift_id].location_id for shift_id in diff.shift_ids},
+        )
+
+    headcount = Counter(shift_id for _, shift_id in wanted)
+    for shift in shifts_by_id.values():
+        if shift.current_employees != headcount[shift.id]:
+            shift.current_employees = headcount[shift.id]
+            session.add(shift)
+    session.commit()
+    return diff
+
+
+def run_schedule(
+    session: Session,
+    *shift_criteria,
+    objective: str = None,
+    from_replica: bool = False,
+) -> Tuple[List[dict], AssignmentDiff]:
+    """
+    Solve the shifts matching ``shift_criteria`` and persist the result.
+
+    If the solver finds no plan, the persisted one is kept and no
+    assignments are returned. With ``from_replica`` the bulk of the inputs
+    is read from a replica, but availability and time off still come from
+    ``session``; callers that have just written in ``session`` leave it off.
+    """
+    # The solver pulls in ortools, so it is only imported on the first run.
+    from src.schedule import shift_schedule
+
+    if from_replica:
+        with read_session() as replica:
+            inputs = load_inputs(replica, *shift_criteria, primary=session)
+    else:
+        inputs = load_inputs(session, *shift_criteria)
+    params = {
+        "time_limit": SCHEDULE_TIME_LIMIT,
+        "objective": objective or SCHEDULE_OBJECTIVE,
+        "stage_time_limits": SCHEDULE_STAGE_TIME_LIMITS,
+    }
+    started_at = time.perf_counter()
+    assignments, status = shift_schedule(**inputs, **params)
+    record_solve(
+        "schedule",
+        inputs,
+        {**params, "labour_rules": asdict(DEFAULT_RULES)},
+        assignments,
+        time.perf_counter() - started_at,
+        status=status,
+    )
+    if assignments is None:
+        return [], AssignmentDiff()
+    diff = save_assignments(session, inputs["shifts"], assignments)
+    return assignments, diff
+
+
+def apply_time_off_decision(
+    session: Session, request: TimeOffRequest, previous_status: str
+) -> AssignmentDiff:
+    """
+    Update only the shifts a time-off decision touches.
+
+    Approving leave drops the employee's assignments inside the leave window
+    and commits that first, then re-solves the window so the freed shifts
+    are staffed again. Withdrawing an approval re-solves the same window,
+    since the employee may be eligible for those shifts again. If the
+    re-solve finds no plan, the dropped assignments stay dropped.
+    """
+    if request.status == previous_status:
+        return AssignmentDiff()
+
+    dropped = set()
+    if request.status == "Approved":
+        rows = session.exec(
+            select(ShiftSchedule).where(
+                ShiftSchedule.employee_id == request.employee_id,
+                ShiftSchedule.shift_date >= request.start_date,
+                ShiftSchedule.shift_date <= request.end_date,
+            )
+        ).all()
+        dropped = {(row.employee_id, row.shift_id) for row in rows}
+        # Leave shows in the employee's feed even without assignments to drop
+        bump_feeds(
+            session, [request.employee_id], {row.location_id for row in rows}
+        )
+        freed = {row.shift_id for row in rows if row.shift_id}
+        shifts_by_id = {}
+        if freed:
+            shifts_by_id = {
+                shift.id: shift
+                for shift in session.exec(
+                    select(ShiftDetail).where(ShiftDetail.id.in_(freed))
+                )
+            }
+        for row in rows:
+            session.delete(row)
+            shift = shifts_by_id.get(row.shift_id)
+            if shift is not None and shift.current_employees:
+                shift.current_employees -= 1
+                session.add(shift)
+        session.commit()
+        if not freed:
+            return AssignmentDiff(removed=dropped)
+    elif previous_status == "Approved":
+        bump_feeds(session, [request.employee_id])
+        session.commit()
+    else:
+        return AssignmentDiff()
+
+    # Same admission as /schedule; decisions on the same window share one
+    # solve.
+    _, diff = run_guarded(
+        ("schedule-window", request.start_date, request.end_date),
+        solver_pool,
+        lambda: run_schedule(
+            session,
+            ShiftDetail.shift_date >= request.start_date,
+            ShiftDetail.shift_date <= request.end_date,
+        ),
+    )
+    return AssignmentDiff(added=diff.added, removed=dropped | diff.removed)
+
+
+def repair(session: Session, disruption: Disruption) -> dict:
+    """
+    Repair the persisted plan after a disruption by re-solving only the
+    shifts within ``REPAIR_RADIUS_DAYS`` of it.
+
+    A removed shift keeps its row (other tables reference it) but its
+    capacity drops to 0, so the repair unstaffs it.
+    """
+    from src.repair import repair_schedule
+
+    started_at = time.perf_counter()
+    blocked = []
+    if disruption.kind == "employee_unavailable":
+        first_day, last_day = disruption.start_date, disruption.end_date
+        blocked.append(
+            (disruption.employee_id, disruption.start_date, disruption.end_date)
+        )
+    else:
+        shift = session.get(ShiftDetail, disruption.shift_id)
+        if disruption.kind == "shift_removed":
+            shift.capacity = 0
+            session.add(shift)
+            session.flush()
+        first_day = last_day = shift.shift_date
+
+    radius = timedelta(days=REPAIR_RADIUS_DAYS)
+    inputs = load_inputs(
+        session,
+        ShiftDetail.shift_date >= first_day - radius,
+        ShiftDetail.shift_date <= last_day + radius,
+    )
+    shifts = inputs["shifts"]
+    current = set()
+    if shifts:
+        current = {
+            (row.employee_id, row.shift_id)
+            for row in session.exec(
+                select(ShiftSchedule).where(
+                    ShiftSchedule.shift_id.in_([shift.id for shift in shifts])
+                )
+            )
+        }
+
+    solve_started_at = time.perf_counter()
+    assignments, status = repair_schedule(
+        **inputs, current=current, blocked=blocked, time_limit=REPAIR_TIME_LIMIT
+    )
+    record_solve(
+        "repair",
+        inputs,
+        {"time_limit": REPAIR_TIME_LIMIT, "labour_rules": asdict(DEFAULT_RULES)},
+        assignments,
+        time.perf_counter() - solve_started_at,
+        status=status,
+        context={"current": sorted(current), "blocked": blocked},
+    )
+    if assignments is None:
+        session.rollback()
+        diff = AssignmentDiff()
+    else:
+        diff = save_assignments(session, shifts, assignments)
+    return {
+        "status": status,
+        "neighbourhood_shift_ids": sorted(shift.id for shift in shifts),
+        "removed_assignments": sorted(diff.removed),
+        "added_assignments": sorted(diff.added),
+        "solve_seconds": round(time.perf_counter() - started_at, 4),
+    }
+
+
+def run_scenarios(session: Session, request: ScenarioRequest) -> List[dict]:
+    """
+    Evaluate what-if scenarios against the persisted plan without changing it.
+
+    The plan and eligibility around every date the scenarios touch are
+    loaded and computed once, then each scenario is repaired on its own in
+    ``scenario_pool`` (see ``src.scenarios``).
+    """
+    from src.scenarios import ScenarioBase, evaluate_all
+    from src.schedule import eligible_pairs
+
+    days = []
+    for scenario in request.scenarios:
+        for perturbation in scenario.perturbations:
+            if perturbation.kind == "employee_unavailable":
+                days += [perturbation.start_date, perturbation.end_date]
+            elif perturbation.new_shift is not None:
+                days.append(perturbation.new_shift.shift_date)
+            else:
+                shift = session.get(ShiftDetail, perturbation.shift_id)
+                if shift is not None:
+                    days.append(shift.shift_date)
+    if not days:
+        return []
+
+    # Repairs look REPAIR_RADIUS_DAYS around each perturbation, and the
+    # labour rules a week beyond that.
+    margin = timedelta(days=REPAIR_RADIUS_DAYS + 7)
+    inputs = load_inputs(
+        session,
+        ShiftDetail.shift_date >= min(days) - margin,
+        ShiftDetail.shift_date <= max(days) + margin,
+    )
+    shifts = {shift.id: shift for shift in inputs.pop("shifts")}
+    fixed = inputs.pop("fixed")
+    pairs = eligible_pairs(shifts=list(shifts.values()), **inputs)
+    current = set()
+    if shifts:
+        current = {
+            (row.employee_id, row.shift_id)
+            for row in session.exec(
+                select(ShiftSchedule).where(ShiftSchedule.shift_id.in_(shifts))
+            )
+        }
+    base = ScenarioBase(
+        shifts=shifts,
+        pairs=[(employee_id, shift.id) for employee_id, shift in pairs],
+        current=current,
+        inputs=inputs,
+        fixed=fixed,
+        radius_days=REPAIR_RADIUS_DAYS,
+        time_limit=REPAIR_TIME_LIMIT,
+    )
+
+    scenarios = [
+        [perturbation.model_dump() for perturbation in scenario.perturbations]
+        for scenario in request.scenarios
+    ]
+    results = scenario_pool.run(
+        lambda executor, workers: evaluate_all(base, scenarios, executor, workers)
+    )
+    return [
+        {"name": scenario.name, **result}
+        for scenario, result in zip(request.scenarios, results)
+    ]
+
+
+def time_off_decision_response(
+    request: TimeOffRequest, diff: AssignmentDiff, replan_error: str = None
+) -> dict:
+    return {
+        "request": request,
+        "removed_assignments": sorted(diff.removed),
+        "added_assignments": sorted(diff.added),
+        "affected_shift_ids": sorted(diff.shift_ids),
+        "replan_error": replan_error,
+    }
+
+
+def decide_time_off(
+    session: Session, request: TimeOffRequest, previous_status: str
+) -> dict:
+    """
+    Apply a committed time-off decision to the plan and build the response.
+
+    The request is already stored, so a failed or shed re-solve must not
+    fail the call: the plan is left as it was, apart from assignments that
+    approved leave already dropped, and ``replan_error`` says why.
+    """
+    try:
+        diff = apply_time_off_decision(session, request, previous_status)
+    except Overloaded as e:
+        session.rollback()
+        logging.warning("Re-solve for time off request %s shed: %s", request.id, e)
+        return time_off_decision_response(request, AssignmentDiff(), str(e))
+    except Exception as e:
+        session.rollback()
+        logging.exception("Could not apply time off request %s", request.id)
+        return time_off_decision_response(request, AssignmentDiff(), str(e))
+    return time_off_decision_response(request, diff)
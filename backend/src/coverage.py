@@ -0,0 +1,209 @@
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+
+from src.labour import MINUTES_PER_DAY, shift_span
+
+WEEK_DAYS = ("Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday")
+BUCKET_MINUTES = {"hour": 60, "day": MINUTES_PER_DAY}
+
+
+def to_datetime(minute: int) -> datetime:
+    """Inverse of the minute timeline used by ``shift_span``."""
+    day, offset = divmod(minute, MINUTES_PER_DAY)
+    return datetime.fromordinal(day) + timedelta(minutes=offset)
+
+
+def merged_windows(availability):
+    """
+    Availability as employee id -> week day -> merged [(start, end)] minute
+    offsets, so overlapping rows never count an employee twice.
+    """
+    raw = defaultdict(lambda: defaultdict(list))
+    for row in availability:
+        start = row.start_time.hour * 60 + row.start_time.minute
+        end = row.end_time.hour * 60 + row.end_time.minute
+        if end <= start:
+            end += MINUTES_PER_DAY
+        raw[row.employee_id][row.day_of_week].append((start, end))
+
+    windows = defaultdict(dict)
+    for employee_id, days in raw.items():
+        for day, spans in days.items():
+            merged = []
+            for start, end in sorted(spans):
+                if merged and start <= merged[-1][1]:
+                    merged[-1][1] = max(merged[-1][1], end)
+                else:
+                    merged.append([start, end])
+            windows[employee_id][day] = merged
+    return windows
+
+
+def coverage_events(
+    *, shifts, availability, employee_locations, first_day, last_day, time_off=None
+):
+    """
+    Sweep events per location: (minute, available delta, demand delta,
+    shift id). Weekly availability is laid out on every date of the range,
+    and the day before for windows running past midnight, skipping approved
+    time off.
+    """
+    events = defaultdict(list)
+    windows = merged_windows(availability)
+    for employee_id, days in windows.items():
+        location_id = employee_locations.get(employee_id)
+        if location_id is None:
+            continue
+        for ordinal in range(first_day.toordinal() - 1, last_day.toordinal() + 1):
+            day = date.fromordinal(ordinal)
+            spans = days.get(WEEK_DAYS[day.weekday()])
+            if not spans or (time_off and time_off.is_off(employee_id, day)):
+                continue
+            base = ordinal * MINUTES_PER_DAY
+            for start, end in spans:
+                events[location_id].append((base + start, 1, 0, None))
+                events[location_id].append((base + end, -1, 0, None))
+
+    for shift in shifts:
+        start, end = shift_span(shift)
+        capacity = shift.capacity or 0
+        events[shift.location_id].append((start, 0, capacity, shift.id))
+        events[shift.location_id].append((end, 0, -capacity, -shift.id))
+    return events
+
+
+def sweep(events, range_start, range_end):
+    """
+    Walk the sorted events once and yield (start, end, available, demand,
+    active shift ids) segments covering [range_start, range_end).
+    """
+    # Zero-delta sentinels make the segments span the whole range
+    events = sorted(
+        events + [(range_start, 0, 0, None), (range_end, 0, 0, None)],
+        key=lambda event: event[0],
+    )
+    available = demand = 0
+    active = set()
+    previous = None
+    for minute, available_delta, demand_delta, shift_id in events:
+        if previous is not None and minute > previous:
+            start, end = max(previous, range_start), min(minute, range_end)
+            if start < end:
+                yield start, end, available, demand, active
+        available += available_delta
+        demand += demand_delta
+        if shift_id is not None:
+            if shift_id > 0:
+                active.add(shift_id)
+            else:
+                active.discard(-shift_id)
+        previous = minute
+
+
+def analyse(
+    *,
+    shifts,
+    availability,
+    employee_locations,
+    first_day,
+    last_day,
+    time_off=None,
+    resolution="hour",
+):
+    """
+    Compare available headcount with shift capacity per location.
+
+    Returns (gaps, curve): maximal windows where capacity exceeds the
+    employees available, and the headcount curve either at every change
+    (``resolution="event"``) or per hour/day bucket with the minimum
+    available, the peak demand and the minutes under-covered.
+    """
+    range_start = first_day.toordinal() * MINUTES_PER_DAY
+    range_end = (last_day.toordinal() + 1) * MINUTES_PER_DAY
+    gaps, curve = [], []
+    events_by_location = coverage_events(
+        shifts=shifts,
+        availability=availability,
+        employee_locations=employee_locations,
+        first_day=first_day,
+        last_day=last_day,
+        time_off=time_off,
+    )
+    bucket_minutes = BUCKET_MINUTES.get(resolution)
+
+    for location_id in sorted(events_by_location):
+        gap = None
+        buckets = {}
+        for start, end, available, demand, active in sweep(
+            events_by_location[location_id], range_start, range_end
+        ):
+            if demand > available:
+                if gap is not None and gap["end"] == start:
+                    gap["end"] = end
+                    gap["min_available"] = min(gap["min_available"], available)
+                    gap["peak_demand"] = max(gap["peak_demand"], demand)
+                    gap["shortfall"] = max(gap["shortfall"], demand - available)
+                    gap["shift_ids"].update(active)
+                else:
+                    gap = {
+                        "location_id": location_id,
+                        "start": start,
+                        "end": end,
+                        "min_available": available,
+                        "peak_demand": demand,
+                        "shortfall": demand - available,
+                        "shift_ids": set(active),
+                    }
+                    gaps.append(gap)
+
+            if bucket_minutes is None:
+                point = {
+                    "location_id": location_id,
+                    "start": start,
+                    "end": end,
+                    "available": available,
+                    "demand": demand,
+                    "uncovered_minutes": end - start if demand > available else 0,
+                }
+                last = curve[-1] if curve else None
+                if (
+                    last
+                    and last["location_id"] == location_id
+                    and last["end"] == start
+                    and (last["available"], last["demand"]) == (available, demand)
+                ):
+                    last["end"] = end
+                    last["uncovered_minutes"] += point["uncovered_minutes"]
+                else:
+                    curve.append(point)
+                continue
+
+            # A segment can span several buckets
+            bucket_start = start - (start - range_start) % bucket_minutes
+            while bucket_start < end:
+                bucket_end = bucket_start + bucket_minutes
+                overlap = min(end, bucket_end) - max(start, bucket_start)
+                bucket = buckets.setdefault(
+                    bucket_start,
+                    {
+                        "location_id": location_id,
+                        "start": bucket_start,
+                        "end": bucket_end,
+                        "available": available,
+                        "demand": demand,
+                        "uncovered_minutes": 0,
+                    },
+                )
+                bucket["available"] = min(bucket["available"], available)
+                bucket["demand"] = max(bucket["demand"], demand)
+                if demand > available:
+                    bucket["uncovered_minutes"] += overlap
+                bucket_start = bucket_end
+        curve.extend(buckets[key] for key in sorted(buckets))
+
+    for entry in gaps + curve:
+        entry["start"] = to_datetime(entry["start"])
+        entry["end"] = to_datetime(entry["end"])
+    for gap in gaps:
+        gap["shift_ids"] = sorted(gap["shift_ids"])
+    return gaps, curve
@@ -0,0 +1,96 @@
+from datetime import date, datetime, timedelta
+from typing import Iterable, List
+
+PRODID = "-//Employee Scheduling System//Schedule Feed//EN"
+
+
+def escape(text: str) -> str:
+    """Escape a TEXT value (RFC 5545, 3.3.11)."""
+    return (
+        text.replace("\\", "\\\\")
+        .replace(";", "\\;")
+        .replace(",", "\\,")
+        .replace("\r\n", "\\n")
+        .replace("\n", "\\n")
+    )
+
+
+def fold(line: str) -> str:
+    """Fold a content line at 75 octets without splitting a UTF-8 sequence."""
+    encoded = line.encode("utf-8")
+    if len(encoded) <= 75:
+        return line
+    parts, start, limit = [], 0, 75
+    while start < len(encoded):
+        end = min(start + limit, len(encoded))
+        # Step back over continuation bytes so each part stays valid UTF-8
+        while end < len(encoded) and encoded[end] & 0xC0 == 0x80:
+            end -= 1
+        parts.append(encoded[start:end].decode("utf-8"))
+        start, limit = end, 74  # continuation lines start with a space
+    return "\r\n ".join(parts)
+
+
+def format_datetime(value: datetime) -> str:
+    return value.strftime("%Y%m%dT%H%M%S")
+
+
+def format_date(value: date) -> str:
+    return value.strftime("%Y%m%d")
+
+
+def timed_event(
+    uid: str,
+    start: datetime,
+    end: datetime,
+    summary: str,
+    stamp: datetime,
+    location: str = None,
+    description: str = None,
+) -> List[str]:
+    # Floating local times: shifts happen at the site's wall-clock time
+    lines = [
+        "BEGIN:VEVENT",
+        f"UID:{uid}",
+        f"DTSTAMP:{format_datetime(stamp)}Z",
+        f"DTSTART:{format_datetime(start)}",
+        f"DTEND:{format_datetime(end)}",
+        f"SUMMARY:{escape(summary)}",
+    ]
+    if location:
+        lines.append(f"LOCATION:{escape(location)}")
+    if description:
+        lines.append(f"DESCRIPTION:{escape(description)}")
+    lines.append("END:VEVENT")
+    return lines
+
+
+def all_day_event(
+    uid: str, first_day: date, last_day: date, summary: str, stamp: datetime
+) -> List[str]:
+    return [
+        "BEGIN:VEVENT",
+        f"UID:{uid}",
+        f"DTSTAMP:{format_datetime(stamp)}Z",
+        f"DTSTART;VALUE=DATE:{format_date(first_day)}",
+        # DTEND is exclusive for all-day events
+        f"DTEND;VALUE=DATE:{format_date(last_day + timedelta(days=1))}",
+        f"SUMMARY:{escape(summary)}",
+        "TRANSP:TRANSPARENT",
+        "END:VEVENT",
+    ]
+
+
+def render_calendar(name: str, events: Iterable[List[str]]) -> bytes:
+    lines = [
+        "BEGIN:VCALENDAR",
+        "VERSION:2.0",
+        f"PRODID:{PRODID}",
+        "CALSCALE:GREGORIAN",
+        "METHOD:PUBLISH",
+        f"X-WR-CALNAME:{escape(name)}",
+    ]
+    for event in events:
+        lines.extend(event)
+    lines.append("END:VCALENDAR")
+    return ("\r\n".join(fold(line) for line in lines) + "\r\n").encode("utf-8")
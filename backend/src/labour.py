@@ -0,0 +1,139 @@
+import os
+from collections import defaultdict
+from dataclasses import dataclass
+
+MINUTES_PER_DAY = 24 * 60
+
+
+@dataclass(frozen=True)
+class LabourRules:
+    max_weekly_hours: float = 48.0
+    min_rest_hours: float = 11.0
+    window_days: int = 7
+
+    @classmethod
+    def from_env(cls) -> "LabourRules":
+        return cls(
+            max_weekly_hours=float(os.getenv("MAX_WEEKLY_HOURS", "48")),
+            min_rest_hours=float(os.getenv("MIN_REST_HOURS", "11")),
+        )
+
+
+DEFAULT_RULES = LabourRules.from_env()
+
+
+def shift_span(shift):
+    """
+    Start and end of a shift in minutes since 0001-01-01. A shift ending at
+    or before its start time runs past midnight.
+    """
+    day = shift.shift_date.toordinal() * MINUTES_PER_DAY
+    start = day + shift.shift_start_time.hour * 60 + shift.shift_start_time.minute
+    end = day + shift.shift_end_time.hour * 60 + shift.shift_end_time.minute
+    if end <= start:
+        end += MINUTES_PER_DAY
+    return start, end
+
+
+def conflict_cliques(spans):
+    """
+    Maximal groups of pairwise overlapping half-open ``(start, end)`` spans,
+    as lists of indexes into ``spans``. Groups of one are left out.
+
+    A sweep over the starts: the spans still running form a clique, and it
+    is maximal when the next start would first drop one of them.
+    """
+    cliques = []
+    running = []
+    grew = False
+    for index in sorted(range(len(spans)), key=lambda index: spans[index][0]):
+        start = spans[index][0]
+        still_running = [other for other in running if spans[other][1] > start]
+        if grew and len(still_running) < len(running):
+            if len(running) > 1:
+                cliques.append(running)
+            grew = False
+        running = still_running + [index]
+        grew = True
+    if grew and len(running) > 1:
+        cliques.append(running)
+    return cliques
+
+
+def add_labour_constraints(model, employee_shift_vars, rules, fixed=()):
+    """
+    Forbid overlapping shifts, short rests and weekly hours over the cap.
+
+    ``employee_shift_vars`` maps (employee id, shift id) -> (shift, var).
+    ``fixed`` holds (employee id, shift) assignments that stay as they are,
+    e.g. persisted shifts just outside the horizon being solved; they count
+    towards rest and hours but get no variable.
+
+    Each shift occupies the employee from its start until the rest period
+    after it has passed. Shifts whose occupied spans overlap conflict, and
+    the conflicts of one employee form an interval graph, so they are
+    covered by one ``AddAtMostOne`` per maximal clique (at most one per
+    shift). Unlike a single ``AddNoOverlap``, these are linear constraints
+    the LP relaxation sees, and unlike one clause per conflicting pair they
+    stay linear in the number of shifts. Hours use one linear sum per
+    ``window_days`` window starting on a day the employee could work, which
+    covers every calendar window.
+    """
+    rest = int(rules.min_rest_hours * 60)
+    cap = int(rules.max_weekly_hours * 60)
+
+    per_employee = defaultdict(list)
+    for (employee_id, _), (shift, var) in employee_shift_vars.items():
+        per_employee[employee_id].append((shift, var))
+    for employee_id, shift in fixed:
+        if employee_id in per_employee:
+            per_employee[employee_id].append((shift, None))
+
+    for employee_id, entries in per_employee.items():
+        if len(entries) < 2 and all(var is not None for _, var in entries):
+            # A single optional shift can neither overlap nor exceed a cap
+            # that is at least a shift long.
+            continue
+
+        spans = [shift_span(shift) for shift, _ in entries]
+        occupied = [(start, end + rest) for start, end in spans]
+        for clique in conflict_cliques(occupied):
+            free = [entries[index][1] for index in clique]
+            free = [var for var in free if var is not None]
+            if len(free) < len(clique):
+                # A fixed shift takes the whole clique. Fixed shifts that
+                # already clash with each other are a fact of the existing
+                # plan and are not constrained, so the model stays feasible.
+                for var in free:
+                    model.Add(var == 0)
+            elif len(free) > 1:
+                model.AddAtMostOne(free)
+
+        # Sliding windows over entries sorted by start day
+        timeline = sorted(
+            (
+                (shift.shift_date.toordinal(), end - start, var)
+                for (shift, var), (start, end) in zip(entries, spans)
+            ),
+            key=lambda entry: entry[0],
+        )
+        first = last = 0
+        for window_start in sorted({day for day, _, _ in timeline}):
+            while timeline[first][0] < window_start:
+                first += 1
+            while (
+                last < len(timeline)
+                and timeline[last][0] < window_start + rules.window_days
+            ):
+                last += 1
+            window = timeline[first:last]
+            if sum(minutes for _, minutes, _ in window) <= cap:
+                continue
+            free = [(minutes, var) for _, minutes, var in window if var is not None]
+            if not free:
+                continue
+            fixed_minutes = sum(minutes for _, minutes, var in window if var is None)
+            model.Add(
+                sum(minutes * var for minutes, var in free)
+                <= max(cap - fixed_minutes, 0)
+            )
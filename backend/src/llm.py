@@ -0,0 +1,272 @@
+import hashlib
+import os
+import threading
+import time
+from collections import deque
+from dataclasses import asdict, dataclass
+from typing import Iterator, List, Optional
+
+from utils.metrics import registry
+
+LLM_CALL_SECONDS = registry.histogram(
+    "llm_call_duration_seconds",
+    "LLM call latency split into queue wait, first token and total.",
+    ("backend", "model", "phase"),
+)
+LLM_CALLS = registry.counter(
+    "llm_calls_total",
+    "LLM calls by backend, model and outcome.",
+    ("backend", "model", "outcome"),
+)
+
+
+@dataclass
+class LLMCallTiming:
+    """Timings recorded for a single LLM call, in seconds."""
+
+    backend: str
+    model_name: str
+    queue_wait: float
+    time_to_first_token: Optional[float]
+    total_time: float
+    tokens: int
+    tokens_per_second: Optional[float]
+    error: Optional[str] = None
+
+
+class TimingRecorder:
+    """
+    Keeps the most recent call timings in a bounded ring buffer.
+    """
+
+    def __init__(self, max_entries: int = 1000):
+        self._entries = deque(maxlen=max_entries)
+        self._lock = threading.Lock()
+
+    def record(self, timing: LLMCallTiming):
+        with self._lock:
+            self._entries.append(timing)
+        labels = {"backend": timing.backend, "model": timing.model_name}
+        LLM_CALLS.inc(outcome="error" if timing.error else "ok", **labels)
+        LLM_CALL_SECONDS.observe(timing.queue_wait, phase="queue_wait", **labels)
+        LLM_CALL_SECONDS.observe(timing.total_time, phase="total", **labels)
+        if timing.time_to_first_token is not None:
+            LLM_CALL_SECONDS.observe(
+                timing.time_to_first_token, phase="first_token", **labels
+            )
+
+    def recent(self, limit: int = 50) -> List[dict]:
+        if limit <= 0:
+            return []
+        with self._lock:
+            entries = list(self._entries)[-limit:]
+        return [asdict(entry) for entry in entries]
+
+    def summary(self) -> dict:
+        """Count, error count and p50/p95/max for each timing field."""
+        with self._lock:
+            entries = list(self._entries)
+        summary = {
+            "count": len(entries),
+            "errors": sum(1 for entry in entries if entry.error),
+        }
+        for field in (
+            "queue_wait",
+            "time_to_first_token",
+            "total_time",
+            "tokens_per_second",
+        ):
+            values = sorted(
+                getattr(entry, field)
+                for entry in entries
+                if getattr(entry, field) is not None
+            )
+            if not values:
+                summary[field] = None
+                continue
+            summary[field] = {
+                "p50": values[int(0.50 * (len(values) - 1))],
+                "p95": values[int(0.95 * (len(values) - 1))],
+                "max": values[-1],
+            }
+        return summary
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class LLMBackend:
+    """
+    Interface every text-generation backend implements.
+
+    Backends only need to stream text chunks; timing, concurrency limits and
+    joining the chunks are handled by ``complete``.
+    """
+
+    name = "base"
+
+    def stream(
+        self, prompt: str, *, model_name: str, generation_config: dict
+    ) -> Iterator[str]:
+        raise NotImplementedError
+
+
+class GeminiBackend(LLMBackend):
+    """
+    Google Gemini backend. The SDK is imported on first use.
+    """
+
+    name = "gemini"
+
+    def __init__(self):
+        self._genai = None
+        self._lock = threading.Lock()
+
+    def _client(self):
+        with self._lock:
+            if self._genai is None:
+                api_key = os.getenv("GEMINI_API_KEY")
+                if not api_key:
+                    raise ValueError(
+                        "GEMINI_API_KEY not found in environment variables. Please set it in your .env file."
+                    )
+                import google.generativeai as genai
+
+                genai.configure(api_key=api_key)
+                self._genai = genai
+        return self._genai
+
+    def stream(self, prompt, *, model_name, generation_config):
+        genai = self._client()
+        model = genai.GenerativeModel(
+            model_name=model_name, generation_config=generation_config
+        )
+        chat_session = model.start_chat(history=[])
+        for chunk in chat_session.send_message(prompt, stream=True):
+            yield chunk.text
+
+
+class StubBackend(LLMBackend):
+    """
+    Deterministic local stand-in for load tests and benchmarks.
+
+    Sleeps ``first_token_latency`` seconds, then emits ``tokens`` words at
+    ``tokens_per_second``. The words are derived from a hash of the prompt, so
+    the same prompt always yields the same text.
+    """
+
+    name = "stub"
+
+    VOCABULARY = (
+        "efficiency", "output", "attendance", "target", "headcount", "shift",
+        "line", "week", "forecast", "capacity", "trend", "improved", "declined",
+        "critical", "stable", "staffing", "gap", "recommend", "increase", "hold",
+    )
+
+    def __init__(
+        self,
+        first_token_latency: float = 0.2,
+        tokens_per_second: float = 200.0,
+        tokens: int = 120,
+    ):
+        self.first_token_latency = first_token_latency
+        self.tokens_per_second = tokens_per_second
+        self.tokens = tokens
+
+    @classmethod
+    def from_env(cls) -> "StubBackend":
+        return cls(
+            first_token_latency=float(os.getenv("LLM_STUB_LATENCY_MS", "200")) / 1000,
+            tokens_per_second=float(os.getenv("LLM_STUB_TOKENS_PER_SECOND", "200")),
+            tokens=int(os.getenv("LLM_STUB_TOKENS", "120")),
+        )
+
+    def stream(self, prompt, *, model_name, generation_config):
+        digest = hashlib.sha256(f"{model_name}:{prompt}".encode()).digest()
+        interval = 1 / self.tokens_per_second if self.tokens_per_second > 0 else 0
+        time.sleep(self.first_token_latency)
+        for index in range(self.tokens):
+            if index and interval:
+                time.sleep(interval)
+            word = self.VOCABULARY[digest[index % len(digest)] % len(self.VOCABULARY)]
+            yield word if index == 0 else f" {word}"
+
+
+BACKENDS = {
+    GeminiBackend.name: GeminiBackend,
+    StubBackend.name: StubBackend.from_env,
+}
+
+timings = TimingRecorder(max_entries=int(os.getenv("LLM_TIMING_HISTORY", "1000")))
+
+_backend: Optional[LLMBackend] = None
+_backend_lock = threading.Lock()
+_slots = threading.BoundedSemaphore(int(os.getenv("LLM_MAX_CONCURRENCY", "4")))
+
+
+def get_backend() -> LLMBackend:
+    """Return the process-wide backend selected by ``LLM_BACKEND``."""
+    global _backend
+    with _backend_lock:
+        if _backend is None:
+            name = os.getenv("LLM_BACKEND", GeminiBackend.name)
+            if name not in BACKENDS:
+                raise ValueError(f"Unknown LLM_BACKEND '{name}'")
+            _backend = BACKENDS[name]()
+        return _backend
+
+
+def set_backend(backend: LLMBackend):
+    """Swap the backend, e.g. for a benchmark run with a tuned stub."""
+    global _backend
+    with _backend_lock:
+        _backend = backend
+
+
+def complete(prompt: str, *, model_name: str, generation_config: dict) -> str:
+    """
+    Run a prompt through the active backend and record its timings.
+
+    Calls wait for one of ``LLM_MAX_CONCURRENCY`` slots; the time spent waiting
+    is reported as ``queue_wait``.
+    """
+    backend = get_backend()
+    queued_at = time.perf_counter()
+    with _slots:
+        started_at = time.perf_counter()
+        first_token_at = None
+        chunks = []
+        tokens = 0
+        error = None
+        try:
+            for chunk in backend.stream(
+                prompt, model_name=model_name, generation_config=generation_config
+            ):
+                if first_token_at is None:
+                    first_token_at = time.perf_counter()
+                chunks.append(chunk)
+                tokens += len(chunk.split())
+        except Exception as e:
+            error = str(e)
+            raise
+        finally:
+            finished_at = time.perf_counter()
+            generation_time = finished_at - (first_token_at or finished_at)
+            timings.record(
+                LLMCallTiming(
+                    backend=backend.name,
+                    model_name=model_name,
+                    queue_wait=started_at - queued_at,
+                    time_to_first_token=first_token_at - started_at
+                    if first_token_at
+                    else None,
+                    total_time=finished_at - queued_at,
+                    tokens=tokens,
+                    tokens_per_second=tokens / generation_time
+                    if generation_time > 0
+                    else None,
+                    error=error,
+                )
+            )
+    return "".join(chunks)
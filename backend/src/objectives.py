@@ -0,0 +1,163 @@
+import time
+from collections import defaultdict
+
+from ortools.sat.python import cp_model
+from src.labour import shift_span
+from utils.metrics import registry
+
+STAGES = ("coverage", "preferences", "fairness")
+
+STAGE_OBJECTIVE = registry.gauge(
+    "solver_stage_objective",
+    "Objective value reached by each stage of the most recent staged solve.",
+    ("stage",),
+)
+
+
+def preference_score(employee, shift) -> int:
+    """
+    One point when the shift falls on a preferred day and one when it
+    matches a preferred shift, e.g. "Morning" for "Morning shift".
+    """
+    score = 0
+    if shift.shift_week_day in (employee.employee_preference_days or ()):
+        score += 1
+    desc = (shift.shift_desc or "").lower()
+    if any(
+        preference.lower() in desc
+        for preference in employee.employee_preference_shifts or ()
+    ):
+        score += 1
+    return score
+
+
+def stage_objectives(model, employee_shift_vars, employees):
+    """
+    Build the expression of every stage as (stage, expression, maximize).
+
+    Fairness minimizes the spread between the most and least loaded
+    employees, in minutes, among those who can work any of the shifts.
+    """
+    employees_by_id = {employee.id: employee for employee in employees}
+    coverage = sum(var for _, var in employee_shift_vars.values())
+
+    preferences = []
+    loads = defaultdict(list)
+    for (employee_id, _), (shift, var) in employee_shift_vars.items():
+        employee = employees_by_id.get(employee_id)
+        score = preference_score(employee, shift) if employee else 0
+        if score:
+            preferences.append(score * var)
+        start, end = shift_span(shift)
+        loads[employee_id].append((end - start, var))
+
+    upper = max((sum(m for m, _ in load) for load in loads.values()), default=0)
+    max_load = model.NewIntVar(0, upper, "max_load")
+    min_load = model.NewIntVar(0, upper, "min_load")
+    for load in loads.values():
+        minutes = sum(m * var for m, var in load)
+        model.Add(minutes <= max_load)
+        model.Add(minutes >= min_load)
+
+    return [
+        ("coverage", coverage, True),
+        ("preferences", sum(preferences), True),
+        ("fairness", max_load - min_load, False),
+    ]
+
+
+def staged_solve(
+    model, employee_shift_vars, employees, time_limits, on_solve=None, workers=None
+):
+    """
+    Solve the stages lexicographically.
+
+    Each stage runs with its own budget from ``time_limits`` (stage ->
+    seconds), starts from the previous stage's plan as a hint, and once
+    done its value is fixed as a constraint for the stages after it. When a
+    stage finds nothing in its budget, the previous stage's plan stands.
+
+    Returns (the solver of the last solved stage or None, stage results).
+    ``on_solve(model, solver, status)`` is called after every stage.
+    """
+    best = None
+    results = []
+    for stage, expression, maximize in stage_objectives(
+        model, employee_shift_vars, employees
+    ):
+        if isinstance(expression, int):
+            # Nothing to optimize, e.g. no employee states a preference
+            continue
+        if maximize:
+            model.Maximize(expression)
+        else:
+            model.Minimize(expression)
+
+        solver = cp_model.CpSolver()
+        limit = time_limits.get(stage)
+        if limit:
+            solver.parameters.max_time_in_seconds = limit
+        if workers:
+            solver.parameters.num_workers = workers
+        started_at = time.perf_counter()
+        status = solver.Solve(model)
+        if on_solve:
+            on_solve(model, solver, status)
+
+        result = {
+            "stage": stage,
+            "status": solver.StatusName(status),
+            "seconds": round(time.perf_counter() - started_at, 3),
+        }
+        results.append(result)
+        if status not in (cp_model.OPTIMAL, cp_model.FEASIBLE):
+            break
+
+        value = int(solver.ObjectiveValue())
+        result["objective"] = value
+        STAGE_OBJECTIVE.set(value, stage=stage)
+        best = solver
+
+        # Lock in this stage's result and warm-start the next one from it
+        if maximize:
+            model.Add(expression >= value)
+        else:
+            model.Add(expression <= value)
+        model.ClearHints()
+        for _, var in employee_shift_vars.values():
+            model.AddHint(var, solver.Value(var))
+    return best, results
+
+
+def plan_quality(assignments, shifts, employees, eligible_employee_ids, current=()):
+    """
+    Score a finished plan on the stage criteria, e.g. to compare two solves
+    of one instance: assignments and the share of slots filled, preference
+    points, the spread of worked minutes among ``eligible_employee_ids`` and,
+    given the ``current`` (employee id, shift id) plan, the churn against it.
+    """
+    shifts_by_id = {shift.id: shift for shift in shifts}
+    employees_by_id = {employee.id: employee for employee in employees}
+    planned = {tuple(pair) for pair in assignments}
+    loads = dict.fromkeys(eligible_employee_ids, 0)
+    preferences = 0
+    for employee_id, shift_id in planned:
+        shift = shifts_by_id[shift_id]
+        employee = employees_by_id.get(employee_id)
+        if employee is not None:
+            preferences += preference_score(employee, shift)
+        start, end = shift_span(shift)
+        loads[employee_id] = loads.get(employee_id, 0) + end - start
+    slots = sum(shift.capacity or 0 for shift in shifts)
+    quality = {
+        "assigned": len(planned),
+        "coverage": round(len(planned) / slots, 4) if slots else None,
+        "preferences": preferences,
+        "load_spread_minutes": (
+            max(loads.values()) - min(loads.values()) if loads else 0
+        ),
+    }
+    if current:
+        current = {tuple(pair) for pair in current}
+        quality["churn"] = len(planned ^ current)
+    return quality
@@ -0,0 +1,260 @@
+import gzip
+import hashlib
+import json
+import logging
+import os
+import platform
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime
+from datetime import time as dtime
+from pathlib import Path
+from typing import Optional, Union, get_args, get_type_hints
+
+from src.labour import LabourRules
+from src.records import (
+    AvailabilityRecord,
+    EmployeeRecord,
+    EmployeeSkillRecord,
+    ProductionLineRecord,
+    ShiftRecord,
+    SkillRequirementRecord,
+    TimeOffRecord,
+)
+from utils.serialization import dumps
+
+SOLVE_RECORDING = os.getenv("SOLVE_RECORDING", "false").lower() == "true"
+SOLVE_RECORD_DIR = Path(
+    os.getenv("SOLVE_RECORD_DIR", os.path.join(tempfile.gettempdir(), "ess-solves"))
+)
+SOLVE_RECORD_MAX_FILES = int(os.getenv("SOLVE_RECORD_MAX_FILES", "200"))
+SOLVE_RECORD_MAX_AGE_DAYS = float(os.getenv("SOLVE_RECORD_MAX_AGE_DAYS", "14"))
+
+FORMAT_VERSION = 1
+RECORD_TYPES = {
+    "employees": EmployeeRecord,
+    "shifts": ShiftRecord,
+    "availability": AvailabilityRecord,
+    "employee_skills": EmployeeSkillRecord,
+    "skill_requirements": SkillRequirementRecord,
+    "production_lines": ProductionLineRecord,
+    "time_off_requests": TimeOffRecord,
+}
+PARSERS = {date: date.fromisoformat, dtime: dtime.fromisoformat}
+
+# Files are written off the request thread, one at a time
+_writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="solve-recorder")
+
+
+def engine_versions() -> dict:
+    try:
+        from ortools import __version__ as ortools_version
+    except ImportError:
+        ortools_version = None
+    return {"ortools": ortools_version, "python": platform.python_version()}
+
+
+def _parser(annotation):
+    """Value parser for a record field annotation (``Optional`` unwrapped)."""
+    if getattr(annotation, "__origin__", None) is Union:
+        annotation = next(arg for arg in get_args(annotation) if arg is not type(None))
+    parse = PARSERS.get(annotation)
+    if parse is None:
+        return lambda value: value
+    return lambda value: None if value is None else parse(value)
+
+
+def _table(rows, record) -> dict:
+    return {"fields": list(record._fields), "rows": [list(row) for row in rows]}
+
+
+def _rows(table: dict, record) -> list:
+    """
+    Rebuild records from a stored table by field name, so records written
+    before a field was added still load (the new field reads as None).
+    """
+    hints = get_type_hints(record)
+    parsers = [_parser(hints[name]) for name in record._fields]
+    positions = [
+        table["fields"].index(name) if name in table["fields"] else None
+        for name in record._fields
+    ]
+    return [
+        record._make(
+            parse(row[position]) if position is not None else None
+            for parse, position in zip(parsers, positions)
+        )
+        for row in table["rows"]
+    ]
+
+
+def encode_inputs(inputs: dict) -> dict:
+    """Solver inputs as column-named tables of JSON values."""
+    encoded = {
+        name: _table(inputs.get(name, ()), record)
+        for name, record in RECORD_TYPES.items()
+    }
+    fixed = inputs.get("fixed", ())
+    encoded["fixed"] = {
+        "employee_ids": [employee_id for employee_id, _ in fixed],
+        **_table([shift for _, shift in fixed], ShiftRecord),
+    }
+    return encoded
+
+
+def decode_inputs(encoded: dict) -> dict:
+    inputs = {
+        name: _rows(encoded[name], record) for name, record in RECORD_TYPES.items()
+    }
+    fixed = encoded["fixed"]
+    inputs["fixed"] = list(zip(fixed["employee_ids"], _rows(fixed, ShiftRecord)))
+    return inputs
+
+
+def _prune():
+    records = sorted(SOLVE_RECORD_DIR.glob("*.json.gz"))
+    cutoff = time.time() - SOLVE_RECORD_MAX_AGE_DAYS * 86400
+    for index, path in enumerate(records):
+        if index < len(records) - SOLVE_RECORD_MAX_FILES or (
+            path.stat().st_mtime < cutoff
+        ):
+            path.unlink(missing_ok=True)
+
+
+def _write(path: Path, record: dict):
+    try:
+        SOLVE_RECORD_DIR.mkdir(parents=True, exist_ok=True)
+        partial = path.with_suffix(".tmp")
+        partial.write_bytes(gzip.compress(dumps(record), compresslevel=6))
+        partial.replace(path)
+        _prune()
+    except OSError:
+        logging.exception("Could not write solve record %s", path)
+
+
+def record_solve(
+    kind: str,
+    inputs: dict,
+    params: dict,
+    assignments: Optional[list],
+    seconds: float,
+    status: str = None,
+    context: dict = None,
+) -> Optional[Path]:
+    """
+    Store one solver run (inputs, parameters, engine versions and outcome)
+    as a gzipped JSON file for ``manage.py replay-solve``.
+
+    ``context`` holds run-specific inputs beyond the records, e.g. the
+    current plan and blocked windows of a repair. Returns the path the
+    record is being written to, or None when recording is off.
+    """
+    if not SOLVE_RECORDING:
+        return None
+    encoded = encode_inputs(inputs)
+    digest = hashlib.sha1(dumps(encoded)).hexdigest()[:10]
+    record = {
+        "format": FORMAT_VERSION,
+        "kind": kind,
+        "recorded_at": datetime.now().isoformat(timespec="seconds"),
+        "instance": digest,
+        "engine": engine_versions(),
+        "params": params,
+        "context": context or {},
+        "inputs": encoded,
+        "outcome": {
+            "status": status,
+            "seconds": round(seconds, 4),
+            "assignments": (
+                None
+                if assignments is None
+                else [[a["employee_id"], a["shift_id"]] for a in assignments]
+            ),
+        },
+    }
+    path = SOLVE_RECORD_DIR / f"{time.strftime('%Y%m%dT%H%M%S')}-{kind}-{digest}.json.gz"
+    _writer.submit(_write, path, record)
+    return path
+
+
+def load_record(path: Union[str, Path]) -> dict:
+    record = json.loads(gzip.decompress(Path(path).read_bytes()))
+    if record.get("format") != FORMAT_VERSION:
+        raise ValueError(f"Unsupported solve record format {record.get('format')}")
+    return record
+
+
+def replay(record: dict, **overrides) -> dict:
+    """
+    Re-run a recorded solve with its parameters, updated by ``overrides``
+    (``time_limit``, ``objective``, ``workers``, ``labour_rules`` fields...),
+    and return an outcome shaped like the recorded one.
+    """
+    from src.repair import repair_schedule
+    from src.schedule import shift_schedule
+
+    inputs = decode_inputs(record["inputs"])
+    params = {**record["params"], **overrides}
+    params["labour_rules"] = LabourRules(**params["labour_rules"])
+    if record["kind"] == "repair":
+        # Repairs have a fixed objective
+        params.pop("objective", None)
+        params.pop("stage_time_limits", None)
+    started_at = time.perf_counter()
+    if record["kind"] == "repair":
+        context = record["context"]
+        assignments, status = repair_schedule(
+            **inputs,
+            current={tuple(pair) for pair in context["current"]},
+            blocked=[
+                (employee_id, date.fromisoformat(start), date.fromisoformat(end))
+                for employee_id, start, end in context["blocked"]
+            ],
+            **params,
+        )
+    else:
+        assignments, status = shift_schedule(**inputs, **params)
+    return {
+        "status": status,
+        "seconds": round(time.perf_counter() - started_at, 4),
+        "assignments": (
+            None
+            if assignments is None
+            else [[a["employee_id"], a["shift_id"]] for a in assignments]
+        ),
+    }
+
+
+def compare(record: dict, replayed: dict) -> dict:
+    """Quality of the recorded and the replayed plan, side by side."""
+    from src.objectives import plan_quality
+    from src.schedule import eligible_pairs
+
+    inputs = decode_inputs(record["inputs"])
+    inputs.pop("fixed")
+    eligible = {employee_id for employee_id, _ in eligible_pairs(**inputs)}
+    current = record["context"].get("current", ())
+
+    def quality(outcome):
+        if outcome["assignments"] is None:
+            return None
+        return plan_quality(
+            outcome["assignments"],
+            inputs["shifts"],
+            inputs["employees"],
+            eligible,
+            current=current,
+        )
+
+    changed = None
+    if record["outcome"]["assignments"] is not None and replayed["assignments"]:
+        changed = len(
+            {tuple(pair) for pair in record["outcome"]["assignments"]}
+            ^ {tuple(pair) for pair in replayed["assignments"]}
+        )
+    return {
+        "recorded": quality(record["outcome"]),
+        "replayed": quality(replayed),
+        "changed_assignments": changed,
+    }
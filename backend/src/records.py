@@ -0,0 +1,57 @@
+from datetime import date, time
+from typing import List, NamedTuple, Optional
+
+# Solver inputs as named tuples of the few columns the scheduler reads. They
+# carry no ORM or pydantic state, take a fraction of the memory of model
+# instances and pickle as plain tuples, which is what scenario worker
+# processes receive. Field names match the model columns, so
+# ``select(*(getattr(Model, name) for name in Record._fields))`` loads them.
+
+
+class EmployeeRecord(NamedTuple):
+    id: int
+    employee_preference_days: Optional[List[str]]
+    employee_preference_shifts: Optional[List[str]]
+
+
+class ShiftRecord(NamedTuple):
+    id: int
+    shift_date: date
+    shift_week_day: str
+    shift_start_time: time
+    shift_end_time: time
+    shift_desc: Optional[str]
+    capacity: Optional[int]
+    location_id: int
+
+
+class AvailabilityRecord(NamedTuple):
+    employee_id: int
+    day_of_week: str
+    start_time: time
+    end_time: time
+
+
+class EmployeeSkillRecord(NamedTuple):
+    employee_id: int
+    skill_id: int
+    skill_level: str
+
+
+class SkillRequirementRecord(NamedTuple):
+    skill_id: int
+    min_level: str
+    shift_id: Optional[int]
+    production_line_id: Optional[int]
+
+
+class ProductionLineRecord(NamedTuple):
+    id: int
+    shift_id: Optional[int]
+
+
+class TimeOffRecord(NamedTuple):
+    employee_id: int
+    status: str
+    start_date: date
+    end_date: date
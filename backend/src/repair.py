@@ -0,0 +1,114 @@
+import time
+
+from ortools.sat.python import cp_model
+from src.schedule import (
+    SOLVED_STATUSES,
+    build_assignment_model,
+    collect_assignments,
+    eligible_pairs,
+    record_solve_stats,
+)
+
+
+def repair_schedule(
+    *,
+    employees,
+    shifts,
+    availability,
+    current=(),
+    blocked=(),
+    employee_skills=(),
+    skill_requirements=(),
+    production_lines=(),
+    time_off_requests=(),
+    fixed=(),
+    labour_rules=None,
+    time_limit=1.0,
+    workers=None,
+):
+    """
+    Re-optimize only the neighbourhood ``shifts`` of a disruption.
+
+    Assignments outside the neighbourhood are left untouched and passed as
+    ``fixed`` so the labour rules still see them. Inside the neighbourhood,
+    staffing comes first and keeping ``current`` (employee id, shift id)
+    pairs second, so a repair moves as few people as it can. The current
+    plan is passed to CP-SAT as a hint, which usually makes it find the
+    repaired plan within a handful of branches.
+
+    ``blocked`` holds (employee id, start date, end date) windows the
+    employee can no longer work, e.g. a sick call. Returns the new
+    assignments of the neighbourhood and the solver status name; when no
+    solution is found within ``time_limit`` seconds, the assignments are
+    None and the caller should keep the current plan.
+    """
+    pairs = eligible_pairs(
+        employees=employees,
+        shifts=shifts,
+        availability=availability,
+        employee_skills=employee_skills,
+        skill_requirements=skill_requirements,
+        production_lines=production_lines,
+        time_off_requests=time_off_requests,
+    )
+    return repair_pairs(
+        without_blocked(pairs, blocked),
+        current=current,
+        fixed=fixed,
+        labour_rules=labour_rules,
+        time_limit=time_limit,
+        workers=workers,
+    )
+
+
+def without_blocked(pairs, blocked):
+    """Drop (employee id, shift) pairs inside a blocked window."""
+    if not blocked:
+        return list(pairs)
+    return [
+        (employee_id, shift)
+        for employee_id, shift in pairs
+        if not any(
+            employee_id == blocked_id and start <= shift.shift_date <= end
+            for blocked_id, start, end in blocked
+        )
+    ]
+
+
+def repair_pairs(
+    pairs, *, current=(), fixed=(), labour_rules=None, time_limit=1.0, workers=None
+):
+    """
+    ``repair_schedule`` for already computed eligible pairs. ``workers``
+    caps the solver's search threads.
+    """
+    build_started_at = time.perf_counter()
+    model = cp_model.CpModel()
+    current = set(current)
+    employee_shift_vars = build_assignment_model(model, pairs, labour_rules, fixed)
+
+    # Objective: fill as many slots as possible, then keep as many current
+    # assignments as possible. Weighting coverage above the largest possible
+    # number of kept assignments makes the order strict.
+    coverage_weight = len(employee_shift_vars) + 1
+    objective = []
+    for key, (_, var) in employee_shift_vars.items():
+        if key in current:
+            model.AddHint(var, 1)
+            objective.append((coverage_weight + 1) * var)
+        else:
+            model.AddHint(var, 0)
+            objective.append(coverage_weight * var)
+    model.Maximize(sum(objective))
+    build_seconds = time.perf_counter() - build_started_at
+
+    solver = cp_model.CpSolver()
+    solver.parameters.max_time_in_seconds = time_limit
+    if workers:
+        solver.parameters.num_workers = workers
+    status = solver.Solve(model)
+    record_solve_stats(model, solver, status, build_seconds)
+
+    if status not in SOLVED_STATUSES:
+        return None, solver.StatusName(status)
+    return collect_assignments(solver, employee_shift_vars), solver.StatusName(status)
@@ -1,28 +1,11 @@
-import os
-import json
-import google.generativeai as genai
-from datetime import time
+from datetime import date
 
-
-class GeminiAI:
-    """
-    A class to handle configuration and interactions with Gemini AI.
-    """
-
-    @staticmethod
-    def initialize():
-        """Initialize Gemini AI with the API key."""
-        api_key = os.getenv("GEMINI_API_KEY")
-        if not api_key:
-            raise ValueError(
-                "GEMINI_API_KEY not found in environment variables. Please set it in your .env file."
-            )
-        genai.configure(api_key=api_key)
+from src.llm import complete
 
 
 class ReportGenerator:
     """
-    A class to generate efficiency reports using Gemini AI.
+    A class to generate efficiency reports through the configured LLM backend.
     """
 
     @staticmethod
@@ -40,22 +23,7 @@ class ReportGenerator:
             str: Generated report as a string.
         """
         try:
-            GeminiAI.initialize()
-        except Exception as e:
-            raise RuntimeError(f"Failed to initialize Gemini AI: {str(e)}")
-
-        try:
-            report_model = genai.GenerativeModel(
-                model_name="gemini-1.5-flash",
-                generation_config={
-                    "temperature": 1,
-                    "top_p": 0.95,
-                    "top_k": 40,
-                    "max_output_tokens": 8192,
-                },
-            )
-            chat_session = report_model.start_chat(history=[])
-            Today = time.strftime("%Y%m%d")
+            Today = date.today().strftime("%Y%m%d")
 
             prompt = f"""You are an efficiency manager with extensive experience in creating forecasting reports. Your task is to create an exaggerated and attention-grabbing report based on the provided data. The report should be written in an impressive markdown format, highlighting key variables and providing an assessment of the situation.
         Here are the input variables you will be working with:
@@ -77,15 +45,24 @@ class ReportGenerator:
         Remember to maintain a professional tone while still injecting excitement and urgency into the report. Your goal is to create a memorable and impactful document that will grab the reader's attention and emphasize the importance of efficiency in the workplace.
         Present your entire report within <report> tags. Use appropriate markdown syntax throughout the report."""
 
-            response = chat_session.send_message(prompt)
-            return response.text.strip()
+            response = complete(
+                prompt,
+                model_name="gemini-1.5-flash",
+                generation_config={
+                    "temperature": 1,
+                    "top_p": 0.95,
+                    "top_k": 40,
+                    "max_output_tokens": 8192,
+                },
+            )
+            return response.strip()
         except Exception as e:
             raise RuntimeError(f"Error generating report: {str(e)}")
 
 
 class HeadcountPredictor:
     """
-    A class to predict headcount requirements using Gemini AI.
+    A class to predict headcount requirements through the configured LLM backend.
     """
 
     @staticmethod
@@ -101,23 +78,6 @@ class HeadcountPredictor:
             dict: JSON-formatted prediction with headcount requirements.
         """
         try:
-            GeminiAI.initialize()
-        except Exception as e:
-            raise RuntimeError(f"Failed to initialize Gemini AI: {str(e)}")
-
-        try:
-            prediction_model = genai.GenerativeModel(
-                model_name="gemini-exp-1114",
-                generation_config={
-                    "temperature": 0.1,
-                    "top_p": 0.95,
-                    "top_k": 40,
-                    "max_output_tokens": 8192,
-                },
-            )
-            chat_session = prediction_model.start_chat(history=[])
-
-
             prompt = f"""Analyze this production report and predict headcount needs for next week.
             
                     Previous Report: '{report_content}'
@@ -148,7 +108,16 @@ class HeadcountPredictor:
                     2. Base predictions on the provided next week's target of {next_week_target}
                     3. Return ONLY valid JSON, no additional text"""
 
-            response = chat_session.send_message(prompt)
+            response = complete(
+                prompt,
+                model_name="gemini-exp-1114",
+                generation_config={
+                    "temperature": 0.1,
+                    "top_p": 0.95,
+                    "top_k": 40,
+                    "max_output_tokens": 8192,
+                },
+            )
             return response
         except Exception as e:
             raise RuntimeError(f"Error predicting headcount: {str(e)}")
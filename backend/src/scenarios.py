@@ -0,0 +1,171 @@
+import os
+import time
+from dataclasses import dataclass, field
+from datetime import timedelta
+from typing import Dict, List, Set, Tuple
+
+from src.labour import LabourRules
+from src.records import ShiftRecord
+from src.repair import repair_pairs, without_blocked
+from src.schedule import eligible_pairs
+
+
+@dataclass
+class ScenarioBase:
+    """
+    Picklable snapshot of the plan that every scenario of a batch starts from.
+
+    Eligibility of the existing shifts is computed once, in ``pairs``; the
+    raw ``inputs`` are only needed for shifts a scenario adds.
+    """
+
+    shifts: Dict[int, ShiftRecord]
+    pairs: List[Tuple[int, int]]  # (employee id, shift id)
+    current: Set[Tuple[int, int]]
+    inputs: dict  # eligible_pairs keyword arguments other than ``shifts``
+    fixed: list = field(default_factory=list)  # (employee id, shift) outside
+    labour_rules: LabourRules = None
+    radius_days: int = 0
+    time_limit: float = 1.0
+    solver_workers: int = None
+
+
+def slots(shifts) -> int:
+    return sum(shift.capacity or 0 for shift in shifts)
+
+
+def evaluate(base: ScenarioBase, perturbations: List[dict]) -> dict:
+    """
+    Repair a copy of the base plan under ``perturbations`` (``Perturbation``
+    dumps) and report coverage and churn against the base plan.
+    """
+    started_at = time.perf_counter()
+    shifts = dict(base.shifts)
+    blocked, windows, removed_ids, new_shifts = [], [], set(), []
+    for index, perturbation in enumerate(perturbations):
+        if perturbation["kind"] == "employee_unavailable":
+            start, end = perturbation["start_date"], perturbation["end_date"]
+            blocked.append((perturbation["employee_id"], start, end))
+            windows.append((start, end))
+            continue
+        if perturbation.get("new_shift"):
+            # Hypothetical shifts get negative ids so they never clash
+            new_shift = perturbation["new_shift"]
+            shift = ShiftRecord(
+                id=-(index + 1),
+                **{name: new_shift[name] for name in ShiftRecord._fields[1:]},
+            )
+            shifts[shift.id] = shift
+            new_shifts.append(shift)
+        else:
+            shift = shifts.get(perturbation["shift_id"])
+            if shift is None:
+                continue
+            if perturbation["kind"] == "shift_removed":
+                removed_ids.add(shift.id)
+        windows.append((shift.shift_date, shift.shift_date))
+
+    radius = timedelta(days=base.radius_days)
+    neighbourhood = {
+        shift_id
+        for shift_id, shift in shifts.items()
+        if shift_id not in removed_ids
+        and any(
+            start - radius <= shift.shift_date <= end + radius
+            for start, end in windows
+        )
+    }
+    pairs = [
+        (employee_id, shifts[shift_id])
+        for employee_id, shift_id in base.pairs
+        if shift_id in neighbourhood
+    ]
+    if new_shifts:
+        pairs += eligible_pairs(shifts=new_shifts, **base.inputs)
+    current = {pair for pair in base.current if pair[1] in neighbourhood}
+    fixed = base.fixed + [
+        (employee_id, shifts[shift_id])
+        for employee_id, shift_id in base.current
+        if shift_id not in neighbourhood and shift_id not in removed_ids
+    ]
+
+    assignments, status = repair_pairs(
+        without_blocked(pairs, blocked),
+        current=current,
+        fixed=fixed,
+        labour_rules=base.labour_rules,
+        time_limit=base.time_limit,
+        workers=base.solver_workers,
+    )
+    result = {
+        "status": status,
+        "neighbourhood_shifts": len(neighbourhood),
+        "solve_seconds": round(time.perf_counter() - started_at, 4),
+    }
+    if assignments is None:
+        return result
+
+    planned = {
+        (assignment["employee_id"], assignment["shift_id"])
+        for assignment in assignments
+    }
+    removed = (current - planned) | {
+        pair for pair in base.current if pair[1] in removed_ids
+    }
+    added = planned - current
+    base_slots = slots(base.shifts.values())
+    scenario_slots = slots(
+        shift for shift_id, shift in shifts.items() if shift_id not in removed_ids
+    )
+    assigned = len(base.current) - len(removed) + len(added)
+    base_coverage = len(base.current) / base_slots if base_slots else None
+    coverage = assigned / scenario_slots if scenario_slots else None
+    result.update(
+        {
+            "assigned": assigned,
+            "slots": scenario_slots,
+            "coverage": round(coverage, 4) if coverage is not None else None,
+            "coverage_delta": (
+                round(coverage - base_coverage, 4)
+                if coverage is not None and base_coverage is not None
+                else None
+            ),
+            "churn": len(removed) + len(added),
+            "removed_assignments": len(removed),
+            "added_assignments": len(added),
+            "affected_employees": len({pair[0] for pair in removed | added}),
+        }
+    )
+    return result
+
+
+def _evaluate_chunk(base: ScenarioBase, scenarios: List[List[dict]]) -> List[dict]:
+    return [evaluate(base, perturbations) for perturbations in scenarios]
+
+
+def evaluate_all(
+    base: ScenarioBase, scenarios: List[List[dict]], executor=None, workers: int = 1
+) -> List[dict]:
+    """
+    Evaluate every scenario, split over ``workers`` processes of
+    ``executor`` when there are several.
+
+    Scenarios go out in one chunk per process, so the base is pickled once
+    per process and batch rather than once per scenario.
+    """
+    workers = min(workers, len(scenarios))
+    if executor is None or workers <= 1:
+        return _evaluate_chunk(base, scenarios)
+
+    # Split the CPUs between processes instead of every solve starting a
+    # full set of search threads.
+    base.solver_workers = base.solver_workers or max(
+        1, (os.cpu_count() or 1) // workers
+    )
+    chunks = [scenarios[index::workers] for index in range(workers)]
+    results = list(executor.map(_evaluate_chunk, [base] * workers, chunks))
+    # Undo the striding so results line up with ``scenarios``
+    ordered = [None] * len(scenarios)
+    for index, chunk in enumerate(results):
+        ordered[index::workers] = chunk
+    return ordered
@@ -1,57 +1,236 @@
+import time
+from collections import defaultdict
+
 from ortools.sat.python import cp_model
+from src.labour import DEFAULT_RULES, add_labour_constraints
+from src.objectives import staged_solve
+from src.skills import SkillMatrix
+from src.time_off import TimeOffIndex
+from utils.metrics import registry
 
+# Statuses that come with a usable plan; FEASIBLE means the time limit
+# stopped the search before optimality was proven.
+SOLVED_STATUSES = (cp_model.OPTIMAL, cp_model.FEASIBLE)
+
+SOLVER_RUNS = registry.counter(
+    "solver_runs_total", "Scheduling solves by final status.", ("status",)
+)
+SOLVER_BUILD_SECONDS = registry.histogram(
+    "solver_build_seconds", "Time spent building the CP-SAT model."
+)
+SOLVER_SOLVE_SECONDS = registry.histogram(
+    "solver_solve_seconds", "CP-SAT solve wall time.", ("status",)
+)
+SOLVER_MODEL_SIZE = registry.gauge(
+    "solver_last_model_size",
+    "Variables and constraints of the most recent model.",
+    ("kind",),
+)
+SOLVER_SEARCH = registry.gauge(
+    "solver_last_search", "Branches and conflicts of the most recent solve.", ("kind",)
+)
+SOLVER_SEARCH_TOTAL = registry.counter(
+    "solver_search_total", "Branches and conflicts across all solves.", ("kind",)
+)
+
+
+def record_solve_stats(model, solver, status, build_seconds):
+    """Publish model size and search statistics of a finished solve."""
+    status_name = solver.StatusName(status)
+    proto = model.Proto()
+    SOLVER_RUNS.inc(status=status_name)
+    SOLVER_BUILD_SECONDS.observe(build_seconds)
+    SOLVER_SOLVE_SECONDS.observe(solver.WallTime(), status=status_name)
+    SOLVER_MODEL_SIZE.set(len(proto.variables), kind="variables")
+    SOLVER_MODEL_SIZE.set(len(proto.constraints), kind="constraints")
+    for kind, value in (
+        ("branches", solver.NumBranches()),
+        ("conflicts", solver.NumConflicts()),
+    ):
+        SOLVER_SEARCH.set(value, kind=kind)
+        SOLVER_SEARCH_TOTAL.inc(value, kind=kind)
+
+
+def availability_windows(availability):
+    """Index availability rows as employee id -> week day -> [(start, end)]."""
+    windows = defaultdict(lambda: defaultdict(list))
+    for avail in availability:
+        windows[avail.employee_id][avail.day_of_week].append(
+            (avail.start_time, avail.end_time)
+        )
+    return windows
 
-def shift_schedule(*, employees, shifts, availability):
-    model = cp_model.CpModel()
 
-    # Variables: employee-shift assignment
+def is_available(shift, day_windows):
+    return any(
+        shift.shift_start_time >= start and shift.shift_end_time <= end
+        for start, end in day_windows.get(shift.shift_week_day, ())
+    )
+
+
+def eligible_pairs(
+    *,
+    employees,
+    shifts,
+    availability,
+    employee_skills=(),
+    skill_requirements=(),
+    production_lines=(),
+    time_off_requests=(),
+):
+    """
+    (employee id, shift) pairs that pass the skill, availability and approved
+    time-off filters.
+
+    Only these pairs get a decision variable; everything else is implicitly 0.
+    """
+    skills = SkillMatrix(
+        employee_skills,
+        skill_requirements,
+        line_shifts={line.id: line.shift_id for line in production_lines},
+    )
+    profiles = skills.profiles(employee.id for employee in employees)
+    windows = availability_windows(availability)
+    time_off = TimeOffIndex(time_off_requests)
+
+    pairs = []
+    for shift in shifts:
+        for employee_id in skills.eligible(shift.id, profiles):
+            day_windows = windows.get(employee_id)
+            if not day_windows or not is_available(shift, day_windows):
+                continue
+            if time_off and time_off.is_off(employee_id, shift.shift_date):
+                continue
+            pairs.append((employee_id, shift))
+    return pairs
+
+
+def build_assignment_model(model, pairs, labour_rules=None, fixed=()):
+    """
+    Add one decision variable per eligible (employee id, shift) pair, the
+    shift capacity constraints and the labour rules (``fixed`` assignments
+    count towards those without getting a variable).
+    Returns (employee id, shift id) -> (shift, var).
+    """
     employee_shift_vars = {}
-    for employee in employees:
-        for shift in shifts:
-            employee_shift_vars[(employee.id, shift.id)] = model.NewBoolVar(
-                f"employee_{employee.id}_shift_{shift.id}"
+    shift_vars = defaultdict(list)
+    for employee_id, shift in pairs:
+        var = model.NewBoolVar(f"employee_{employee_id}_shift_{shift.id}")
+        employee_shift_vars[(employee_id, shift.id)] = (shift, var)
+        shift_vars[shift.id].append((shift, var))
+
+    # Constraint: never staff a shift beyond its capacity
+    for entries in shift_vars.values():
+        capacity = entries[0][0].capacity
+        if capacity is not None and capacity < len(entries):
+            model.Add(sum(var for _, var in entries) <= capacity)
+
+    add_labour_constraints(
+        model, employee_shift_vars, labour_rules or DEFAULT_RULES, fixed
+    )
+    return employee_shift_vars
+
+
+def collect_assignments(solver, employee_shift_vars):
+    assignments = []
+    for (employee_id, _), (shift, var) in employee_shift_vars.items():
+        if solver.Value(var) == 1:
+            assignments.append(
+                {
+                    "employee_id": employee_id,
+                    "shift_id": shift.id,
+                    "shift_date": shift.shift_date,
+                    "shift_desc": shift.shift_desc,
+                    "shift_start_time": shift.shift_start_time,
+                    "shift_end_time": shift.shift_end_time,
+                    "assigned": True,
+                }
             )
+    return assignments
+
+
+def shift_schedule(
+    *,
+    employees,
+    shifts,
+    availability,
+    employee_skills=(),
+    skill_requirements=(),
+    production_lines=(),
+    time_off_requests=(),
+    fixed=(),
+    labour_rules=None,
+    time_limit=None,
+    objective="coverage",
+    stage_time_limits=None,
+    workers=None,
+):
+    """
+    Staff ``shifts`` with as many assignments as the constraints allow.
 
-    # Constraint: Employee availability based on day and time range
-    for employee in employees:
-        employee_availability = [
-            avail for avail in availability if avail.employee_id == employee.id
-        ]
-        for shift in shifts:
-            is_available = False
-            for avail in employee_availability:
-                if (
-                    shift.shift_week_day == avail.day_of_week
-                    and shift.shift_start_time >= avail.start_time
-                    and shift.shift_end_time <= avail.end_time
-                ):
-                    is_available = True
-                    break
-            if not is_available:
-                model.Add(employee_shift_vars[(employee.id, shift.id)] == 0)
+    With ``objective="staged"`` coverage is followed by employee preferences
+    and then a fair spread of hours, each stage within its budget from
+    ``stage_time_limits`` (see ``src.objectives``); coverage defaults to
+    ``time_limit``. ``workers`` caps the solver's search threads.
+
+    Returns the assignments, or None when no plan was found (within
+    ``time_limit`` seconds, if given), and the solver status name. A staged
+    solve reports the status of the stage whose plan is returned.
+    """
+    build_started_at = time.perf_counter()
+    model = cp_model.CpModel()
+
+    # Variables: one per employee-shift pair that passes the skill and
+    # availability filters
+    employee_shift_vars = build_assignment_model(
+        model,
+        eligible_pairs(
+            employees=employees,
+            shifts=shifts,
+            availability=availability,
+            employee_skills=employee_skills,
+            skill_requirements=skill_requirements,
+            production_lines=production_lines,
+            time_off_requests=time_off_requests,
+        ),
+        labour_rules,
+        fixed,
+    )
+    build_seconds = time.perf_counter() - build_started_at
+
+    if objective == "staged":
+        solver, results = staged_solve(
+            model,
+            employee_shift_vars,
+            employees,
+            {"coverage": time_limit, **(stage_time_limits or {})},
+            workers=workers,
+            on_solve=lambda model, solver, status: record_solve_stats(
+                model, solver, status, build_seconds
+            ),
+        )
+        if not results:
+            # No pairs, so every stage was skipped: the empty plan is optimal
+            return [], "OPTIMAL"
+        solved = [result for result in results if "objective" in result]
+        status = (solved or results)[-1]["status"]
+        if solver is None:
+            return None, status
+        return collect_assignments(solver, employee_shift_vars), status
 
     # Objective: Maximize the number of assigned shifts
-    model.Maximize(sum(employee_shift_vars.values()))
+    model.Maximize(sum(var for _, var in employee_shift_vars.values()))
 
     # Solve the model
     solver = cp_model.CpSolver()
+    if time_limit:
+        solver.parameters.max_time_in_seconds = time_limit
+    if workers:
+        solver.parameters.num_workers = workers
     status = solver.Solve(model)
+    record_solve_stats(model, solver, status, build_seconds)
 
     # Collect the solution
-    assignments = []
-    if status == cp_model.OPTIMAL:
-        for employee in employees:
-            for shift in shifts:
-                if solver.Value(employee_shift_vars[(employee.id, shift.id)]) == 1:
-                    assignments.append(
-                        {
-                            "employee_id": employee.id,
-                            "shift_id": shift.id,
-                            "shift_date": shift.shift_date,
-                            "shift_desc": shift.shift_desc,
-                            "shift_start_time": shift.shift_start_time,
-                            "shift_end_time": shift.shift_end_time,
-                            "assigned": True,
-                        }
-                    )
-    return assignments
+    if status not in SOLVED_STATUSES:
+        return None, solver.StatusName(status)
+    return collect_assignments(solver, employee_shift_vars), solver.StatusName(status)
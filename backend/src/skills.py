@@ -0,0 +1,74 @@
+from collections import defaultdict
+from typing import Dict, Iterable, List
+
+SKILL_LEVELS = ("Beginner", "Intermediate", "Advanced")
+LEVEL_RANK = {level: rank for rank, level in enumerate(SKILL_LEVELS)}
+
+
+class SkillMatrix:
+    """
+    Skill eligibility encoded as integer bitsets.
+
+    Every (skill, minimum level) pair that some shift requires gets one bit.
+    An employee's mask has the bit set when they hold that skill at that level
+    or higher, and a shift's mask has the bits of everything it requires, so
+    an employee qualifies for a shift when ``employee & shift == shift``.
+
+    Employees are grouped by mask. Sites have far fewer distinct skill
+    profiles than employees, so checking a shift costs one AND per profile
+    instead of one lookup per employee.
+    """
+
+    def __init__(
+        self,
+        employee_skills: Iterable,
+        requirements: Iterable,
+        line_shifts: Dict[int, int] = None,
+    ):
+        line_shifts = line_shifts or {}
+        self.bits: Dict[tuple, int] = {}
+        self.shift_masks: Dict[int, int] = defaultdict(int)
+        for requirement in requirements:
+            shift_id = requirement.shift_id
+            if shift_id is None:
+                shift_id = line_shifts.get(requirement.production_line_id)
+            if shift_id is None:
+                continue
+            key = (requirement.skill_id, LEVEL_RANK[requirement.min_level])
+            bit = self.bits.setdefault(key, 1 << len(self.bits))
+            self.shift_masks[shift_id] |= bit
+
+        # Required levels per skill, so an employee's level sets every bit it
+        # satisfies (Advanced also satisfies Beginner and Intermediate).
+        required_levels = defaultdict(list)
+        for (skill_id, rank), bit in self.bits.items():
+            required_levels[skill_id].append((rank, bit))
+
+        self.employee_masks: Dict[int, int] = defaultdict(int)
+        for employee_skill in employee_skills:
+            rank = LEVEL_RANK.get(employee_skill.skill_level, -1)
+            for required_rank, bit in required_levels.get(employee_skill.skill_id, ()):
+                if rank >= required_rank:
+                    self.employee_masks[employee_skill.employee_id] |= bit
+
+    def profiles(self, employee_ids: Iterable[int]) -> Dict[int, List[int]]:
+        """Group employee ids by skill mask."""
+        groups = defaultdict(list)
+        for employee_id in employee_ids:
+            groups[self.employee_masks.get(employee_id, 0)].append(employee_id)
+        return groups
+
+    def requirement(self, shift_id: int) -> int:
+        return self.shift_masks.get(shift_id, 0)
+
+    def eligible(self, shift_id: int, profiles: Dict[int, List[int]]) -> List[int]:
+        """Employees (from ``profiles``) holding every skill the shift needs."""
+        required = self.requirement(shift_id)
+        if not required:
+            return [employee_id for group in profiles.values() for employee_id in group]
+        return [
+            employee_id
+            for mask, group in profiles.items()
+            if mask & required == required
+            for employee_id in group
+        ]
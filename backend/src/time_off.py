@@ -0,0 +1,59 @@
+from bisect import bisect_right
+from collections import defaultdict
+from datetime import date
+from typing import Dict, Iterable, List, Tuple
+
+
+class TimeOffIndex:
+    """
+    Approved leave as sorted, merged day intervals per employee.
+
+    Overlapping or adjacent requests are merged when the index is built, so
+    a lookup is a single ``bisect`` over that employee's interval starts:
+    O(log n) per (employee, day) pair instead of a scan of every request.
+    """
+
+    def __init__(self, requests: Iterable = ()):
+        raw = defaultdict(list)
+        for request in requests:
+            if request.status != "Approved":
+                continue
+            raw[request.employee_id].append(
+                (request.start_date.toordinal(), request.end_date.toordinal())
+            )
+        self._starts: Dict[int, List[int]] = {}
+        self._ends: Dict[int, List[int]] = {}
+        for employee_id, intervals in raw.items():
+            starts, ends = [], []
+            for start, end in sorted(intervals):
+                if ends and start <= ends[-1] + 1:
+                    ends[-1] = max(ends[-1], end)
+                else:
+                    starts.append(start)
+                    ends.append(end)
+            self._starts[employee_id] = starts
+            self._ends[employee_id] = ends
+
+    def __bool__(self):
+        return bool(self._starts)
+
+    def intervals(self, employee_id: int) -> List[Tuple[date, date]]:
+        return [
+            (date.fromordinal(start), date.fromordinal(end))
+            for start, end in zip(
+                self._starts.get(employee_id, ()), self._ends.get(employee_id, ())
+            )
+        ]
+
+    def is_off(self, employee_id: int, day: date) -> bool:
+        return self.overlaps(employee_id, day, day)
+
+    def overlaps(self, employee_id: int, start: date, end: date) -> bool:
+        """Whether any approved leave of the employee touches [start, end]."""
+        starts = self._starts.get(employee_id)
+        if not starts:
+            return False
+        # The last interval starting on or before ``end`` is the only one
+        # that can overlap, because merged intervals are disjoint and sorted.
+        index = bisect_right(starts, end.toordinal()) - 1
+        return index >= 0 and self._ends[employee_id][index] >= start.toordinal()
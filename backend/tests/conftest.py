@@ -0,0 +1,112 @@
+import os
+import sys
+from datetime import date, datetime, time
+from pathlib import Path
+
+# The app imports its packages both top-level (``models``) and through the
+# ``backend`` package, and reads its settings at import time.
+BACKEND = Path(__file__).resolve().parents[1]
+sys.path[:0] = [str(BACKEND), str(BACKEND.parent)]
+os.environ.update(
+    DB_BACKEND="sqlite",
+    SQLITE_PATH=":memory:",
+    SQLITE_REPLICA_PATHS="",
+    API_V1_STR="/api/v1",
+    LLM_BACKEND="stub",
+    LLM_STUB_LATENCY_MS="0",
+    SOLVE_RECORDING="false",
+)
+
+import pytest  # noqa: E402
+from models.database import engine, init_db  # noqa: E402
+from models.models import (  # noqa: E402
+    Employee,
+    Location,
+    Manager,
+    ProductionLine,
+    ShiftDetail,
+)
+from sqlmodel import Session, SQLModel  # noqa: E402
+
+
+@pytest.fixture
+def session():
+    """A fresh schema in the shared in-memory database for every test."""
+    SQLModel.metadata.drop_all(engine)
+    init_db()
+    with Session(engine) as session:
+        yield session
+
+
+@pytest.fixture
+def client(session):
+    from fastapi.testclient import TestClient
+    from main import app
+
+    with TestClient(app) as client:
+        yield client
+
+
+@pytest.fixture
+def site(session):
+    """One manager and location with three employees."""
+    manager = Manager(manager_role="Shift lead")
+    session.add(manager)
+    session.flush()
+    location = Location(
+        location_name="Plant",
+        address="Street 1",
+        kommun="Town",
+        zipcode="12345",
+        country="SE",
+        manager_id=manager.id,
+    )
+    session.add(location)
+    session.flush()
+    employees = [
+        Employee(
+            first_name=f"First{index}",
+            last_name=f"Last{index}",
+            employee_email=f"employee{index}@example.com",
+            hire_date=datetime(2024, 1, 1),
+            location_id=location.id,
+        )
+        for index in range(3)
+    ]
+    session.add_all(employees)
+    session.commit()
+    return {"manager": manager, "location": location, "employees": employees}
+
+
+def make_shift(
+    session, site, day: date, start=time(6), end=time(14), capacity=1, **fields
+):
+    shift = ShiftDetail(
+        shift_week_day=day.strftime("%A"),
+        shift_date=day,
+        shift_start_time=start,
+        shift_end_time=end,
+        shift_desc="Morning shift",
+        capacity=capacity,
+        employee_id=site["employees"][0].id,
+        manager_id=site["manager"].id,
+        location_id=site["location"].id,
+        **fields,
+    )
+    session.add(shift)
+    session.commit()
+    return shift
+
+
+def make_line(session, site, day: date, needed=2, **fields):
+    line = ProductionLine(
+        assignment_name="Line A",
+        no_of_employees_needed=needed,
+        production_date=day,
+        manager_id=site["manager"].id,
+        location_id=site["location"].id,
+        **fields,
+    )
+    session.add(line)
+    session.commit()
+    return line
@@ -0,0 +1,187 @@
+import threading
+import time
+from datetime import date
+
+import pytest
+from models.models import TimeOffRequest
+from utils.admission import (
+    COALESCED,
+    AdmissionController,
+    FollowerTimeout,
+    Overloaded,
+    SingleFlight,
+    run_guarded,
+    solver_pool,
+)
+
+
+class Worker(threading.Thread):
+    """Runs ``fn`` in the background and keeps its result."""
+
+    def __init__(self, fn):
+        super().__init__(daemon=True)
+        self.fn = fn
+        self.result = None
+        self.start()
+
+    def run(self):
+        self.result = self.fn()
+
+
+class Busy:
+    """Holds every slot of ``pool`` until released."""
+
+    def __init__(self, pool):
+        self.pool = pool
+        self.started = threading.Barrier(pool.max_concurrent + 1)
+        self.release = threading.Event()
+
+    def _hold(self):
+        with self.pool.slot("high"):
+            self.started.wait()
+            self.release.wait(10)
+
+    def __enter__(self):
+        self.threads = [
+            Worker(self._hold) for _ in range(self.pool.max_concurrent)
+        ]
+        self.started.wait()
+        return self
+
+    def __exit__(self, *exc):
+        self.release.set()
+        for thread in self.threads:
+            thread.join()
+
+
+def test_a_full_queue_sheds_lower_priorities_first():
+    pool = AdmissionController(
+        "test", max_concurrent=1, max_queue=1, queue_timeout=5
+    )
+    with Busy(pool):
+        queued = Worker(lambda: _outcome(pool, "low"))
+        while pool.stats()["queued"] < 1:
+            time.sleep(0.001)
+        # A more urgent request takes the low one's place in the queue
+        urgent = Worker(lambda: _outcome(pool, "high"))
+        queued.join()
+        assert queued.result == "shed"
+        with pytest.raises(Overloaded) as error:
+            with pool.slot("low"):
+                pass
+        assert error.value.retry_after >= 1
+    urgent.join()
+    assert urgent.result == "admitted"
+
+
+def _outcome(pool, priority):
+    try:
+        with pool.slot(priority):
+            return "admitted"
+    except Overloaded:
+        return "shed"
+
+
+def test_identical_calls_share_one_run():
+    flights = SingleFlight()
+    entered, release = threading.Event(), threading.Event()
+    calls = []
+
+    def slow():
+        calls.append(1)
+        entered.set()
+        release.wait(5)
+        return object()
+
+    key = ("coalesce-test", 1)
+    leader = Worker(lambda: flights.do(key, slow))
+    entered.wait(5)
+    follower = Worker(lambda: flights.do(key, slow))
+    while not any('key="coalesce-test"' in line for line in COALESCED.samples()):
+        time.sleep(0.001)
+    release.set()
+    leader.join()
+    follower.join()
+    assert len(calls) == 1
+    assert leader.result is follower.result
+    # Nothing is cached once the call finished
+    assert flights.do(key, lambda: "fresh") == "fresh"
+
+
+def test_followers_stop_waiting_after_the_queue_timeout():
+    flights = SingleFlight()
+    entered, release = threading.Event(), threading.Event()
+
+    def slow():
+        entered.set()
+        release.wait(5)
+        return "done"
+
+    leader = Worker(lambda: flights.do("key", slow))
+    entered.wait(5)
+    with pytest.raises(FollowerTimeout):
+        flights.do("key", slow, timeout=0.05)
+    release.set()
+    leader.join()
+    assert leader.result == "done"
+
+
+def test_run_guarded_sheds_followers_as_overloaded():
+    pool = AdmissionController(
+        "test", max_concurrent=1, max_queue=0, queue_timeout=0.05
+    )
+    entered, release = threading.Event(), threading.Event()
+
+    def slow():
+        entered.set()
+        release.wait(5)
+        return "done"
+
+    leader = Worker(lambda: run_guarded(("solve", 1), pool, slow))
+    entered.wait(5)
+    with pytest.raises(Overloaded):
+        run_guarded(("solve", 1), pool, slow)
+    release.set()
+    leader.join()
+    assert leader.result == "done"
+
+
+def test_busy_solver_answers_429_with_retry_after(client, site, monkeypatch):
+    monkeypatch.setattr(solver_pool, "max_queue", 0)
+    with Busy(solver_pool):
+        response = client.post(
+            "/api/v1/shifts/repair",
+            json={
+                "kind": "employee_unavailable",
+                "employee_id": site["employees"][0].id,
+                "start_date": "2025-03-03",
+                "end_date": "2025-03-03",
+            },
+        )
+    assert response.status_code == 429
+    assert int(response.headers["Retry-After"]) >= 1
+    assert "solver" in response.json()["detail"]
+
+
+def test_shed_time_off_resolve_keeps_the_decision(
+    client, site, session, monkeypatch
+):
+    request = TimeOffRequest(
+        employee_id=site["employees"][0].id,
+        request_date=date(2025, 3, 1),
+        start_date=date(2025, 3, 3),
+        end_date=date(2025, 3, 5),
+        status="Approved",
+    )
+    session.add(request)
+    session.commit()
+    monkeypatch.setattr(solver_pool, "max_queue", 0)
+    with Busy(solver_pool):
+        response = client.put(
+            f"/api/v1/time_off_requests/{request.id}/status",
+            json={"status": "Denied"},
+        )
+    assert response.status_code == 200
+    body = response.json()
+    assert body["request"]["status"] == "Denied"
+    assert body["replan_error"].startswith("The solver is busy")
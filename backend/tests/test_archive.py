@@ -0,0 +1,75 @@
+from datetime import date
+
+from models.models import ShiftDetail, ShiftSchedule, TimeOffRequest
+from services.archive import archive_before, assignment_history
+from sqlmodel import select
+
+from .conftest import make_shift
+
+OLD, RECENT, CUTOFF = date(2024, 1, 8), date(2025, 3, 3), date(2025, 1, 1)
+
+
+def assign(session, site, shift):
+    row = ShiftSchedule(
+        shift_date=shift.shift_date,
+        shift_type="Morning",
+        employee_id=site["employees"][0].id,
+        location_id=site["location"].id,
+        shift_id=shift.id,
+    )
+    session.add(row)
+    session.commit()
+    return row.id
+
+
+def test_archived_rows_leave_the_hot_tables_and_stay_in_history(session, site):
+    old, recent = make_shift(session, site, OLD), make_shift(session, site, RECENT)
+    old_id, recent_id = old.id, recent.id
+    old_assignment = assign(session, site, old)
+    recent_assignment = assign(session, site, recent)
+
+    moved = archive_before(session, CUTOFF, batch_size=1, pause=0)
+    assert moved["shift_schedules"] == 1 and moved["shift_details"] == 1
+    assert session.exec(select(ShiftDetail.id)).all() == [recent_id]
+    assert archive_before(session, CUTOFF, pause=0)["shift_details"] == 0
+
+    rows = assignment_history(session, OLD, RECENT)
+    assert [(row["id"], row["archived"]) for row in rows] == [
+        (old_assignment, True),
+        (recent_assignment, False),
+    ]
+    assert rows[0]["shift_id"] == old_id
+
+
+def test_archiving_is_published_to_changes_as_deletes(client, session, site):
+    old = make_shift(session, site, OLD)
+    shift_id = old.id
+    assignment = assign(session, site, old)
+    session.add(
+        TimeOffRequest(
+            employee_id=site["employees"][0].id,
+            request_date=OLD,
+            start_date=OLD,
+            end_date=OLD,
+            status="Approved",
+        )
+    )
+    session.commit()
+    cursor = client.get("/api/v1/changes/").json()["version"]
+
+    archive_before(session, CUTOFF, pause=0)
+    body = client.get("/api/v1/changes/", params={"since": cursor}).json()
+    assert sorted(
+        (change["entity"], change["id"], change["action"], change["data"])
+        for change in body["changes"]
+    ) == [
+        ("assignment", assignment, "delete", None),
+        ("shift", shift_id, "delete", None),
+        ("time_off", 1, "delete", None),
+    ]
+    # Deletes keep their scope, so filtered feeds see them too
+    employee_feed = client.get(
+        "/api/v1/changes/",
+        params={"since": cursor, "employee_id": site["employees"][0].id},
+    ).json()
+    assert len(employee_feed["changes"]) == 3
@@ -0,0 +1,123 @@
+from datetime import date, datetime
+
+import pytest
+from models.database import engine
+from models.models import AttendanceEvent, ProductionLine
+from services.attendance import AttendanceBuffer, write_events
+from services.kpi import get_kpi
+from sqlmodel import Session, select
+from utils.admission import Overloaded
+
+from .conftest import make_line
+
+MONDAY = date(2025, 3, 3)
+
+
+def event(line, employee, kind="in", minute=0):
+    return {
+        "production_line_id": line.id,
+        "employee_id": employee.id,
+        "kind": kind,
+        "occurred_at": datetime(2025, 3, 3, 6, minute),
+        "received_at": datetime(2025, 3, 3, 6, minute),
+    }
+
+
+def attended(session, line_id):
+    session.expire_all()
+    line = session.get(ProductionLine, line_id)
+    kpi = get_kpi(session, "line", line_id, MONDAY)
+    return line.no_of_employees_attended, kpi.employees_attended if kpi else 0
+
+
+def test_each_employee_counts_once_per_line(session, site):
+    first, second, _ = site["employees"]
+    line, other = make_line(session, site, MONDAY), make_line(session, site, MONDAY)
+    line_id, other_id = line.id, other.id
+    result = write_events(
+        session,
+        [
+            event(line, first),
+            event(line, first, "out", 30),
+            event(line, first, minute=45),
+            event(line, second),
+            event(other, first),
+            {**event(line, first), "employee_id": 999},
+            {**event(line, first), "production_line_id": 999},
+        ],
+    )
+    session.commit()
+    assert result == {"written": 5, "dropped": 2, "attended": 3}
+    # A later batch repeating a clock-in changes nothing
+    assert write_events(session, [event(line, second, minute=50)])["attended"] == 0
+    session.commit()
+    assert attended(session, line_id) == (2, 2)
+    assert attended(session, other_id) == (1, 1)
+    assert len(session.exec(select(AttendanceEvent)).all()) == 6
+
+
+def test_clock_ins_replace_a_manual_count(client, session, site):
+    first, second, third = site["employees"]
+    created = client.post(
+        "/api/v1/production_lines/create",
+        json={
+            "assignment_name": "Line A",
+            "no_of_employees_needed": 5,
+            "no_of_employees_attended": 4,
+            "production_date": MONDAY.isoformat(),
+            "manager_id": site["manager"].id,
+            "location_id": site["location"].id,
+        },
+    )
+    line_id = created.json()["id"]
+    line = session.get(ProductionLine, line_id)
+    write_events(session, [event(line, first), event(line, second)])
+    session.commit()
+    assert attended(session, line_id) == (2, 2)
+
+    response = client.put(
+        f"/api/v1/production_lines/update/{line_id}",
+        json={"no_of_employees_attended": 0},
+    )
+    assert response.status_code == 409
+    # Clock-ins after the rejected edit keep counting from the events
+    write_events(session, [event(line, first, minute=10), event(line, third)])
+    session.commit()
+    assert attended(session, line_id) == (3, 3)
+
+
+def test_manual_edits_cannot_override_clock_ins(client, session, site):
+    line = make_line(session, site, MONDAY, needed=5)
+    line_id = line.id
+    write_events(session, [event(line, site["employees"][0])])
+    session.commit()
+    url = f"/api/v1/production_lines/update/{line_id}"
+
+    response = client.put(url, json={"no_of_employees_attended": 7})
+    assert response.status_code == 409
+    assert attended(session, line_id) == (1, 1)
+    # Other fields, and the unchanged count, can still be edited
+    response = client.put(
+        url, json={"no_of_employees_attended": 1, "units_produced": 40}
+    )
+    assert response.status_code == 200
+    assert response.json()["units_produced"] == 40
+
+
+def test_buffer_writes_in_batches_and_rejects_when_full(session, site):
+    line = make_line(session, site, MONDAY)
+    line_id = line.id
+    buffer = AttendanceBuffer(
+        lambda: Session(engine), flush_size=2, flush_interval=60, max_buffered=3
+    )
+    buffer._thread = object()  # Flush by hand instead of in the background
+    first, second, third = site["employees"]
+    assert buffer.add([event(line, first), event(line, second)]) == 2
+    with pytest.raises(Overloaded) as error:
+        buffer.add([event(line, third), event(line, third, "out")])
+    assert error.value.retry_after >= 1
+    assert buffer.add([event(line, third)]) == 3
+
+    assert buffer.flush() == 3
+    assert len(buffer) == 0
+    assert attended(session, line_id) == (3, 3)
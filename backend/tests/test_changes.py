@@ -0,0 +1,112 @@
+from datetime import date, datetime, timedelta
+
+from models.models import ChangeLog, ShiftSchedule, TimeOffRequest
+from services.changes import prune_changes
+from sqlmodel import select
+
+from .conftest import make_shift
+
+MONDAY = date(2025, 3, 3)
+
+
+def changes(client, **params):
+    response = client.get("/api/v1/changes/", params=params)
+    assert response.status_code == 200
+    return response.json()
+
+
+def summary(body):
+    return [(change["entity"], change["action"]) for change in body["changes"]]
+
+
+def test_orm_writes_are_logged_with_increasing_versions(session, site):
+    shift = make_shift(session, site, MONDAY)
+    shift.capacity = 3
+    session.add(shift)
+    session.commit()
+    session.delete(shift)
+    session.commit()
+    log = session.exec(select(ChangeLog).order_by(ChangeLog.version)).all()
+    assert [(row.version, row.entity, row.action) for row in log] == [
+        (1, "shift", "upsert"),
+        (2, "shift", "upsert"),
+        (3, "shift", "delete"),
+    ]
+    assert log[1].payload["capacity"] == 3
+    assert log[2].payload is None
+
+
+def test_a_page_returns_the_last_change_of_each_entity(client, session, site):
+    shift = make_shift(session, site, MONDAY)
+    shift.capacity = 2
+    session.add(shift)
+    session.commit()
+    body = changes(client)
+    assert body["version"] == 2 and not body["has_more"]
+    assert [
+        (change["version"], change["data"]["capacity"]) for change in body["changes"]
+    ] == [(2, 2)]
+    # Nothing new since the returned version
+    assert changes(client, since=2) == {"version": 2, "has_more": False, "changes": []}
+
+
+def test_the_cursor_pages_through_in_version_order(client, session, site):
+    for offset in range(3):
+        make_shift(session, site, MONDAY + timedelta(days=offset))
+    first = changes(client, limit=2)
+    assert first["has_more"] and first["version"] == 2
+    assert [change["version"] for change in first["changes"]] == [1, 2]
+    second = changes(client, since=first["version"], limit=2)
+    assert not second["has_more"] and second["version"] == 3
+    assert [change["version"] for change in second["changes"]] == [3]
+
+
+def test_filters_keep_the_cursor_at_the_latest_version(client, session, site):
+    first, other = (employee.id for employee in site["employees"][:2])
+    make_shift(session, site, MONDAY)
+    session.add_all(
+        [
+            TimeOffRequest(
+                employee_id=employee_id,
+                request_date=MONDAY,
+                start_date=MONDAY,
+                end_date=MONDAY,
+                status="Pending",
+            )
+            for employee_id in (first, other)
+        ]
+        + [
+            ShiftSchedule(
+                shift_date=MONDAY,
+                shift_type="Morning",
+                employee_id=first,
+                location_id=site["location"].id,
+            )
+        ]
+    )
+    session.commit()
+    body = changes(client, employee_id=first)
+    assert body["version"] == 4
+    # The shift belongs to the first employee too; the other's leave is left out
+    assert sorted(summary(body)) == [
+        ("assignment", "upsert"),
+        ("shift", "upsert"),
+        ("time_off", "upsert"),
+    ]
+    assert changes(client, employee_id=other)["version"] == 4
+    assert summary(changes(client, employee_id=other)) == [("time_off", "upsert")]
+
+
+def test_a_cursor_behind_the_pruned_log_gets_410(client, session, site):
+    for offset in range(2):
+        make_shift(session, site, MONDAY + timedelta(days=offset))
+    oldest = session.exec(select(ChangeLog).where(ChangeLog.version == 1)).one()
+    oldest.created_at = datetime.now() - timedelta(days=60)
+    session.commit()
+    assert prune_changes(session, datetime.now() - timedelta(days=30)) == 1
+
+    response = client.get("/api/v1/changes/", params={"since": 0})
+    assert response.status_code == 410
+    # Clients that already saw version 1 continue normally
+    body = changes(client, since=1)
+    assert [change["version"] for change in body["changes"]] == [2]
@@ -0,0 +1,117 @@
+from datetime import date, datetime, time
+
+from models.models import Availability
+from src.coverage import analyse
+from src.records import AvailabilityRecord, ShiftRecord, TimeOffRecord
+from src.time_off import TimeOffIndex
+
+from .conftest import make_shift
+
+SUNDAY, MONDAY = date(2025, 3, 2), date(2025, 3, 3)
+
+
+def shift(shift_id, day, start, end, capacity):
+    return ShiftRecord(
+        shift_id, day, day.strftime("%A"), time(start), time(end), None, capacity, 1
+    )
+
+
+def available(employee_id, start, end, day="Monday"):
+    return AvailabilityRecord(employee_id, day, time(start), time(end))
+
+
+def at(hour):
+    return datetime(2025, 3, 3, hour)
+
+
+def monday(**kwargs):
+    return analyse(
+        shifts=[shift(1, MONDAY, 6, 14, 2), shift(2, MONDAY, 12, 20, 1)],
+        availability=[available(1, 6, 14), available(2, 8, 18)],
+        employee_locations={1: 1, 2: 1},
+        first_day=MONDAY,
+        last_day=MONDAY,
+        **kwargs,
+    )
+
+
+def window(gap):
+    return gap["start"], gap["end"], gap["shortfall"], gap["shift_ids"]
+
+
+def test_gaps_are_the_windows_where_capacity_exceeds_headcount():
+    gaps, _ = monday()
+    assert [window(gap) for gap in gaps] == [
+        (at(6), at(8), 1, [1]),
+        (at(12), at(14), 1, [1, 2]),
+        (at(18), at(20), 1, [2]),
+    ]
+
+
+def test_adjacent_short_segments_merge_into_one_gap():
+    leave = TimeOffRecord(2, "Approved", MONDAY, MONDAY)
+    gaps, _ = monday(time_off=TimeOffIndex([leave]))
+    # Without employee 2 the whole day from 06:00 to 20:00 is short
+    assert len(gaps) == 1
+    gap = gaps[0]
+    assert window(gap) == (at(6), at(20), 2, [1, 2])
+    assert (gap["min_available"], gap["peak_demand"]) == (0, 3)
+
+
+def test_event_curve_and_day_buckets():
+    _, curve = monday(resolution="event")
+    assert [
+        (point["start"].hour, point["available"], point["demand"])
+        for point in curve
+        if point["demand"] or point["available"]
+    ] == [(6, 1, 2), (8, 2, 2), (12, 2, 3), (14, 1, 1), (18, 0, 1)]
+
+    _, curve = monday(resolution="day")
+    assert curve == [
+        {
+            "location_id": 1,
+            "start": datetime(2025, 3, 3),
+            "end": datetime(2025, 3, 4),
+            "available": 0,
+            "demand": 3,
+            "uncovered_minutes": 360,
+        }
+    ]
+
+
+def test_overnight_shift_from_the_day_before_counts():
+    gaps, _ = analyse(
+        shifts=[shift(7, SUNDAY, 22, 6, 1)],
+        availability=[available(1, 22, 2, day="Sunday")],
+        employee_locations={1: 1},
+        first_day=MONDAY,
+        last_day=MONDAY,
+    )
+    # Covered until 02:00 by Sunday's window that runs past midnight
+    assert [window(gap) for gap in gaps] == [(at(2), at(6), 1, [7])]
+
+
+def test_coverage_route_reads_the_stored_shifts(client, site, session):
+    stored = make_shift(session, site, MONDAY, capacity=2)
+    employee = site["employees"][0]
+    session.add(
+        Availability(
+            employee_id=employee.id,
+            day_of_week="Monday",
+            date_of_week=MONDAY.isoformat(),
+            start_time=time(6),
+            end_time=time(10),
+        )
+    )
+    session.commit()
+    response = client.get(
+        "/api/v1/shifts/coverage",
+        params={"start_date": MONDAY.isoformat(), "days": 1, "resolution": "day"},
+    )
+    assert response.status_code == 200
+    body = response.json()
+    assert [
+        (gap["start"], gap["end"], gap["shortfall"], gap["shift_ids"])
+        for gap in body["gaps"]
+    ] == [("2025-03-03T06:00:00", "2025-03-03T14:00:00", 2, [stored.id])]
+    assert body["curve"][0]["uncovered_minutes"] == 8 * 60
@@ -0,0 +1,51 @@
+from models.models import FeedRevision
+from services.feeds import bump_feeds
+from sqlmodel import select
+
+
+def revisions(session):
+    session.expire_all()
+    return {
+        (row.scope, row.scope_id): row.revision
+        for row in session.exec(select(FeedRevision))
+    }
+
+
+def test_bumps_create_then_increment_revisions(session):
+    bump_feeds(session, [1, 2], [7])
+    session.commit()
+    bump_feeds(session, [2, None], [])
+    session.commit()
+    assert revisions(session) == {
+        ("employee", 1): 1,
+        ("employee", 2): 2,
+        ("location", 7): 1,
+    }
+
+
+def test_feed_etag_follows_the_revision(client, site, session):
+    employee_id = site["employees"][0].id
+    url = f"/api/v1/feeds/employees/{employee_id}.ics"
+    first = client.get(url)
+    assert first.status_code == 200
+    cached = {"If-None-Match": first.headers["ETag"]}
+    assert client.get(url, headers=cached).status_code == 304
+
+    bump_feeds(session, [employee_id])
+    session.commit()
+    second = client.get(url, headers=cached)
+    assert second.status_code == 200
+    assert second.headers["ETag"] != first.headers["ETag"]
+
+
+def test_unknown_targets_are_404_even_with_validators(client, site):
+    url = "/api/v1/feeds/employees/999.ics"
+    for headers in (
+        {},
+        {"If-None-Match": "*"},
+        {"If-Modified-Since": "Fri, 31 Dec 2999 00:00:00 GMT"},
+    ):
+        assert client.get(url, headers=headers).status_code == 404
+    location_id = site["location"].id
+    url = f"/api/v1/feeds/locations/{location_id}.ics"
+    assert client.get(url, headers={"If-None-Match": "*"}).status_code == 304
@@ -0,0 +1,100 @@
+from datetime import date
+
+from models.models import KpiRollup
+from services.kpi import apply_deltas, get_kpi, rebuild_kpis
+from sqlmodel import Session, select
+
+from .conftest import make_line
+
+MONDAY = date(2025, 3, 3)
+
+
+def line_payload(site, **fields):
+    return {
+        "assignment_name": "Line A",
+        "no_of_employees_needed": 4,
+        "no_of_employees_attended": 3,
+        "units_produced": 120,
+        "production_date": MONDAY.isoformat(),
+        "manager_id": site["manager"].id,
+        "location_id": site["location"].id,
+        **fields,
+    }
+
+
+def test_line_writes_move_both_rollups(client, site, session):
+    created = client.post("/api/v1/production_lines/create", json=line_payload(site))
+    line_id = created.json()["id"]
+    location_id = site["location"].id
+
+    kpi = client.get(f"/api/v1/kpis/location/{location_id}?week={MONDAY}").json()
+    assert kpi["employees_needed"] == 4
+    assert kpi["employees_attended"] == 3
+    assert kpi["attendance_rate"] == 0.75
+
+    client.put(
+        f"/api/v1/production_lines/update/{line_id}",
+        json={"no_of_employees_attended": 4, "units_produced": 100},
+    )
+    kpi = client.get(f"/api/v1/kpis/line/{line_id}?week={MONDAY}").json()
+    assert (kpi["employees_attended"], kpi["units_produced"]) == (4, 100)
+
+    client.delete(f"/api/v1/production_lines/delete/{line_id}")
+    kpi = client.get(f"/api/v1/kpis/location/{location_id}?week={MONDAY}").json()
+    assert kpi["line_count"] == 0 and kpi["employees_needed"] == 0
+
+
+def test_moving_a_line_to_another_week_moves_its_contribution(client, site):
+    line_id = client.post(
+        "/api/v1/production_lines/create", json=line_payload(site)
+    ).json()["id"]
+    next_week = date(2025, 3, 12)
+    client.put(
+        f"/api/v1/production_lines/update/{line_id}",
+        json={"production_date": next_week.isoformat()},
+    )
+    old = client.get(f"/api/v1/kpis/line/{line_id}?week={MONDAY}").json()
+    new = client.get(f"/api/v1/kpis/line/{line_id}?week={next_week}").json()
+    assert old["line_count"] == 0 and old["employees_needed"] == 0
+    assert new["line_count"] == 1 and new["week_start"] == "2025-03-10"
+
+
+def test_deltas_add_without_reading_rows(session):
+    key = ("line", 7, MONDAY)
+    apply_deltas(session, {key: {"employees_needed": 2, "line_count": 1}})
+    session.commit()
+    # A second session applying to the row it never loaded adds on top
+    with Session(session.get_bind()) as other:
+        apply_deltas(other, {key: {"employees_needed": 3}})
+        other.commit()
+    apply_deltas(session, {key: {"employees_attended": 1}})
+    session.commit()
+
+    rollup = get_kpi(session, "line", 7, MONDAY)
+    session.refresh(rollup)
+    assert (rollup.employees_needed, rollup.employees_attended, rollup.line_count) == (
+        5,
+        1,
+        1,
+    )
+    assert len(session.exec(select(KpiRollup)).all()) == 1
+
+
+def test_rebuild_matches_incremental_rollups(session, site):
+    make_line(session, site, MONDAY, needed=3, units_produced=10)
+    make_line(session, site, date(2025, 3, 5), needed=2, units_produced=5)
+    assert rebuild_kpis(session) == 3  # two lines and their location
+    location = get_kpi(session, "location", site["location"].id, MONDAY)
+    assert (location.employees_needed, location.units_produced) == (5, 15)
+
+
+def test_first_writes_racing_for_a_row_do_not_collide(session):
+    from utils.upsert import insert_missing
+
+    row = {"scope": "line", "scope_id": 9, "week_start": MONDAY, "employees_needed": 1}
+    keys = ("scope", "scope_id", "week_start")
+    insert_missing(session, KpiRollup.__table__, [row], keys)
+    # A writer that checked before the row existed inserts it again
+    insert_missing(session, KpiRollup.__table__, [{**row, "employees_needed": 5}], keys)
+    session.commit()
+    assert get_kpi(session, "line", 9, MONDAY).employees_needed == 1
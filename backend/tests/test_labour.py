@@ -0,0 +1,41 @@
+from datetime import date, time
+
+from ortools.sat.python import cp_model
+from src.labour import LabourRules, conflict_cliques
+from src.records import ShiftRecord
+from src.schedule import build_assignment_model, collect_assignments
+
+
+def test_conflict_cliques_are_maximal_groups_of_overlapping_spans():
+    spans = [(0, 10), (5, 15), (8, 20), (12, 30), (40, 50)]
+    assert conflict_cliques(spans) == [[0, 1, 2], [1, 2, 3]]
+    # Touching spans do not overlap
+    assert conflict_cliques([(0, 10), (10, 20)]) == []
+
+
+def solve(shifts, fixed=()):
+    model = cp_model.CpModel()
+    variables = build_assignment_model(
+        model, [(1, shift) for shift in shifts], LabourRules(), fixed
+    )
+    model.Maximize(sum(var for _, var in variables.values()))
+    solver = cp_model.CpSolver()
+    assert solver.Solve(model) == cp_model.OPTIMAL
+    return sorted(row["shift_id"] for row in collect_assignments(solver, variables))
+
+
+def shift(shift_id, day, start, end):
+    return ShiftRecord(
+        shift_id, day, day.strftime("%A"), time(start), time(end), None, 1, 1
+    )
+
+
+def test_short_rests_and_overlaps_are_ruled_out():
+    monday, tuesday = date(2025, 3, 3), date(2025, 3, 4)
+    evening = shift(1, monday, 14, 22)
+    # 8 hours after the evening shift ends, short of the 11 hour rest
+    early = shift(2, tuesday, 6, 14)
+    late = shift(3, tuesday, 14, 22)
+    assert solve([evening, early, late]) == [1, 3]
+    # A fixed evening shift blocks the early shift without a variable
+    assert solve([early, late], fixed=[(1, evening)]) == [3]
@@ -0,0 +1,85 @@
+import re
+
+import pytest
+from utils.metrics import MetricsRegistry
+
+SAMPLE = re.compile(
+    r"^(?P<name>[a-zA-Z_:][a-zA-Z0-9_:]*)"
+    r'(?:\{(?P<labels>(?:[a-zA-Z_][a-zA-Z0-9_]*="(?:[^"\\]|\\.)*",?)*)\})?'
+    r" (?P<value>\S+)$"
+)
+
+
+def parse(text):
+    """Samples of a text exposition as {name{labels}: value}, checking types."""
+    assert text.endswith("\n")
+    types, samples = {}, {}
+    for line in text.splitlines():
+        if line.startswith("# TYPE "):
+            _, _, name, kind = line.split(" ")
+            types[name] = kind
+            continue
+        if line.startswith("# HELP "):
+            continue
+        match = SAMPLE.match(line)
+        assert match, f"Not a sample line: {line!r}"
+        name = match["name"]
+        family = re.sub(r"_(bucket|sum|count)$", "", name)
+        assert name in types or types.get(family) == "histogram", line
+        samples[f"{name}{{{match['labels'] or ''}}}"] = float(match["value"])
+    return samples
+
+
+def test_label_values_are_escaped():
+    registry = MetricsRegistry()
+    counter = registry.counter("requests_total", "Requests.", ("route",))
+    counter.inc(route='/a"b\\c\nd')
+    assert 'requests_total{route="/a\\"b\\\\c\\nd"} 1' in registry.render()
+    assert parse(registry.render()) == {'requests_total{route="/a\\"b\\\\c\\nd"}': 1}
+
+
+def test_histograms_render_cumulative_buckets_sum_and_count():
+    registry = MetricsRegistry()
+    histogram = registry.histogram(
+        "latency_seconds", "Latency.", ("route",), buckets=(0.1, 1.0)
+    )
+    for value in (0.05, 0.5, 0.5, 3.0):
+        histogram.observe(value, route="/x")
+    lines = registry.render().splitlines()
+    assert lines == [
+        "# HELP latency_seconds Latency.",
+        "# TYPE latency_seconds histogram",
+        'latency_seconds_bucket{route="/x",le="0.1"} 1',
+        'latency_seconds_bucket{route="/x",le="1"} 3',
+        'latency_seconds_bucket{route="/x",le="+Inf"} 4',
+        'latency_seconds_sum{route="/x"} 4.05',
+        'latency_seconds_count{route="/x"} 4',
+    ]
+
+
+def test_counters_only_accumulate():
+    registry = MetricsRegistry()
+    counter = registry.counter("events_total", "Events.", ("result",))
+    scrapes = []
+    for amount in (1, 0, 2.5):
+        counter.inc(amount, result="ok")
+        scrapes.append(parse(registry.render())['events_total{result="ok"}'])
+    assert scrapes == [1, 1, 3.5]
+    with pytest.raises(ValueError):
+        counter.inc(-1, result="ok")
+    assert parse(registry.render())['events_total{result="ok"}'] == 3.5
+    # Registering the family again reuses it instead of resetting it
+    assert registry.counter("events_total", "Events.", ("result",)) is counter
+
+
+def test_metrics_endpoint_serves_the_exposition(client):
+    client.get("/no-such-page")
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    samples = parse(response.text)
+    labels = 'method="GET",route="unmatched"'
+    assert samples[f'http_requests_total{{{labels},status="404"}}'] >= 1
+    assert samples[f"http_request_duration_seconds_count{{{labels}}}"] >= 1
+    # Scrapes are not counted as traffic
+    assert not any('route="/metrics"' in name for name in samples)
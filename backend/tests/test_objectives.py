@@ -0,0 +1,170 @@
+import math
+from datetime import date, time
+from types import SimpleNamespace
+
+import pytest
+import services.scheduling
+from ortools.sat.python import cp_model
+from src.objectives import plan_quality, staged_solve
+from src.schedule import build_assignment_model, eligible_pairs, shift_schedule
+
+MONDAY = date(2025, 3, 3)
+
+
+def make_shift(shift_id, day, desc="Morning shift", capacity=1):
+    return SimpleNamespace(
+        id=shift_id,
+        shift_date=day,
+        shift_week_day=day.strftime("%A"),
+        shift_start_time=time(6),
+        shift_end_time=time(14),
+        shift_desc=desc,
+        capacity=capacity,
+        location_id=1,
+    )
+
+
+def make_employee(employee_id, days=None, shifts=None):
+    return SimpleNamespace(
+        id=employee_id,
+        employee_preference_days=days,
+        employee_preference_shifts=shifts,
+    )
+
+
+def always_available(employee_ids, shifts):
+    return [
+        SimpleNamespace(
+            employee_id=employee_id,
+            day_of_week=day,
+            start_time=time(0),
+            end_time=time(23, 59),
+        )
+        for employee_id in employee_ids
+        for day in {shift.shift_week_day for shift in shifts}
+    ]
+
+
+def solve(employees, shifts, available_ids, time_limits=None):
+    model = cp_model.CpModel()
+    employee_shift_vars = build_assignment_model(
+        model,
+        eligible_pairs(
+            employees=employees,
+            shifts=shifts,
+            availability=always_available(available_ids, shifts),
+        ),
+    )
+    solver, results = staged_solve(
+        model, employee_shift_vars, employees, time_limits or {}
+    )
+    plan = sorted(
+        (employee_id, shift_id)
+        for (employee_id, shift_id), (_, var) in employee_shift_vars.items()
+        if solver is not None and solver.Value(var)
+    )
+    return plan, results
+
+
+def objectives(results):
+    return {result["stage"]: result.get("objective") for result in results}
+
+
+class RecordingSolver(cp_model.CpSolver):
+    """Keeps each stage's time limit; stages listed in ``fail`` find nothing."""
+
+    limits = []
+    fail = ()
+
+    def Solve(self, model, *args, **kwargs):
+        self.limits.append(self.parameters.max_time_in_seconds)
+        if len(self.limits) in self.fail:
+            return cp_model.UNKNOWN
+        return super().Solve(model, *args, **kwargs)
+
+
+@pytest.fixture
+def recording_solver(monkeypatch):
+    monkeypatch.setattr(RecordingSolver, "limits", [])
+    monkeypatch.setattr(RecordingSolver, "fail", ())
+    monkeypatch.setattr(cp_model, "CpSolver", RecordingSolver)
+    return RecordingSolver
+
+
+def test_each_stage_keeps_the_optimum_of_the_stages_before_it():
+    employees = [make_employee(1), make_employee(2, days=["Monday"])]
+    plan, results = solve(employees, [make_shift(10, MONDAY)], [1, 2])
+    # Leaving the shift empty would be fairer, but coverage is locked first;
+    # the preference for Monday is locked before fairness.
+    assert plan == [(2, 10)]
+    assert objectives(results) == {"coverage": 1, "preferences": 1, "fairness": 480}
+    assert [result["status"] for result in results] == ["OPTIMAL"] * 3
+
+
+def test_fairness_spreads_minutes_among_employees_who_can_work():
+    employees = [make_employee(employee_id) for employee_id in (1, 2, 3)]
+    shifts = [make_shift(10 + offset, date(2025, 3, 3 + offset)) for offset in range(3)]
+    # Employee 3 has no availability and does not count towards the spread
+    plan, results = solve(employees, shifts, [1, 2])
+    loads = sorted(
+        sum(1 for employee_id, _ in plan if employee_id == worker) for worker in (1, 2)
+    )
+    assert len(plan) == 3 and loads == [1, 2]
+    # No preferences stated, so that stage is skipped
+    assert objectives(results) == {"coverage": 3, "fairness": 480}
+
+
+def test_every_stage_runs_within_its_own_time_limit(recording_solver):
+    employees = [make_employee(1, shifts=["Morning"]), make_employee(2)]
+    shifts = [make_shift(10, MONDAY)]
+    assignments, status = shift_schedule(
+        employees=employees,
+        shifts=shifts,
+        availability=always_available([1, 2], shifts),
+        objective="staged",
+        time_limit=7,
+        stage_time_limits={"preferences": 2, "fairness": 3},
+    )
+    assert [(row["employee_id"], row["shift_id"]) for row in assignments] == [(1, 10)]
+    assert status == "OPTIMAL"
+    assert recording_solver.limits == [7, 2, 3]
+
+
+def test_stage_limits_default_from_the_environment():
+    assert services.scheduling.SCHEDULE_STAGE_TIME_LIMITS == {
+        "preferences": 5.0,
+        "fairness": 5.0,
+    }
+
+
+def test_a_stage_without_a_solution_keeps_the_previous_plan(recording_solver):
+    recording_solver.fail = (2,)
+    employees = [make_employee(1), make_employee(2, days=["Tuesday"])]
+    shifts = [make_shift(10, MONDAY), make_shift(11, date(2025, 3, 4))]
+    plan, results = solve(employees, shifts, [1, 2], {"preferences": 1})
+    assert [(result["stage"], result["status"]) for result in results] == [
+        ("coverage", "OPTIMAL"),
+        ("preferences", "UNKNOWN"),
+    ]
+    # The coverage plan stands and fairness never runs
+    assert len(plan) == 2
+    assert recording_solver.limits == [math.inf, 1]
+
+
+def test_plan_quality_scores_a_finished_plan():
+    employees = [
+        make_employee(1, days=["Monday"], shifts=["Morning"]),
+        make_employee(2),
+    ]
+    shifts = [make_shift(10, MONDAY, capacity=2), make_shift(11, date(2025, 3, 4))]
+    quality = plan_quality(
+        [(1, 10), (2, 11)], shifts, employees, {1, 2, 3}, current=[(1, 10), (3, 11)]
+    )
+    assert quality == {
+        "assigned": 2,
+        "coverage": 0.6667,  # 2 of 3 slots
+        "preferences": 2,  # Employee 1 on a preferred day and shift
+        "load_spread_minutes": 480,  # Employee 3 is eligible but idle
+        "churn": 2,  # (2, 11) added, (3, 11) dropped
+    }
+    assert "churn" not in plan_quality([], shifts, employees, set())
@@ -0,0 +1,69 @@
+import cProfile
+import json
+import pstats
+import re
+
+import main
+import utils.profiling
+from utils.profiling import folded_stacks
+
+FRAME = re.compile(r"^\S+ \(\S+\.py:\d+\)$")
+
+
+def spin(rounds):
+    total = 0
+    for number in range(rounds):
+        total += number * number
+    return total
+
+
+def work():
+    return spin(200_000) + spin(100_000)
+
+
+def test_folded_stacks_are_semicolon_joined_frames_with_microseconds():
+    profiler = cProfile.Profile()
+    profiler.enable()
+    work()
+    profiler.disable()
+
+    lines = folded_stacks(pstats.Stats(profiler))
+    assert lines == sorted(lines)
+    stacks = {}
+    for line in lines:
+        stack, _, value = line.rpartition(" ")
+        assert int(value) > 0
+        stacks[stack] = int(value)
+    # Callers come before callees, each as "function (file:line)"
+    (spin_stack,) = [stack for stack in stacks if stack.endswith(";" + _label(spin))]
+    frames = spin_stack.split(";")
+    assert frames[-2:] == [_label(work), _label(spin)]
+    assert all(FRAME.match(frame) for frame in frames[-2:])
+
+
+def _label(function):
+    code = function.__code__
+    return f"{code.co_name} (test_profiling.py:{code.co_firstlineno})"
+
+
+def test_profile_artifacts_need_the_profiling_token(client, tmp_path, monkeypatch):
+    monkeypatch.setattr(utils.profiling, "PROFILING_OUTPUT_DIR", tmp_path)
+    monkeypatch.setattr(main, "PROFILING_OUTPUT_DIR", tmp_path)
+    (tmp_path / "run.json").write_text("{}")
+
+    # The default deployment has no token: nothing is profiled or served
+    response = client.get("/metrics", headers={"X-Profile": ""})
+    assert "x-profile-id" not in response.headers
+    for headers in ({}, {"X-Profile": ""}, {"X-Profile": "guess"}):
+        response = client.get("/debug/profiles/run.json", headers=headers)
+        assert response.status_code == 403
+
+    monkeypatch.setattr(utils.profiling, "PROFILING_TOKEN", "secret")
+    token = {"X-Profile": "secret"}
+    profiled = client.get("/metrics", headers=token)
+    artifact = f"{profiled.headers['x-profile-id']}.json"
+    assert client.get(f"/debug/profiles/{artifact}").status_code == 403
+    response = client.get(f"/debug/profiles/{artifact}", headers=token)
+    assert response.status_code == 200
+    assert json.loads(response.content)["path"] == "/metrics"
+    assert client.get("/debug/profiles/missing.json", headers=token).status_code == 404
@@ -0,0 +1,127 @@
+import os
+import time as clock
+from dataclasses import asdict
+from datetime import date, time
+
+import pytest
+import src.recording
+from models.models import Availability, ShiftDetail
+from services.scheduling import run_schedule
+from src.labour import DEFAULT_RULES
+from src.records import (
+    AvailabilityRecord,
+    EmployeeRecord,
+    ShiftRecord,
+    TimeOffRecord,
+)
+from src.recording import compare, load_record, record_solve, replay
+from src.schedule import shift_schedule
+
+from .conftest import make_shift
+
+MONDAY, TUESDAY = date(2025, 3, 3), date(2025, 3, 4)
+
+
+class InlineWriter:
+    """Runs the background writes on the calling thread."""
+
+    def submit(self, fn, *args):
+        fn(*args)
+
+
+@pytest.fixture
+def recordings(tmp_path, monkeypatch):
+    monkeypatch.setattr(src.recording, "SOLVE_RECORDING", True)
+    monkeypatch.setattr(src.recording, "SOLVE_RECORD_DIR", tmp_path)
+    monkeypatch.setattr(src.recording, "_writer", InlineWriter())
+    return tmp_path
+
+
+def shift(shift_id, day):
+    return ShiftRecord(
+        shift_id, day, day.strftime("%A"), time(6), time(14), "Morning shift", 1, 1
+    )
+
+
+def test_a_recorded_solve_replays_without_drift(recordings):
+    inputs = {
+        "employees": [
+            EmployeeRecord(1, ["Monday"], None),
+            EmployeeRecord(2, None, None),
+        ],
+        "shifts": [shift(10, MONDAY), shift(11, TUESDAY)],
+        "availability": [
+            AvailabilityRecord(1, "Monday", time(0), time(23, 59)),
+            AvailabilityRecord(2, "Tuesday", time(0), time(23, 59)),
+        ],
+        "employee_skills": [],
+        "skill_requirements": [],
+        "production_lines": [],
+        "time_off_requests": [TimeOffRecord(2, "Approved", MONDAY, MONDAY)],
+        "fixed": [(1, shift(9, date(2025, 3, 2)))],
+    }
+    params = {"time_limit": 5, "objective": "staged", "stage_time_limits": {}}
+    assignments, status = shift_schedule(**inputs, **params, labour_rules=DEFAULT_RULES)
+    path = record_solve(
+        "schedule",
+        inputs,
+        {**params, "labour_rules": asdict(DEFAULT_RULES)},
+        assignments,
+        0.25,
+        status=status,
+    )
+    assert list(recordings.iterdir()) == [path]
+
+    record = load_record(path)
+    assert record["kind"] == "schedule" and record["outcome"]["status"] == "OPTIMAL"
+    assert record["outcome"]["assignments"] == [[1, 10], [2, 11]]
+    replayed = replay(record)
+    assert replayed["assignments"] == record["outcome"]["assignments"]
+    assert replayed["status"] == "OPTIMAL"
+    report = compare(record, replayed)
+    assert report["changed_assignments"] == 0
+    assert report["recorded"] == report["replayed"]
+    assert report["recorded"]["preferences"] == 1
+
+
+def test_schedule_runs_record_their_solver_status(recordings, site, session):
+    shift = make_shift(session, site, MONDAY)
+    session.add(
+        Availability(
+            employee_id=site["employees"][1].id,
+            day_of_week="Monday",
+            date_of_week=MONDAY.isoformat(),
+            start_time=time(0),
+            end_time=time(23, 59),
+        )
+    )
+    session.commit()
+    run_schedule(session, ShiftDetail.id == shift.id)
+    (path,) = recordings.iterdir()
+    outcome = load_record(path)["outcome"]
+    assert outcome["status"] == "OPTIMAL"
+    assert outcome["assignments"] == [[site["employees"][1].id, shift.id]]
+
+
+def test_nothing_is_written_when_recording_is_off(recordings, monkeypatch):
+    monkeypatch.setattr(src.recording, "SOLVE_RECORDING", False)
+    assert record_solve("schedule", {}, {}, [], 0.1) is None
+    assert list(recordings.iterdir()) == []
+
+
+def test_old_and_surplus_records_are_pruned(recordings, monkeypatch):
+    monkeypatch.setattr(src.recording, "SOLVE_RECORD_MAX_FILES", 3)
+    monkeypatch.setattr(src.recording, "SOLVE_RECORD_MAX_AGE_DAYS", 1)
+    names = [f"2025030{day}T060000-schedule-abc.json.gz" for day in range(1, 6)]
+    for name in names:
+        (recordings / name).write_bytes(b"")
+    stale = clock.time() - 2 * 86400
+    os.utime(recordings / names[3], (stale, stale))
+    (recordings / "notes.txt").write_text("kept")
+
+    src.recording._prune()
+    assert sorted(path.name for path in recordings.iterdir()) == [
+        names[2],
+        names[4],
+        "notes.txt",
+    ]
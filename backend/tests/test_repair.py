@@ -0,0 +1,99 @@
+from datetime import date, time
+
+from models.models import Availability, ShiftSchedule
+from sqlmodel import select
+from src.records import AvailabilityRecord, EmployeeRecord, ShiftRecord
+from src.repair import repair_schedule
+
+from .conftest import make_shift
+
+MONDAY, TUESDAY = date(2025, 3, 3), date(2025, 3, 4)
+
+
+def inputs(capacity):
+    return {
+        "employees": [
+            EmployeeRecord(employee_id, None, None) for employee_id in (1, 2, 3)
+        ],
+        "shifts": [
+            ShiftRecord(10, MONDAY, "Monday", time(6), time(14), None, capacity, 1)
+        ],
+        "availability": [
+            AvailabilityRecord(employee_id, "Monday", time(0), time(23, 59))
+            for employee_id in (1, 2, 3)
+        ],
+    }
+
+
+def pairs(assignments):
+    return sorted((row["employee_id"], row["shift_id"]) for row in assignments)
+
+
+def test_repair_keeps_current_assignments_when_nothing_changed():
+    assignments, status = repair_schedule(**inputs(2), current={(2, 10), (3, 10)})
+    assert status == "OPTIMAL"
+    assert pairs(assignments) == [(2, 10), (3, 10)]
+
+
+def test_repair_replaces_only_the_blocked_employee():
+    assignments, status = repair_schedule(
+        **inputs(2),
+        current={(1, 10), (2, 10)},
+        blocked=[(1, MONDAY, MONDAY)],
+    )
+    assert status == "OPTIMAL"
+    assert pairs(assignments) == [(2, 10), (3, 10)]
+
+
+def test_repair_route_leaves_shifts_outside_the_neighbourhood(client, site, session):
+    first = site["employees"][0].id
+    monday = make_shift(session, site, MONDAY)
+    tuesday = make_shift(session, site, TUESDAY)
+    session.add_all(
+        [
+            Availability(
+                employee_id=employee.id,
+                day_of_week=day.strftime("%A"),
+                date_of_week=day.isoformat(),
+                start_time=time(0),
+                end_time=time(23, 59),
+            )
+            for employee in site["employees"]
+            for day in (MONDAY, TUESDAY)
+        ]
+        + [
+            ShiftSchedule(
+                shift_date=shift.shift_date,
+                shift_type="Morning",
+                employee_id=first,
+                location_id=site["location"].id,
+                shift_id=shift.id,
+            )
+            for shift in (monday, tuesday)
+        ]
+    )
+    session.commit()
+    kept = session.exec(
+        select(ShiftSchedule.id).where(ShiftSchedule.shift_id == tuesday.id)
+    ).one()
+
+    response = client.post(
+        "/api/v1/shifts/repair",
+        json={
+            "kind": "employee_unavailable",
+            "employee_id": first,
+            "start_date": MONDAY.isoformat(),
+            "end_date": MONDAY.isoformat(),
+        },
+    )
+    assert response.status_code == 200
+    body = response.json()
+    assert body["neighbourhood_shift_ids"] == [monday.id]
+    assert body["removed_assignments"] == [[first, monday.id]]
+    assert len(body["added_assignments"]) == 1
+    assert body["added_assignments"][0][0] != first
+
+    # Tuesday's assignment is not re-written, let alone moved
+    session.expire_all()
+    row = session.get(ShiftSchedule, kept)
+    assert (row.shift_id, row.employee_id) == (tuesday.id, first)
@@ -0,0 +1,100 @@
+from contextlib import contextmanager
+from datetime import date, datetime, time
+
+import services.scheduling
+from models.models import (
+    Availability,
+    Employee,
+    Location,
+    Manager,
+    ShiftDetail,
+    ShiftSchedule,
+    TimeOffRequest,
+)
+from services.scheduling import run_schedule
+from sqlalchemy import create_engine
+from sqlmodel import Session, SQLModel, select
+
+MONDAY = date(2025, 3, 3)
+
+
+def populate(session, available_ids):
+    """The same site in any database: two employees and one Monday shift."""
+    manager = Manager(id=1, manager_role="Shift lead")
+    location = Location(
+        id=1,
+        location_name="Plant",
+        address="Street 1",
+        kommun="Town",
+        zipcode="12345",
+        country="SE",
+        manager_id=1,
+    )
+    employees = [
+        Employee(
+            id=employee_id,
+            first_name=f"First{employee_id}",
+            last_name="Last",
+            employee_email=f"employee{employee_id}@example.com",
+            hire_date=datetime(2024, 1, 1),
+            location_id=1,
+        )
+        for employee_id in (1, 2)
+    ]
+    shift = ShiftDetail(
+        id=1,
+        shift_week_day="Monday",
+        shift_date=MONDAY,
+        shift_start_time=time(6),
+        shift_end_time=time(14),
+        shift_desc="Morning shift",
+        capacity=2,
+        employee_id=1,
+        manager_id=1,
+        location_id=1,
+    )
+    session.add_all([manager, location, *employees, shift])
+    session.flush()
+    session.add_all(
+        Availability(
+            employee_id=employee_id,
+            day_of_week="Monday",
+            date_of_week=MONDAY.isoformat(),
+            start_time=time(0),
+            end_time=time(23, 59),
+        )
+        for employee_id in available_ids
+    )
+    session.commit()
+
+
+def test_replica_solves_read_time_off_and_availability_from_the_primary(
+    session, tmp_path, monkeypatch
+):
+    # The replica has not seen employee 2's availability nor employee 1's
+    # approved leave yet.
+    replica = create_engine(f"sqlite:///{tmp_path / 'replica.db'}")
+    SQLModel.metadata.create_all(replica)
+    with Session(replica) as replica_session:
+        populate(replica_session, available_ids=[1])
+    populate(session, available_ids=[1, 2])
+    session.add(
+        TimeOffRequest(
+            employee_id=1,
+            request_date=MONDAY,
+            start_date=MONDAY,
+            end_date=MONDAY,
+            status="Approved",
+        )
+    )
+    session.commit()
+
+    @contextmanager
+    def lagging_replica():
+        with Session(replica) as replica_session:
+            yield replica_session
+
+    monkeypatch.setattr(services.scheduling, "read_session", lagging_replica)
+    assignments, _ = run_schedule(session, ShiftDetail.id == 1, from_replica=True)
+    assert [row["employee_id"] for row in assignments] == [2]
+    assert [row.employee_id for row in session.exec(select(ShiftSchedule))] == [2]
@@ -0,0 +1,69 @@
+from datetime import date, time
+from functools import partial
+
+from services.scheduling import ScenarioPool
+from src.records import AvailabilityRecord, EmployeeRecord, ShiftRecord
+from src.scenarios import ScenarioBase, evaluate_all
+
+DAYS = [date(2025, 3, 3 + offset) for offset in range(3)]
+
+
+def base():
+    shifts = {
+        10 + index: ShiftRecord(
+            10 + index, day, day.strftime("%A"), time(6), time(14), None, 1, 1
+        )
+        for index, day in enumerate(DAYS)
+    }
+    return ScenarioBase(
+        shifts=shifts,
+        pairs=[
+            (employee_id, shift_id) for employee_id in (1, 2) for shift_id in shifts
+        ],
+        current={(1, 10), (1, 11), (2, 12)},
+        inputs={
+            "employees": [EmployeeRecord(1, None, None), EmployeeRecord(2, None, None)],
+            "availability": [
+                AvailabilityRecord(employee_id, day.strftime("%A"), time(0), time(23))
+                for employee_id in (1, 2)
+                for day in DAYS
+            ],
+        },
+    )
+
+
+def unavailable(employee_id, day):
+    return [
+        {
+            "kind": "employee_unavailable",
+            "employee_id": employee_id,
+            "start_date": day,
+            "end_date": day,
+        }
+    ]
+
+
+def test_pooled_results_match_sequential_ones_in_order():
+    scenarios = [
+        unavailable(employee_id, day) for employee_id in (1, 2) for day in DAYS
+    ]
+    expected = evaluate_all(base(), scenarios)
+    pool = ScenarioPool(2)
+    try:
+        executor = pool.start()
+        assert pool.start() is executor
+        first = pool.run(partial(evaluate_all, base(), scenarios))
+        # The same processes serve the next batch
+        second = pool.run(partial(evaluate_all, base(), scenarios[::-1]))
+    finally:
+        pool.close()
+
+    def without_timings(results):
+        return [
+            {name: value for name, value in result.items() if name != "solve_seconds"}
+            for result in results
+        ]
+
+    assert without_timings(first) == without_timings(expected)
+    assert without_timings(second[::-1]) == without_timings(expected)
+    assert [result["removed_assignments"] for result in first] == [1, 1, 0, 0, 0, 1]
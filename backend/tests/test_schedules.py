@@ -0,0 +1,64 @@
+from datetime import date
+
+from models.database import engine, init_db
+from models.models import ShiftSchedule
+from services.schedules import employee_schedule
+from sqlalchemy import event, inspect, text
+
+from .conftest import make_shift
+
+MONDAY = date(2025, 3, 3)
+
+
+def test_schedule_scan_is_served_by_the_covering_index(site, session):
+    shift = make_shift(session, site, MONDAY)
+    employee = site["employees"][0]
+    session.add(
+        ShiftSchedule(
+            shift_date=MONDAY,
+            shift_type="Morning",
+            employee_id=employee.id,
+            location_id=site["location"].id,
+            shift_id=shift.id,
+        )
+    )
+    session.commit()
+
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if "FROM shift_schedules" in statement:
+            statements.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", capture)
+    try:
+        schedule = employee_schedule(session, employee.id, MONDAY, MONDAY)
+    finally:
+        event.remove(engine, "before_cursor_execute", capture)
+    assert [row["shift_type"] for row in schedule["shifts"]] == ["Morning"]
+
+    statement, parameters = statements[0]
+    plan = session.connection().exec_driver_sql(
+        f"EXPLAIN QUERY PLAN {statement}", parameters
+    )
+    details = [row[-1] for row in plan]
+    assert any(
+        "shift_schedules USING COVERING INDEX ix_shift_schedules_employee_schedule"
+        in detail
+        for detail in details
+    ), details
+
+
+def test_init_db_replaces_the_old_schedule_index(session):
+    with engine.begin() as connection:
+        connection.execute(text("DROP INDEX ix_shift_schedules_employee_schedule"))
+        connection.execute(
+            text(
+                "CREATE INDEX ix_shift_schedules_employee_date ON shift_schedules "
+                "(employee_id, shift_date, shift_id, location_id)"
+            )
+        )
+    init_db()
+    names = {index["name"] for index in inspect(engine).get_indexes("shift_schedules")}
+    assert "ix_shift_schedules_employee_schedule" in names
+    assert "ix_shift_schedules_employee_date" not in names
@@ -0,0 +1,66 @@
+import json
+from datetime import date, datetime, time
+
+import pytest
+from models.models import Location
+from models.schemas import LocationResponse
+from sqlalchemy.pool import StaticPool
+from sqlmodel import Session, SQLModel, create_engine, select
+from utils.serialization import dumps, fetch_rows, rows_response
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://", poolclass=StaticPool)
+    SQLModel.metadata.create_all(engine)
+    with Session(engine) as session:
+        session.add_all(
+            Location(
+                location_name=name,
+                address="Street 1",
+                kommun="Town",
+                zipcode="12345",
+                country="SE",
+            )
+            for name in ("Plant B", "Plant A", "Plant C")
+        )
+        session.commit()
+        yield session
+
+
+def test_dumps_writes_compact_utf8_with_iso_dates():
+    body = dumps(
+        {
+            "day": date(2025, 3, 3),
+            "at": time(6, 30),
+            "when": datetime(2025, 3, 3, 6, 30),
+            1: "Göteborg",
+        }
+    )
+    expected = (
+        '{"day":"2025-03-03","at":"06:30:00","when":"2025-03-03T06:30:00",'
+        '"1":"Göteborg"}'
+    )
+    assert body == expected.encode()
+
+
+def test_rows_match_what_response_model_validation_returns(db):
+    expected = [
+        LocationResponse.model_validate(location).model_dump(mode="json")
+        for location in db.exec(select(Location)).all()
+    ]
+    response = rows_response(db, Location, LocationResponse)
+    assert response.media_type == "application/json"
+    assert json.loads(response.body) == expected
+    assert list(json.loads(response.body)[0]) == list(LocationResponse.model_fields)
+
+
+def test_fetch_rows_filters_and_orders(db):
+    rows = fetch_rows(
+        db,
+        Location,
+        LocationResponse,
+        Location.location_name != "Plant C",
+        order_by=[Location.location_name],
+    )
+    assert [row["location_name"] for row in rows] == ["Plant A", "Plant B"]
@@ -0,0 +1,86 @@
+import logging
+
+import pytest
+from models.settings import DatabaseSettings
+
+
+@pytest.mark.parametrize(
+    "workers, max_connections, pool_size, max_overflow, expected",
+    [
+        # Two thirds of each worker's share in the pool, the rest as overflow
+        (1, 100, None, None, (66, 34)),
+        (4, 100, None, None, (16, 9)),
+        (3, 10, None, None, (2, 1)),
+        # Tiny budgets still get one steady connection
+        (5, 10, None, None, (1, 1)),
+        (10, 10, None, None, (1, 0)),
+        # More workers than connections: one each, no overflow
+        (20, 10, None, None, (1, 0)),
+        (0, 10, None, None, (6, 4)),
+        # Overrides fill up the rest of the budget, or are clamped to it
+        (4, 100, 10, None, (10, 15)),
+        (4, 100, None, 0, (16, 0)),
+        (4, 100, 10, 20, (10, 15)),
+        (4, 100, 30, 10, (25, 0)),
+        (20, 10, 5, 5, (1, 0)),
+    ],
+)
+def test_pool_is_sized_from_the_worker_budget(
+    workers, max_connections, pool_size, max_overflow, expected
+):
+    settings = DatabaseSettings(workers=workers, max_connections=max_connections)
+    settings.size_pool(pool_size=pool_size, max_overflow=max_overflow)
+    assert (settings.pool_size, settings.max_overflow) == expected
+    assert sum(expected) <= settings.per_worker_budget
+
+
+def test_pool_settings_come_from_the_environment(monkeypatch, caplog):
+    monkeypatch.setenv("WEB_CONCURRENCY", "4")
+    monkeypatch.setenv("DB_MAX_CONNECTIONS", "40")
+    monkeypatch.setenv("DB_POOL_SIZE", "20")
+    monkeypatch.setenv("DB_MAX_OVERFLOW", "")
+    with caplog.at_level(logging.WARNING):
+        settings = DatabaseSettings.from_env()
+    assert (settings.workers, settings.per_worker_budget) == (4, 10)
+    assert (settings.pool_size, settings.max_overflow) == (10, 0)
+    assert "clamping" in caplog.text
+
+
+def test_more_workers_than_connections_is_reported(caplog):
+    settings = DatabaseSettings(workers=20, max_connections=10)
+    with caplog.at_level(logging.WARNING):
+        settings.size_pool()
+    assert "exceed DB_MAX_CONNECTIONS=10" in caplog.text
+    caplog.clear()
+    DatabaseSettings(workers=10, max_connections=10).size_pool()
+    assert caplog.text == ""
+
+
+def test_replicas_copy_the_primary_settings_per_endpoint(monkeypatch):
+    monkeypatch.setenv("DB_BACKEND", "mysql")
+    monkeypatch.setenv("DB_SCHEMA", "ess")
+    monkeypatch.setenv("DB_REPLICA_ENDPOINTS", " replica-1:3306, ,replica-2 ")
+    monkeypatch.setenv("SQLITE_REPLICA_PATHS", "ignored.db")
+    primary = DatabaseSettings.from_env()
+    replicas = primary.replicas()
+    assert [replica.endpoint for replica in replicas] == ["replica-1:3306", "replica-2"]
+    assert all(
+        (replica.pool_size, replica.max_overflow, replica.replica_endpoints)
+        == (primary.pool_size, primary.max_overflow, [])
+        for replica in replicas
+    )
+    assert replicas[0].url.endswith("@replica-1:3306/ess")
+
+
+def test_sqlite_replicas_are_database_files(monkeypatch):
+    monkeypatch.setenv("DB_BACKEND", "sqlite")
+    monkeypatch.setenv("SQLITE_PATH", "primary.db")
+    monkeypatch.setenv("SQLITE_REPLICA_PATHS", "copy-1.db,copy-2.db")
+    replicas = DatabaseSettings.from_env().replicas()
+    assert [replica.url for replica in replicas] == [
+        "sqlite:///copy-1.db",
+        "sqlite:///copy-2.db",
+    ]
+    # An in-memory database cannot be replicated
+    monkeypatch.setenv("SQLITE_PATH", ":memory:")
+    assert DatabaseSettings.from_env().replicas() == []
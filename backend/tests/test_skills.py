@@ -0,0 +1,107 @@
+from datetime import date, time
+
+from models.models import EmployeeSkill, Skill
+from src.records import (
+    AvailabilityRecord,
+    EmployeeRecord,
+    EmployeeSkillRecord,
+    ProductionLineRecord,
+    ShiftRecord,
+    SkillRequirementRecord,
+)
+from src.schedule import eligible_pairs
+from src.skills import SkillMatrix
+
+WELDING, FORKLIFT = 1, 2
+
+
+def matrix(requirements, line_shifts=None):
+    employee_skills = [
+        EmployeeSkillRecord(1, WELDING, "Beginner"),
+        EmployeeSkillRecord(2, WELDING, "Advanced"),
+        EmployeeSkillRecord(2, FORKLIFT, "Beginner"),
+        EmployeeSkillRecord(3, FORKLIFT, "Intermediate"),
+    ]
+    return SkillMatrix(employee_skills, requirements, line_shifts)
+
+
+def eligible(skills, shift_id, employee_ids=(1, 2, 3, 4)):
+    return sorted(skills.eligible(shift_id, skills.profiles(employee_ids)))
+
+
+def test_higher_levels_satisfy_lower_minimums():
+    skills = matrix(
+        [
+            SkillRequirementRecord(WELDING, "Beginner", 10, None),
+            SkillRequirementRecord(WELDING, "Intermediate", 11, None),
+        ]
+    )
+    assert eligible(skills, 10) == [1, 2]
+    assert eligible(skills, 11) == [2]
+
+
+def test_every_requirement_of_a_shift_must_be_met():
+    skills = matrix(
+        [
+            SkillRequirementRecord(WELDING, "Beginner", 10, None),
+            SkillRequirementRecord(FORKLIFT, "Beginner", 10, None),
+        ]
+    )
+    assert eligible(skills, 10) == [2]
+
+
+def test_shifts_without_requirements_are_open_to_everyone():
+    skills = matrix([SkillRequirementRecord(WELDING, "Advanced", 10, None)])
+    assert eligible(skills, 99) == [1, 2, 3, 4]
+
+
+def test_line_requirements_apply_to_the_line_shift():
+    skills = matrix(
+        [SkillRequirementRecord(FORKLIFT, "Intermediate", None, 5)],
+        line_shifts={5: 20},
+    )
+    assert eligible(skills, 20) == [3]
+
+
+def test_eligible_pairs_combine_skills_and_availability():
+    monday = date(2025, 3, 3)
+    shift = ShiftRecord(10, monday, "Monday", time(6), time(14), "Morning", 2, 1)
+    pairs = eligible_pairs(
+        employees=[EmployeeRecord(index, None, None) for index in (1, 2, 3)],
+        shifts=[shift],
+        availability=[
+            AvailabilityRecord(employee_id, "Monday", time(0), time(23, 59))
+            for employee_id in (1, 3)
+        ],
+        employee_skills=[
+            EmployeeSkillRecord(1, WELDING, "Intermediate"),
+            EmployeeSkillRecord(2, WELDING, "Advanced"),
+        ],
+        skill_requirements=[SkillRequirementRecord(WELDING, "Beginner", 10, None)],
+        production_lines=[ProductionLineRecord(5, None)],
+    )
+    # 2 has the skill but is not available; 3 is available without the skill
+    assert [employee_id for employee_id, _ in pairs] == [1]
+
+
+def test_employee_skills_route_lists_rows(client, site, session):
+    skill = Skill(skill_name="Welding")
+    session.add(skill)
+    session.flush()
+    session.add(
+        EmployeeSkill(
+            employee_id=site["employees"][0].id, skill_id=skill.id, skill_level="Advanced"
+        )
+    )
+    session.commit()
+    rows = client.get("/api/v1/skills/employee-skills").json()
+    assert rows == [
+        {
+            "id": 1,
+            "employee_id": site["employees"][0].id,
+            "skill_id": skill.id,
+            "skill_level": "Advanced",
+            "verified": False,
+            "last_verified_at": None,
+        }
+    ]
@@ -0,0 +1,51 @@
+from models.database import build_engine
+from models.settings import DatabaseSettings
+from sqlalchemy import text
+
+
+def pragma(connection, name):
+    return connection.execute(text(f"PRAGMA {name}")).scalar()
+
+
+def test_file_databases_run_in_wal_mode_with_tuned_pragmas(tmp_path):
+    settings = DatabaseSettings(
+        backend="sqlite",
+        sqlite_path=str(tmp_path / "ess.db"),
+        sqlite_cache_size_kb=1024,
+    )
+    settings.size_pool()
+    engine = build_engine(settings)
+    with engine.connect() as connection:
+        assert pragma(connection, "journal_mode") == "wal"
+        assert pragma(connection, "foreign_keys") == 1
+        assert pragma(connection, "synchronous") == 1  # NORMAL
+        assert pragma(connection, "cache_size") == -1024
+        assert pragma(connection, "busy_timeout") == 5000
+
+
+def test_wal_readers_do_not_wait_for_a_writer(tmp_path):
+    settings = DatabaseSettings(backend="sqlite", sqlite_path=str(tmp_path / "ess.db"))
+    settings.size_pool()
+    engine = build_engine(settings)
+    with engine.begin() as connection:
+        connection.execute(text("CREATE TABLE counts (value INTEGER)"))
+        connection.execute(text("INSERT INTO counts VALUES (1)"))
+    with engine.connect() as writer, engine.connect() as reader:
+        writer.execute(text("UPDATE counts SET value = 2"))
+        # The uncommitted write neither blocks nor leaks into the reader
+        assert reader.execute(text("SELECT value FROM counts")).scalar() == 1
+        writer.commit()
+        reader.rollback()
+        assert reader.execute(text("SELECT value FROM counts")).scalar() == 2
+
+
+def test_in_memory_databases_share_one_connection():
+    settings = DatabaseSettings(backend="sqlite", sqlite_path=":memory:")
+    assert settings.url == "sqlite://"
+    engine = build_engine(settings)
+    with engine.begin() as connection:
+        connection.execute(text("CREATE TABLE counts (value INTEGER)"))
+        # WAL does not apply to memory databases
+        assert pragma(connection, "journal_mode") == "memory"
+    with engine.connect() as connection:
+        assert connection.execute(text("SELECT count(*) FROM counts")).scalar() == 0
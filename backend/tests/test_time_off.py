@@ -0,0 +1,212 @@
+from datetime import date, time
+
+import services.scheduling
+from migrations.schema import add_missing_columns
+from models.models import Availability, ShiftDetail, ShiftSchedule, TimeOffRequest
+from sqlalchemy import create_engine, inspect, text
+from sqlmodel import SQLModel, select
+from src.records import AvailabilityRecord, EmployeeRecord, ShiftRecord, TimeOffRecord
+from src.schedule import eligible_pairs
+from src.time_off import TimeOffIndex
+
+from .conftest import make_shift
+
+
+def leave(employee_id, start, end, status="Approved"):
+    return TimeOffRecord(employee_id, status, start, end)
+
+
+def test_overlapping_and_adjacent_leave_is_merged():
+    index = TimeOffIndex(
+        [
+            leave(1, date(2025, 3, 3), date(2025, 3, 5)),
+            leave(1, date(2025, 3, 6), date(2025, 3, 7)),
+            leave(1, date(2025, 3, 4), date(2025, 3, 4)),
+            leave(1, date(2025, 3, 20), date(2025, 3, 21)),
+        ]
+    )
+    assert index.intervals(1) == [
+        (date(2025, 3, 3), date(2025, 3, 7)),
+        (date(2025, 3, 20), date(2025, 3, 21)),
+    ]
+
+
+def test_lookups_cover_the_whole_interval_and_nothing_else():
+    index = TimeOffIndex(
+        [
+            leave(1, date(2025, 3, 3), date(2025, 3, 7)),
+            leave(1, date(2025, 3, 20), date(2025, 3, 21)),
+            leave(2, date(2025, 3, 10), date(2025, 3, 10), status="Pending"),
+            leave(3, date(2025, 3, 10), date(2025, 3, 10), status="Denied"),
+        ]
+    )
+    assert index.is_off(1, date(2025, 3, 3))
+    assert index.is_off(1, date(2025, 3, 7))
+    assert not index.is_off(1, date(2025, 3, 2))
+    assert not index.is_off(1, date(2025, 3, 8))
+    assert not index.is_off(1, date(2025, 3, 19))
+    assert index.overlaps(1, date(2025, 3, 8), date(2025, 3, 20))
+    assert not index.overlaps(1, date(2025, 3, 8), date(2025, 3, 19))
+    # Only approved leave counts
+    assert not index.is_off(2, date(2025, 3, 10))
+    assert not index.is_off(3, date(2025, 3, 10))
+    assert not TimeOffIndex([leave(2, date(2025, 3, 10), date(2025, 3, 10), "Pending")])
+
+
+def test_eligible_pairs_skip_employees_on_leave():
+    shifts = [
+        ShiftRecord(10 + index, day, day.strftime("%A"), time(6), time(14), None, 2, 1)
+        for index, day in enumerate((date(2025, 3, 3), date(2025, 3, 4)))
+    ]
+    pairs = eligible_pairs(
+        employees=[EmployeeRecord(employee_id, None, None) for employee_id in (1, 2)],
+        shifts=shifts,
+        availability=[
+            AvailabilityRecord(employee_id, day, time(0), time(23, 59))
+            for employee_id in (1, 2)
+            for day in ("Monday", "Tuesday")
+        ],
+        time_off_requests=[leave(1, date(2025, 3, 4), date(2025, 3, 9))],
+    )
+    assert sorted((employee_id, shift.id) for employee_id, shift in pairs) == [
+        (1, 10),
+        (2, 10),
+        (2, 11),
+    ]
+
+
+def test_approved_request_drops_assignments_with_the_request(client, site, session):
+    employee, location = site["employees"][0], site["location"]
+    session.add(
+        ShiftSchedule(
+            shift_date=date(2025, 3, 4),
+            shift_type="Morning",
+            employee_id=employee.id,
+            location_id=location.id,
+        )
+    )
+    session.commit()
+    response = client.post(
+        "/api/v1/time_off_requests/create",
+        json={
+            "employee_id": employee.id,
+            "request_date": "2025-03-01",
+            "start_date": "2025-03-03",
+            "end_date": "2025-03-05",
+            "status": "Approved",
+        },
+    )
+    assert response.status_code == 200
+    session.expire_all()
+    assert session.exec(select(ShiftSchedule)).all() == []
+
+
+def test_approved_leave_restaffs_the_freed_shifts(client, site, session):
+    absent, cover, _ = site["employees"]
+    shift = make_shift(session, site, date(2025, 3, 4), current_employees=1)
+    session.add_all(
+        Availability(
+            employee_id=employee.id,
+            day_of_week="Tuesday",
+            date_of_week="2025-03-04",
+            start_time=time(0),
+            end_time=time(23, 59),
+        )
+        for employee in (absent, cover)
+    )
+    session.add(
+        ShiftSchedule(
+            shift_date=shift.shift_date,
+            shift_type="Morning shift",
+            employee_id=absent.id,
+            location_id=shift.location_id,
+            shift_id=shift.id,
+        )
+    )
+    request = TimeOffRequest(
+        employee_id=absent.id,
+        request_date=date(2025, 3, 1),
+        start_date=date(2025, 3, 3),
+        end_date=date(2025, 3, 5),
+        status="Pending",
+    )
+    session.add(request)
+    session.commit()
+
+    response = client.put(
+        f"/api/v1/time_off_requests/{request.id}/status", json={"status": "Approved"}
+    )
+    assert response.status_code == 200
+    body = response.json()
+    assert body["replan_error"] is None
+    assert body["removed_assignments"] == [[absent.id, shift.id]]
+    assert body["added_assignments"] == [[cover.id, shift.id]]
+    session.expire_all()
+    assert [row.employee_id for row in session.exec(select(ShiftSchedule))] == [
+        cover.id
+    ]
+    assert session.get(ShiftDetail, shift.id).current_employees == 1
+
+
+def test_failed_replan_still_reports_the_stored_decision(
+    client, site, session, monkeypatch
+):
+    request = TimeOffRequest(
+        employee_id=site["employees"][0].id,
+        request_date=date(2025, 3, 1),
+        start_date=date(2025, 3, 3),
+        end_date=date(2025, 3, 5),
+        status="Approved",
+    )
+    session.add(request)
+    session.commit()
+
+    def fail(*args, **kwargs):
+        raise RuntimeError("solver crashed")
+
+    monkeypatch.setattr(services.scheduling, "run_schedule", fail)
+    response = client.put(
+        f"/api/v1/time_off_requests/{request.id}/status", json={"status": "Denied"}
+    )
+    assert response.status_code == 200
+    body = response.json()
+    assert body["request"]["status"] == "Denied"
+    assert body["replan_error"] == "solver crashed"
+    session.expire_all()
+    assert session.get(TimeOffRequest, request.id).status == "Denied"
+
+
+def test_init_db_adds_columns_missing_from_existing_tables(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'old.db'}")
+    with engine.begin() as connection:
+        connection.execute(
+            text(
+                "CREATE TABLE production_lines (id INTEGER PRIMARY KEY, "
+                "assignment_name VARCHAR NOT NULL, no_of_employees_needed INTEGER "
+                "NOT NULL, no_of_employees_attended INTEGER, manager_id INTEGER, "
+                "location_id INTEGER, shift_id INTEGER)"
+            )
+        )
+        connection.execute(
+            text(
+                "INSERT INTO production_lines (assignment_name, "
+                "no_of_employees_needed, manager_id, location_id) "
+                "VALUES ('Line A', 2, 1, 1)"
+            )
+        )
+    added = add_missing_columns(engine, SQLModel.metadata)
+    assert added == [
+        "production_lines.units_produced",
+        "production_lines.production_date",
+    ]
+    columns = {
+        column["name"] for column in inspect(engine).get_columns("production_lines")
+    }
+    assert {"units_produced", "production_date"} <= columns
+    with engine.connect() as connection:
+        row = connection.execute(
+            text("SELECT units_produced, production_date FROM production_lines")
+        ).one()
+    assert row.units_produced is None
+    assert row.production_date == date.today().isoformat()
+    assert add_missing_columns(engine, SQLModel.metadata) == []
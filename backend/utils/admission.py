@@ -0,0 +1,235 @@
+import itertools
+import math
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Hashable
+
+from utils.metrics import registry
+
+# Lower ranks are admitted first and shed last
+PRIORITIES = {"high": 0, "normal": 1, "low": 2}
+
+ADMISSIONS = registry.counter(
+    "admission_requests_total",
+    "Requests for solver/LLM work by pool and outcome.",
+    ("pool", "priority", "outcome"),
+)
+ADMISSION_WAIT_SECONDS = registry.histogram(
+    "admission_wait_seconds",
+    "Time admitted requests spent queued for a slot.",
+    ("pool",),
+)
+COALESCED = registry.counter(
+    "single_flight_coalesced_total",
+    "Requests served by joining an identical computation already in flight.",
+    ("key",),
+)
+
+
+class Overloaded(Exception):
+    """Raised when a pool sheds a request; answered with 429 and Retry-After."""
+
+    def __init__(self, pool: str, retry_after: int):
+        super().__init__(f"The {pool} is busy, retry in {retry_after} seconds")
+        self.pool = pool
+        self.retry_after = retry_after
+
+
+class _Waiter:
+    __slots__ = ("rank", "event", "state")
+
+    def __init__(self, rank):
+        self.rank = rank
+        self.event = threading.Event()
+        self.state = "waiting"
+
+
+class AdmissionController:
+    """
+    Runs at most ``max_concurrent`` jobs and queues at most ``max_queue``
+    more, highest priority first. A full queue sheds its lowest-priority
+    waiter to make room for a more urgent request, and otherwise turns the
+    newcomer away; waiters also give up after ``queue_timeout`` seconds.
+    Requests beyond that get ``Overloaded`` straight away instead of holding
+    a threadpool thread that cheap endpoints need.
+    """
+
+    def __init__(
+        self, name: str, max_concurrent: int, max_queue: int, queue_timeout: float
+    ):
+        self.name = name
+        self.max_concurrent = max(max_concurrent, 1)
+        self.max_queue = max(max_queue, 0)
+        self.queue_timeout = queue_timeout
+        self._lock = threading.Lock()
+        self._running = 0
+        self._waiting = []
+        self._sequence = itertools.count()
+        self._service_seconds = None  # moving average of job durations
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"running": self._running, "queued": len(self._waiting)}
+
+    def _retry_after(self) -> int:
+        # Expected time for the queue ahead to drain, assuming average jobs
+        per_job = self._service_seconds or 1.0
+        rounds = (len(self._waiting) + 1) / self.max_concurrent
+        return min(max(math.ceil(per_job * rounds), 1), 300)
+
+    def _shed(self, priority: str, outcome: str):
+        ADMISSIONS.inc(pool=self.name, priority=priority, outcome=outcome)
+        return Overloaded(self.name, self._retry_after())
+
+    def _acquire(self, priority: str):
+        waiter = _Waiter((PRIORITIES[priority], next(self._sequence)))
+        with self._lock:
+            if self._running < self.max_concurrent and not self._waiting:
+                self._running += 1
+                ADMISSIONS.inc(pool=self.name, priority=priority, outcome="admitted")
+                return
+            if len(self._waiting) >= self.max_queue:
+                worst = max(self._waiting, key=lambda w: w.rank, default=None)
+                if worst is None or worst.rank[0] <= waiter.rank[0]:
+                    raise self._shed(priority, "rejected")
+                self._waiting.remove(worst)
+                worst.state = "shed"
+                worst.event.set()
+            self._waiting.append(waiter)
+        queued_at = time.perf_counter()
+
+        waiter.event.wait(self.queue_timeout)
+        with self._lock:
+            if waiter.state == "waiting":
+                self._waiting.remove(waiter)
+                raise self._shed(priority, "timeout")
+            if waiter.state == "shed":
+                raise self._shed(priority, "shed")
+        ADMISSIONS.inc(pool=self.name, priority=priority, outcome="admitted")
+        ADMISSION_WAIT_SECONDS.observe(time.perf_counter() - queued_at, pool=self.name)
+
+    def _release(self, seconds: float):
+        with self._lock:
+            self._service_seconds = (
+                seconds
+                if self._service_seconds is None
+                else 0.8 * self._service_seconds + 0.2 * seconds
+            )
+            if self._waiting:
+                # Hand the slot straight to the most urgent waiter
+                waiter = min(self._waiting, key=lambda w: w.rank)
+                self._waiting.remove(waiter)
+                waiter.state = "admitted"
+                waiter.event.set()
+            else:
+                self._running -= 1
+
+    @contextmanager
+    def slot(self, priority: str = "normal"):
+        self._acquire(priority)
+        started_at = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._release(time.perf_counter() - started_at)
+
+
+class _Call:
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class FollowerTimeout(Exception):
+    """A coalesced caller gave up waiting for the leader's result."""
+
+
+class SingleFlight:
+    """
+    Coalesces identical concurrent calls: the first caller for a key runs the
+    function and everyone arriving while it runs gets the same result (or
+    exception). Nothing is cached once the call finishes.
+
+    Followers wait at most ``timeout`` seconds (no limit when None) and then
+    raise ``FollowerTimeout``; the leader's call carries on.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+
+    def do(self, key: Hashable, fn: Callable, timeout: float = None):
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+        if not leader:
+            COALESCED.inc(key=key[0] if isinstance(key, tuple) else key)
+            if not call.done.wait(timeout):
+                raise FollowerTimeout(key)
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+
+flights = SingleFlight()
+solver_pool = AdmissionController(
+    "solver",
+    max_concurrent=int(os.getenv("SOLVER_MAX_CONCURRENT", "2")),
+    max_queue=int(os.getenv("SOLVER_MAX_QUEUE", "8")),
+    queue_timeout=float(os.getenv("SOLVER_QUEUE_TIMEOUT", "60")),
+)
+llm_pool = AdmissionController(
+    "llm",
+    max_concurrent=int(os.getenv("LLM_MAX_CONCURRENCY", "4")),
+    max_queue=int(os.getenv("LLM_MAX_QUEUE", "16")),
+    queue_timeout=float(os.getenv("LLM_QUEUE_TIMEOUT", "30")),
+)
+
+registry.gauge(
+    "admission_jobs",
+    "Jobs running and queued per admission pool.",
+    ("pool", "state"),
+    collect=lambda: {
+        (pool.name, state): value
+        for pool in (solver_pool, llm_pool)
+        for state, value in pool.stats().items()
+    },
+)
+
+
+def run_guarded(
+    key: Hashable, pool: AdmissionController, fn: Callable, priority: str = "normal"
+):
+    """
+    Run ``fn`` once for all concurrent callers with the same ``key``, inside
+    one of ``pool``'s slots. Followers never take a slot of their own, but
+    wait no longer than a queued request would (``queue_timeout``) before
+    they are shed with ``Overloaded`` too.
+    """
+
+    def admitted():
+        with pool.slot(priority):
+            return fn()
+
+    try:
+        return flights.do(key, admitted, timeout=pool.queue_timeout)
+    except FollowerTimeout:
+        raise pool._shed(priority, "follower_timeout") from None
@@ -0,0 +1,130 @@
+import time
+from contextvars import ContextVar
+from typing import Optional
+
+from sqlalchemy import event
+from utils.metrics import registry
+
+REQUESTS = registry.counter(
+    "http_requests_total",
+    "HTTP requests by route template, method and status code.",
+    ("method", "route", "status"),
+)
+REQUEST_SECONDS = registry.histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by route template and method.",
+    ("method", "route"),
+)
+DB_QUERIES = registry.counter(
+    "db_queries_total", "SQL statements executed.", ("route",)
+)
+DB_QUERY_SECONDS = registry.counter(
+    "db_query_seconds_total", "Time spent executing SQL statements.", ("route",)
+)
+DB_QUERIES_PER_REQUEST = registry.histogram(
+    "db_queries_per_request",
+    "SQL statements issued while serving one request.",
+    ("route",),
+    buckets=(0, 1, 2, 3, 5, 10, 25, 50, 100, 250, 1000),
+)
+DB_SECONDS_PER_REQUEST = registry.histogram(
+    "db_seconds_per_request",
+    "Time spent in SQL while serving one request.",
+    ("route",),
+)
+
+
+class RequestDBStats:
+    """
+    SQL activity of the request currently being served.
+
+    The instance is shared through a context variable, which FastAPI copies
+    into the threadpool that runs sync endpoints, so queries issued there are
+    attributed to the right request.
+    """
+
+    __slots__ = ("queries", "seconds", "statements")
+
+    def __init__(self, capture_statements: bool = False):
+        self.queries = 0
+        self.seconds = 0.0
+        self.statements = [] if capture_statements else None
+
+
+current_db_stats: ContextVar[Optional[RequestDBStats]] = ContextVar(
+    "current_db_stats", default=None
+)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, many):
+    conn.info.setdefault("query_started_at", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, many):
+    elapsed = time.perf_counter() - conn.info["query_started_at"].pop()
+    stats = current_db_stats.get()
+    if stats is None:
+        return
+    stats.queries += 1
+    stats.seconds += elapsed
+    if stats.statements is not None:
+        stats.statements.append((statement, elapsed))
+
+
+def instrument_engine(engine):
+    """Attach the SQL timing hooks to an engine (idempotent)."""
+    if event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        return
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+def route_label(scope) -> str:
+    """The matched route template, so label cardinality stays bounded."""
+    route = scope.get("route")
+    return getattr(route, "path", None) or "unmatched"
+
+
+class MetricsMiddleware:
+    """
+    Pure ASGI middleware recording per-route latency, status codes and the
+    SQL statements each request issued.
+    """
+
+    def __init__(self, app, excluded_paths=("/metrics",)):
+        self.app = app
+        self.excluded_paths = set(excluded_paths)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] in self.excluded_paths:
+            await self.app(scope, receive, send)
+            return
+
+        stats = current_db_stats.get()
+        token = None
+        if stats is None:
+            stats = RequestDBStats()
+            token = current_db_stats.set(stats)
+        status_code = 500
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        started_at = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - started_at
+            route = route_label(scope)
+            method = scope["method"]
+            REQUESTS.inc(method=method, route=route, status=status_code)
+            REQUEST_SECONDS.observe(elapsed, method=method, route=route)
+            DB_QUERIES.inc(stats.queries, route=route)
+            DB_QUERY_SECONDS.inc(stats.seconds, route=route)
+            DB_QUERIES_PER_REQUEST.observe(stats.queries, route=route)
+            DB_SECONDS_PER_REQUEST.observe(stats.seconds, route=route)
+            if token is not None:
+                current_db_stats.reset(token)
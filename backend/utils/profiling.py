@@ -0,0 +1,264 @@
+import cProfile
+import functools
+import hmac
+import inspect
+import json
+import os
+import pstats
+import random
+import tempfile
+import time
+import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Optional
+from urllib.parse import parse_qs
+
+from fastapi.routing import APIRoute
+from utils.instrumentation import RequestDBStats, current_db_stats, route_label
+
+PROFILING_TOKEN = os.getenv("PROFILING_TOKEN")
+PROFILING_SAMPLE_RATE = float(os.getenv("PROFILING_SAMPLE_RATE", "0"))
+PROFILING_OUTPUT_DIR = Path(
+    os.getenv("PROFILING_OUTPUT_DIR", os.path.join(tempfile.gettempdir(), "ess-profiles"))
+)
+PROFILING_MAX_ARTIFACTS = int(os.getenv("PROFILING_MAX_ARTIFACTS", "50"))
+
+PROFILE_HEADER = b"x-profile"
+PROFILE_QUERY_PARAM = "profile"
+
+
+class RequestProfile:
+    """
+    CPU profiles collected for one request.
+
+    Each sync endpoint call gets its own ``cProfile.Profile`` in the
+    threadpool thread it runs in, and the results are merged when the
+    request finishes.
+    """
+
+    def __init__(self, reason: str):
+        self.id = f"{time.strftime('%Y%m%dT%H%M%S')}-{uuid.uuid4().hex[:8]}"
+        self.reason = reason
+        self.profilers = []
+
+    @contextmanager
+    def capture(self):
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            yield
+        finally:
+            profiler.disable()
+            self.profilers.append(profiler)
+
+    def stats(self) -> Optional[pstats.Stats]:
+        if not self.profilers:
+            return None
+        stats = pstats.Stats(self.profilers[0])
+        for profiler in self.profilers[1:]:
+            stats.add(profiler)
+        return stats
+
+
+current_profile: ContextVar[Optional[RequestProfile]] = ContextVar(
+    "current_profile", default=None
+)
+
+
+def _frame_label(func) -> str:
+    filename, lineno, name = func
+    if filename == "~":
+        return name
+    return f"{name} ({os.path.basename(filename)}:{lineno})"
+
+
+def folded_stacks(stats: pstats.Stats, max_depth: int = 64) -> list:
+    """
+    Convert cProfile caller data into folded stacks (``a;b;c <microseconds>``)
+    accepted by flamegraph.pl, speedscope and inferno.
+
+    cProfile only records caller/callee edges, so time spent in a function is
+    split across the paths leading to it in proportion to each edge's
+    cumulative time.
+    """
+    entries = stats.stats
+    children = {}
+    for func, (_, _, _, _, callers) in entries.items():
+        for caller, edge in callers.items():
+            children.setdefault(caller, []).append((func, edge[3]))
+
+    folded = {}
+
+    def walk(func, path, share):
+        _, _, own_time, cumulative_time, _ = entries[func]
+        path = path + (_frame_label(func),)
+        ratio = share / cumulative_time if cumulative_time else 0
+        self_us = int(own_time * ratio * 1e6)
+        if self_us:
+            key = ";".join(path)
+            folded[key] = folded.get(key, 0) + self_us
+        if len(path) >= max_depth:
+            return
+        for child, edge_time in children.get(func, ()):
+            child_share = edge_time * ratio
+            if child_share < 1e-6 or _frame_label(child) in path:
+                continue
+            walk(child, path, child_share)
+
+    # Calls made from frames outside the profile (the profiler was enabled
+    # below them) have no caller edge; that remainder starts a new stack.
+    for func, (_, _, _, cumulative_time, callers) in entries.items():
+        external = cumulative_time - sum(
+            edge[3] for caller, edge in callers.items() if caller in entries
+        )
+        if external > 1e-6:
+            walk(func, (), external)
+
+    return [f"{stack} {value}" for stack, value in sorted(folded.items())]
+
+
+def _prune_artifacts():
+    artifacts = sorted(PROFILING_OUTPUT_DIR.glob("*.json"))
+    for stale in artifacts[:-PROFILING_MAX_ARTIFACTS]:
+        for path in PROFILING_OUTPUT_DIR.glob(f"{stale.stem}.*"):
+            path.unlink(missing_ok=True)
+
+
+def store_profile(profile: RequestProfile, scope, elapsed, db_stats) -> None:
+    """Write the folded stacks, raw pstats and SQL log for one request."""
+    PROFILING_OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
+    base = PROFILING_OUTPUT_DIR / profile.id
+    stats = profile.stats()
+    if stats is not None:
+        stats.dump_stats(f"{base}.prof")
+        Path(f"{base}.folded").write_text("\n".join(folded_stacks(stats)) + "\n")
+    Path(f"{base}.json").write_text(
+        json.dumps(
+            {
+                "id": profile.id,
+                "reason": profile.reason,
+                "method": scope["method"],
+                "path": scope["path"],
+                "route": route_label(scope),
+                "wall_seconds": elapsed,
+                "cpu_profile": stats is not None,
+                "sql_queries": db_stats.queries,
+                "sql_seconds": db_stats.seconds,
+                "sql_statements": [
+                    {"statement": statement, "seconds": seconds}
+                    for statement, seconds in db_stats.statements
+                ],
+            },
+            indent=2,
+        )
+    )
+    _prune_artifacts()
+
+
+def is_authorized(token: Optional[str]) -> bool:
+    return bool(PROFILING_TOKEN and token) and hmac.compare_digest(
+        token, PROFILING_TOKEN
+    )
+
+
+def _requested_token(scope) -> Optional[str]:
+    for name, value in scope["headers"]:
+        if name == PROFILE_HEADER:
+            return value.decode("latin-1")
+    query_string = scope.get("query_string", b"")
+    if PROFILE_QUERY_PARAM.encode() in query_string:
+        values = parse_qs(query_string.decode("latin-1")).get(PROFILE_QUERY_PARAM)
+        if values:
+            return values[0]
+    return None
+
+
+class ProfilingMiddleware:
+    """
+    Opt-in per-request profiler.
+
+    A request is profiled when it carries the ``PROFILING_TOKEN`` in the
+    ``X-Profile`` header or ``?profile=`` query parameter, or when it is picked
+    by ``PROFILING_SAMPLE_RATE``. Artifacts are written to
+    ``PROFILING_OUTPUT_DIR`` and their id is returned in ``X-Profile-Id``.
+    With no token configured and a zero sample rate this is a passthrough.
+
+    Only sync (``def``) endpoints get a CPU profile. cProfile hooks the
+    thread it is enabled in, and around an ``async def`` endpoint that
+    thread is the event loop: every other coroutine that runs while the
+    endpoint awaits would be attributed to it. Async endpoints still get
+    their wall time and SQL log, with ``cpu_profile: false``.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    def _reason(self, scope) -> Optional[str]:
+        if PROFILING_TOKEN and is_authorized(_requested_token(scope)):
+            return "requested"
+        if PROFILING_SAMPLE_RATE and random.random() < PROFILING_SAMPLE_RATE:
+            return "sampled"
+        return None
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not (PROFILING_TOKEN or PROFILING_SAMPLE_RATE):
+            await self.app(scope, receive, send)
+            return
+        reason = self._reason(scope)
+        if reason is None:
+            await self.app(scope, receive, send)
+            return
+
+        profile = RequestProfile(reason)
+        db_stats = RequestDBStats(capture_statements=True)
+        profile_token = current_profile.set(profile)
+        stats_token = current_db_stats.set(db_stats)
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", []))
+                headers.append((b"x-profile-id", profile.id.encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        started_at = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - started_at
+            current_profile.reset(profile_token)
+            current_db_stats.reset(stats_token)
+            store_profile(profile, scope, elapsed, db_stats)
+
+
+def _profiled(endpoint):
+    """Wrap an endpoint so it is profiled when the request asks for it."""
+    if getattr(endpoint, "__profiled__", False):
+        # include_router re-creates routes from the already wrapped endpoint.
+        return endpoint
+    if inspect.iscoroutinefunction(endpoint):
+        # Not profiled: see ProfilingMiddleware
+        return endpoint
+
+    @functools.wraps(endpoint)
+    def wrapper(*args, **kwargs):
+        profile = current_profile.get()
+        if profile is None:
+            return endpoint(*args, **kwargs)
+        with profile.capture():
+            return endpoint(*args, **kwargs)
+
+    wrapper.__profiled__ = True
+    return wrapper
+
+
+class ProfiledRoute(APIRoute):
+    """
+    Route class that lets ``ProfilingMiddleware`` profile sync endpoints in
+    the threadpool thread FastAPI runs them in.
+    """
+
+    def __init__(self, path, endpoint, **kwargs):
+        super().__init__(path, _profiled(endpoint), **kwargs)
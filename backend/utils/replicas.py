@@ -0,0 +1,68 @@
+import time
+from contextvars import ContextVar
+
+from starlette.requests import cookie_parser
+
+STICKY_COOKIE = "ess_primary_until"
+SAFE_METHODS = {"GET", "HEAD", "OPTIONS"}
+
+# True while serving a client that wrote recently: its reads skip replicas
+# that may not have caught up with its own write yet.
+read_from_primary: ContextVar[bool] = ContextVar("read_from_primary", default=False)
+
+
+class ReadYourWritesMiddleware:
+    """
+    Pure ASGI middleware giving clients read-your-writes over lagging replicas.
+
+    A successful write sets a cookie holding the time until which the client
+    reads from the primary; requests carrying an unexpired cookie set
+    ``read_from_primary`` for the session layer.
+    """
+
+    def __init__(self, app, sticky_seconds: int = 5):
+        self.app = app
+        self.sticky_seconds = sticky_seconds
+
+    def _is_sticky(self, scope) -> bool:
+        for name, value in scope.get("headers", ()):
+            if name == b"cookie":
+                until = cookie_parser(value.decode("latin-1")).get(STICKY_COOKIE)
+                try:
+                    return until is not None and float(until) > time.time()
+                except ValueError:
+                    return False
+        return False
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or self.sticky_seconds <= 0:
+            await self.app(scope, receive, send)
+            return
+
+        writing = scope["method"] not in SAFE_METHODS
+
+        async def send_wrapper(message):
+            if (
+                writing
+                and message["type"] == "http.response.start"
+                and message["status"] < 400
+            ):
+                until = int(time.time()) + self.sticky_seconds
+                cookie = (
+                    f"{STICKY_COOKIE}={until}; Max-Age={self.sticky_seconds}; "
+                    "Path=/; HttpOnly; SameSite=Lax"
+                )
+                message = {
+                    **message,
+                    "headers": [
+                        *message.get("headers", []),
+                        (b"set-cookie", cookie.encode("latin-1")),
+                    ],
+                }
+            await send(message)
+
+        token = read_from_primary.set(self._is_sticky(scope))
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            read_from_primary.reset(token)
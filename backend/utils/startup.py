@@ -0,0 +1,39 @@
+import logging
+import time
+from contextlib import contextmanager
+
+
+class StartupTimer:
+    """
+    Records how long each named phase of application boot takes.
+    """
+
+    def __init__(self):
+        self.started_at = time.perf_counter()
+        self.phases = []
+
+    @contextmanager
+    def phase(self, name: str):
+        phase_started_at = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases.append((name, time.perf_counter() - phase_started_at))
+
+    def report(self) -> dict:
+        return {
+            "phases": [
+                {"phase": name, "seconds": round(seconds, 4)}
+                for name, seconds in self.phases
+            ],
+            "total_seconds": round(time.perf_counter() - self.started_at, 4),
+        }
+
+    def log(self):
+        report = self.report()
+        for phase in report["phases"]:
+            logging.info(f"Startup phase {phase['phase']}: {phase['seconds']:.3f}s")
+        logging.info(f"Startup completed in {report['total_seconds']:.3f}s")
+
+
+startup_timer = StartupTimer()
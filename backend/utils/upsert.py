@@ -0,0 +1,33 @@
+from typing import Iterable, List
+
+from sqlalchemy import Table, insert
+from sqlalchemy.dialects import mysql, postgresql, sqlite
+from sqlmodel import Session
+
+
+def insert_missing(session: Session, table: Table, rows: List[dict], keys: Iterable[str]):
+    """
+    Insert ``rows``, skipping those whose ``keys`` (a unique key of ``table``)
+    another transaction inserted first, so concurrent first writers of a
+    counter row do not fail on the unique constraint. The caller commits.
+    """
+    if not rows:
+        return
+    dialect = session.get_bind().dialect.name
+    if dialect == "mysql":
+        statement = mysql.insert(table)
+        # Assigning a key column to itself is MySQL's no-op conflict clause
+        statement = statement.on_duplicate_key_update(
+            {name: statement.inserted[name] for name in keys}
+        )
+    elif dialect == "postgresql":
+        statement = postgresql.insert(table).on_conflict_do_nothing(
+            index_elements=list(keys)
+        )
+    elif dialect == "sqlite":
+        statement = sqlite.insert(table).on_conflict_do_nothing(
+            index_elements=list(keys)
+        )
+    else:
+        statement = insert(table)
+    session.connection().execute(statement, rows)